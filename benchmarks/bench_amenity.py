@@ -0,0 +1,49 @@
+#!/usr/bin/python3
+"""Compares amenity filters on Place.amenity_ids answered by the set
+index (storage.having) and by a scan of storage.all(Place).
+
+Usage: ./benchmarks/bench_amenity.py [count]
+"""
+import sys
+import time
+from dataset import make_record
+from models import storage
+from models.engine.file_storage import FileStorage, classes
+
+
+def timed(function, repeat=20):
+    """Return the mean seconds of function() and its last result."""
+    start = time.perf_counter()
+    for i in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main(count):
+    """Print one row per query and access path."""
+    FileStorage._FileStorage__objects = {}
+    for i in range(count):
+        storage.new(classes["Place"].from_dict(make_record(i * 6)))
+    places = storage.all("Place").values()
+    queries = {
+        "all of 1,2,3": (["amenity-1", "amenity-2", "amenity-3"], "all"),
+        "all of 0,1": (["amenity-0", "amenity-1"], "all"),
+        "any of 3,4": (["amenity-3", "amenity-4"], "any"),
+    }
+    print("{:>9} {:>14} {:>9} {:>12} {:>12}".format(
+        "objects", "query", "found", "index_ms", "scan_ms"))
+    for name, (ids, mode) in queries.items():
+        test = all if mode == "all" else any
+        index_seconds, found = timed(
+            lambda: storage.having("Place", "amenity_ids", ids, mode))
+        scan_seconds, expected = timed(
+            lambda: {p.id for p in places
+                     if test(i in p.amenity_ids for i in ids)})
+        assert {p.id for p in found.values()} == expected
+        print("{:>9} {:>14} {:>9} {:>12.3f} {:>12.3f}".format(
+            count, name, len(found), index_seconds * 1000,
+            scan_seconds * 1000))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
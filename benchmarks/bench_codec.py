@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+"""Compares the JSON backends on the encoding and decoding work done by
+FileStorage.save() and FileStorage.reload(), without building models.
+
+Usage: ./benchmarks/bench_codec.py [count]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from dataset import make_store
+from models.engine import codec
+from models.engine.json_stream import iter_items
+
+
+def best(func, repeat=3):
+    """Return the best wall time of repeat calls of func, in seconds."""
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(count):
+    """Print the save and reload timings of each backend."""
+    store = make_store(count)
+    expected = json.dumps(store)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "file.json")
+
+        def json_dump():
+            with open(path, "w") as f:
+                json.dump(store, f)
+
+        def codec_dumps():
+            parts = [codec.dumps(key) + ": " + codec.dumps(a)
+                     for key, a in store.items()]
+            with open(path, "w") as f:
+                f.write("{" + ", ".join(parts) + "}")
+
+        savers = [("json.dump", json_dump, True),
+                  ("codec.dumps", codec_dumps, True)]
+        if "orjson" in codec.DECODERS:
+            import orjson
+
+            def orjson_dumps():
+                with open(path, "wb") as f:
+                    f.write(orjson.dumps(store))
+            savers.append(("orjson.dumps", orjson_dumps, False))
+
+        print("{} objects, loads backend: {}".format(count, codec.BACKEND))
+        print("{:<16} {:>9} {:>10}".format("save", "seconds", "identical"))
+        for name, func, _ in savers:
+            seconds = best(func)
+            with open(path, "r") as f:
+                identical = f.read() == expected
+            print("{:<16} {:>9.3f} {:>10}".format(name, seconds,
+                                                 str(identical)))
+
+        json_dump()
+
+        def json_load():
+            with open(path, "r") as f:
+                return json.load(f)
+
+        def stream():
+            with open(path, "r") as f:
+                return dict(iter_items(f))
+
+        loaders = [("json.load", json_load), ("json_stream", stream)]
+        for name, decode in codec.DECODERS.items():
+            def load(decode=decode):
+                with open(path, "r") as f:
+                    return decode(f.read())
+            loaders.append(("loads:" + name, load))
+        print("{:<16} {:>9} {:>10}".format("reload", "seconds", "identical"))
+        for name, func in loaders:
+            seconds = best(func)
+            print("{:<16} {:>9.3f} {:>10}".format(name, seconds,
+                                                   str(func() == store)))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,37 @@
+#!/usr/bin/python3
+"""Times building a BaseModel from a stored dictionary, and the parsing
+of stored datetimes by parse_datetime() against datetime.strptime().
+
+Usage: ./benchmarks/bench_construct.py [count]
+"""
+import sys
+import time
+from datetime import datetime
+import dataset  # puts the repository on sys.path
+from models.base_model import BaseModel, parse_datetime, tform
+
+
+def per_call(func, count):
+    """Return the mean seconds of count calls of func."""
+    start = time.perf_counter()
+    for i in range(count):
+        func()
+    return (time.perf_counter() - start) / count
+
+
+def main(count):
+    """Print the cost of each way to build or parse, in microseconds."""
+    tdict = BaseModel().to_dict()
+    del tdict["__class__"]
+    value = datetime.today().replace(microsecond=123456).isoformat()
+    ways = [("BaseModel(**dict)", lambda: BaseModel(**tdict)),
+            ("BaseModel.from_dict", lambda: BaseModel.from_dict(tdict)),
+            ("parse_datetime", lambda: parse_datetime(value)),
+            ("strptime", lambda: datetime.strptime(value, tform))]
+    print("{:<20} {:>10}".format("way", "us/call"))
+    for name, func in ways:
+        print("{:<20} {:>10.2f}".format(name, per_call(func, count) * 1e6))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,74 @@
+#!/usr/bin/python3
+"""Measures the latency of storage.near() and storage.bbox() on the grid
+index of Place.latitude/longitude, against a scan of every place.
+
+Usage: ./benchmarks/bench_geo.py [count [queries]]
+"""
+import random
+import sys
+import time
+from dataset import make_record
+from models import storage
+from models.engine.file_storage import FileStorage, classes
+from models.engine.index import haversine
+
+
+def percentiles(samples):
+    """Return the p50 and p99 of samples, in milliseconds."""
+    samples = sorted(samples)
+    return (samples[len(samples) // 2] * 1000,
+            samples[min(len(samples) - 1, len(samples) * 99 // 100)] * 1000)
+
+
+def latencies(function, args):
+    """Return the seconds taken by function(*a) for each a in args."""
+    samples = []
+    for a in args:
+        start = time.perf_counter()
+        function(*a)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def scan_near(lat, lon, radius_km, limit):
+    """Return the places within radius_km of lat, lon by a full scan."""
+    found = sorted((haversine(lat, lon, p.latitude, p.longitude), p.id)
+                   for p in storage.all("Place").values())
+    return [f for f in found if f[0] <= radius_km][:limit]
+
+
+def main(count, queries):
+    """Print the p50 and p99 latency of each query."""
+    FileStorage._FileStorage__objects = {}
+    Place = classes["Place"]
+    start = time.perf_counter()
+    for i in range(count):
+        record = make_record(i * 6)
+        storage.new(Place.from_dict({
+            "id": record["id"], "latitude": record["latitude"],
+            "longitude": record["longitude"]}))
+    print("indexed {} places in {:.1f} s".format(
+        count, time.perf_counter() - start))
+    rand = random.Random(0)
+    points = [(rand.uniform(-60, 60), rand.uniform(-180, 180))
+              for i in range(queries)]
+    runs = {
+        "near 10km k=20": (storage.near,
+                           [(lat, lon, 10, 20) for lat, lon in points]),
+        "near 100km k=20": (storage.near,
+                            [(lat, lon, 100, 20) for lat, lon in points]),
+        "bbox 1x1 deg": (storage.bbox,
+                         [(lat, lon, lat + 1, lon + 1)
+                          for lat, lon in points]),
+        "scan near 10km": (scan_near,
+                           [(lat, lon, 10, 20) for lat, lon in points[:5]]),
+    }
+    print("{:>16} {:>10} {:>10}".format("query", "p50_ms", "p99_ms"))
+    for name, (function, args) in runs.items():
+        p50, p99 = percentiles(latencies(function, args))
+        print("{:>16} {:>10.3f} {:>10.3f}".format(name, p50, p99))
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(*(args + [1000000, 1000][len(args):]))
@@ -0,0 +1,54 @@
+#!/usr/bin/python3
+"""Measures the throughput of the console import and export commands
+on JSON Lines and CSV files.
+
+Usage: ./benchmarks/bench_import.py [count]
+"""
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from dataset import make_record
+
+
+def run(console, line):
+    """Return the seconds taken by the console command line."""
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        console.onecmd(line)
+    return time.perf_counter() - start
+
+
+def main(count):
+    """Print one row per command and file format."""
+    from console import HBNBCommand
+    from models.engine.file_storage import FileStorage
+    console = HBNBCommand()
+    print("{:>9} {:>7} {:>6} {:>10} {:>12}".format(
+        "objects", "command", "format", "seconds", "objects/s"))
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        with open("places.jsonl", "w") as f:
+            for i in range(count):
+                record = make_record(i * 6)  # always a Place
+                f.write(json.dumps(record) + "\n")
+        for fmt in ("jsonl", "csv"):
+            FileStorage._FileStorage__objects = {}
+            if fmt == "csv":
+                with redirect_stdout(io.StringIO()):
+                    console.onecmd("import places.jsonl")
+                    console.onecmd("export Place places.csv")
+                FileStorage._FileStorage__objects = {}
+            seconds = run(console, "import places.{}".format(fmt))
+            print("{:>9} {:>7} {:>6} {:>10.3f} {:>12.0f}".format(
+                count, "import", fmt, seconds, count / seconds))
+            seconds = run(console, "export Place out.{}".format(fmt))
+            print("{:>9} {:>7} {:>6} {:>10.3f} {:>12.0f}".format(
+                count, "export", fmt, seconds, count / seconds))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+"""Compares the memory held by regular and slot-based (HBNB_SLOTS=1)
+models, right after loading and once every object was saved, for the
+synthetic records and for sparse ones holding a single declared
+attribute besides id and the dates.
+
+The slot-based variants subclass the regular models, and BaseModel has
+no __slots__, so every instance still carries the __dict__ and
+__weakref__ pointers (the dictionary itself is never created), and
+every declared attribute takes a slot whether it is set or not. The
+saving therefore shrinks with the number of attributes set, and objects
+with few of them can be larger than regular ones, depending on how
+compact the Python version makes small instance dictionaries.
+
+Usage: ./benchmarks/bench_memory.py [count]
+"""
+import sys
+import tracemalloc
+from dataset import make_record
+from models.engine.file_storage import classes
+from models.slots import slotted
+
+
+def measure(records, layout):
+    """Return the bytes per object held after building the records with
+    from_dict() and after calling to_dict() on each of them.
+    """
+    tracemalloc.start()
+    objs = [layout(classes[r["__class__"]]).from_dict(r) for r in records]
+    loaded = tracemalloc.get_traced_memory()[0]
+    for obj in objs:
+        obj.to_dict()
+    saved = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return loaded / len(objs), saved / len(objs)
+
+
+def sparse(record):
+    """Return record with only its first declared attribute left."""
+    kept = ("id", "created_at", "updated_at", "__class__")
+    first = next(k for k in record if k not in kept)
+    return {k: v for k, v in record.items() if k in kept or k == first}
+
+
+def main(count):
+    """Print the bytes per object of each layout."""
+    records = [make_record(i) for i in range(count)]
+    print("{} objects".format(count))
+    print("{:<8} {:<8} {:>12} {:>12}".format("records", "layout",
+                                             "loaded_B", "saved_B"))
+    for kind, rows in (("full", records),
+                       ("sparse", [sparse(r) for r in records])):
+        for name, layout in (("dict", lambda cls: cls),
+                             ("slots", slotted)):
+            loaded, saved = measure(rows, layout)
+            print("{:<8} {:<8} {:>12.0f} {:>12.0f}".format(
+                kind, name, loaded, saved))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
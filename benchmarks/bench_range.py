@@ -0,0 +1,55 @@
+#!/usr/bin/python3
+"""Compares range and top-k queries on Place.price_by_night answered by
+the range index (storage.range) and by a scan of storage.all(Place).
+
+Usage: ./benchmarks/bench_range.py [count]
+"""
+import heapq
+import sys
+import time
+from itertools import islice
+from dataset import make_record
+from models import storage
+from models.engine.file_storage import FileStorage, classes
+
+
+def timed(function, repeat=20):
+    """Return the mean seconds of function() and its last result."""
+    start = time.perf_counter()
+    for i in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main(count):
+    """Print one row per query and access path."""
+    FileStorage._FileStorage__objects = {}
+    for i in range(count):
+        record = make_record(i * 6)
+        storage.new(classes["Place"].from_dict(record))
+    places = storage.all("Place").values()
+    queries = {
+        "100<=price<110": (
+            lambda: list(storage.range("Place", "price_by_night", 100, 110,
+                                       include_high=False)),
+            lambda: sorted((p for p in places
+                            if 100 <= p.price_by_night < 110),
+                           key=lambda p: (p.price_by_night, p.id))),
+        "top 10 price": (
+            lambda: list(islice(storage.range("Place", "price_by_night",
+                                              reverse=True), 10)),
+            lambda: heapq.nlargest(10, places,
+                                   key=lambda p: (p.price_by_night, p.id))),
+    }
+    print("{:>9} {:>16} {:>12} {:>12}".format("objects", "query",
+                                              "index_ms", "scan_ms"))
+    for name, (index, scan) in queries.items():
+        index_seconds, found = timed(index)
+        scan_seconds, expected = timed(scan)
+        assert [p.id for p in found] == [p.id for p in expected]
+        print("{:>9} {:>16} {:>12.3f} {:>12.3f}".format(
+            count, name, index_seconds * 1000, scan_seconds * 1000))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,84 @@
+#!/usr/bin/python3
+"""Compares walking State -> City -> Place -> Review trees with nested
+scans of storage.all(), with the relationship accessors and with
+prefetch().
+
+Usage: ./benchmarks/bench_relations.py [places]
+With HBNB_TYPE_STORAGE=sqlite the objects are saved to HBNB_SQLITE_PATH
+and read back before the walks, and the scan is left out.
+"""
+import sys
+import time
+from os import getenv
+import dataset  # puts the repository on sys.path
+from models import storage
+from models.engine.file_storage import FileStorage
+from models.relations import prefetch
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.state import State
+
+
+def scan(states):
+    """Return the number of reviews under states, found by scanning."""
+    count = 0
+    for st in states:
+        for cty in storage.all(City).values():
+            if cty.state_id != st.id:
+                continue
+            for plc in storage.all(Place).values():
+                if plc.city_id != cty.id:
+                    continue
+                for rvw in storage.all(Review).values():
+                    if rvw.place_id == plc.id:
+                        count += 1
+    return count
+
+
+def walk(states):
+    """Return the number of reviews under states, through the accessors."""
+    return sum(len(plc.reviews) for st in states for cty in st.cities
+               for plc in cty.places)
+
+
+def eager(states):
+    """Return the number of reviews under states, prefetched."""
+    with prefetch(states, "cities.places.reviews"):
+        return walk(states)
+
+
+def main(places):
+    """Print the time of each way to count the reviews of every state,
+    and of the scan for one state."""
+    FileStorage._FileStorage__objects = {}
+    states = [State() for i in range(50)]
+    cities = []
+    for i in range(places // 10):
+        cities.append(City())
+        cities[-1].state_id = states[i % 50].id
+    for i in range(places):
+        plc = Place()
+        plc.city_id = cities[i % len(cities)].id
+        for j in range(4):
+            rvw = Review()
+            rvw.place_id = plc.id
+    if getenv("HBNB_TYPE_STORAGE") == "sqlite":
+        storage.save()
+        storage.reload()
+        states = [storage.get(State, st.id) for st in states]
+    print("{:>9} {:>22} {:>10} {:>9}".format("places", "way", "seconds",
+                                             "reviews"))
+    ways = [("scan, one state", scan, states[:1]),
+            ("accessors", walk, states), ("prefetch", eager, states)]
+    if getenv("HBNB_TYPE_STORAGE") == "sqlite":
+        ways = ways[1:]
+    for name, function, roots in ways:
+        start = time.perf_counter()
+        count = function(roots)
+        print("{:>9} {:>22} {:>10.3f} {:>9}".format(
+            places, name, time.perf_counter() - start, count))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+"""Measures console startup time, the time of a first lookup and peak
+RSS against the store size, with FileStorage.reload() loading file.json
+whole, streaming it, deferring the construction of objects until they
+are used, or mapping a binary snapshot converted from file.json
+beforehand (the conversion time is printed on its own).
+
+Usage: ./benchmarks/bench_reload.py [count ...]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from dataset import ROOT, make_record, write_store
+from models.engine import snapshot
+
+MODES = {
+    "load": {},
+    "stream": {"HBNB_FILE_STREAM": "1"},
+    "lazy": {"HBNB_FILE_LAZY": "1"},
+    "snapshot": {"HBNB_FILE_SNAPSHOT": "file.snap"},
+}
+
+CHILD = """
+import resource, time
+start = time.perf_counter()
+import models
+elapsed = time.perf_counter() - start
+start = time.perf_counter()
+models.storage.get("User", "{}")
+lookup = time.perf_counter() - start
+try:
+    with open("/proc/self/status") as f:
+        rss = [line.split()[1] for line in f if line.startswith("VmHWM")][0]
+except OSError:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(elapsed, lookup, rss, models.storage.count())
+"""
+
+
+def startup(directory, mode):
+    """Return the seconds taken by a fresh interpreter to import models
+    from directory and then to get a User, its peak RSS in KiB and its
+    object count.
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT, **MODES[mode])
+    child = CHILD.format(make_record(2)["id"])
+    out = subprocess.check_output([sys.executable, "-c", child],
+                                  cwd=directory, env=env)
+    seconds, lookup, rss, count = out.split()
+    return float(seconds), float(lookup), int(rss), int(count)
+
+
+def main(counts):
+    """Print one row per store size and reload mode."""
+    print("{:>9} {:>9} {:>10} {:>10} {:>10}".format(
+        "objects", "mode", "seconds", "get_ms", "rss_kib"))
+    for count in counts:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "file.json")
+            write_store(path, count)
+            start = time.perf_counter()
+            snapshot.from_json(path, os.path.join(directory, "file.snap"))
+            print("{:>9} {:>9} {:>10.3f}".format(
+                count, "convert", time.perf_counter() - start))
+            for mode in MODES:
+                seconds, lookup, rss, loaded = startup(directory, mode)
+                assert loaded == count
+                print("{:>9} {:>9} {:>10.3f} {:>10.3f} {:>10}".format(
+                    count, mode, seconds, lookup * 1000, rss))
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [0, 10000, 100000, 300000])
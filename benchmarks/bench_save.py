@@ -0,0 +1,55 @@
+#!/usr/bin/python3
+"""Measures the throughput of a burst of console create commands under
+each fsync policy of FileStorage (HBNB_FILE_FSYNC).
+
+Usage: ./benchmarks/bench_save.py [creates [objects]]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+from dataset import ROOT, write_store
+
+POLICIES = ["never", "always", "10", "100"]
+
+CHILD = """
+import io, sys, time
+from contextlib import redirect_stdout
+from console import HBNBCommand
+import models
+console = HBNBCommand()
+start = time.perf_counter()
+with redirect_stdout(io.StringIO()):
+    for i in range({creates}):
+        console.onecmd('create Place name="Place_{{}}"'.format(i))
+models.storage.flush()
+print(time.perf_counter() - start)
+"""
+
+
+def burst(directory, policy, creates):
+    """Return the seconds taken by creates console commands, and the final
+    flush, in a fresh interpreter with the fsync policy.
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT, HBNB_FILE_FSYNC=policy)
+    out = subprocess.check_output(
+        [sys.executable, "-c", CHILD.format(creates=creates)],
+        cwd=directory, env=env)
+    return float(out)
+
+
+def main(creates, count):
+    """Print one row per fsync policy."""
+    print("{:>9} {:>8} {:>10} {:>12}".format("objects", "fsync",
+                                              "seconds", "creates/s"))
+    for policy in POLICIES:
+        with tempfile.TemporaryDirectory(dir=ROOT) as directory:
+            write_store(os.path.join(directory, "file.json"), count)
+            seconds = burst(directory, policy, creates)
+            print("{:>9} {:>8} {:>10.3f} {:>12.1f}".format(
+                count, policy, seconds, creates / seconds))
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(*(args + [500, 1000][len(args):]))
@@ -0,0 +1,58 @@
+#!/usr/bin/python3
+"""Compares full-text queries on Review.text answered by the text index
+(storage.search) and by a substring scan of storage.all(Review).
+
+Usage: ./benchmarks/bench_search.py [count]
+"""
+import sys
+import time
+from dataset import make_record
+from models import storage
+from models.engine.file_storage import FileStorage, classes
+
+
+def timed(function, repeat=5):
+    """Return the mean seconds of function() and its last result."""
+    start = time.perf_counter()
+    for i in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main(count):
+    """Print the indexing and vocabulary sorting times, then one row
+    per query."""
+    FileStorage._FileStorage__objects = {}
+    start = time.perf_counter()
+    for i in range(count):
+        storage.new(classes["Review"].from_dict(make_record(i * 6 + 4)))
+    print("indexed {} reviews in {:.1f} s".format(
+        count, time.perf_counter() - start))
+    start = time.perf_counter()
+    storage.search("Review", "x*")
+    print("sorted the vocabulary in {:.1f} s".format(
+        time.perf_counter() - start))
+    reviews = storage.all("Review").values()
+    number = str(count // 2 * 6 + 4)
+    queries = {
+        "back " + number: (None, ["back", number]),
+        number[:-1] + "*": (None, [number[:-1]]),
+        "great, top 10": (10, ["great"]),
+        "great stay, top 10": (10, ["great", "stay"]),
+    }
+    print("{:>9} {:>18} {:>9} {:>12} {:>12}".format(
+        "objects", "query", "found", "index_ms", "scan_ms"))
+    for name, (limit, needles) in queries.items():
+        index_seconds, found = timed(
+            lambda: storage.search("Review", name.split(",")[0], limit))
+        scan_seconds, expected = timed(
+            lambda: [r for r in reviews
+                     if all(n in r.text.lower() for n in needles)], 1)
+        assert {obj.id for s, obj in found} <= {r.id for r in expected}
+        print("{:>9} {:>18} {:>9} {:>12.3f} {:>12.3f}".format(
+            count, name, len(found), index_seconds * 1000,
+            scan_seconds * 1000))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
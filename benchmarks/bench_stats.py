@@ -0,0 +1,63 @@
+#!/usr/bin/python3
+"""Compares per-city place statistics and per-place review counts read
+from the aggregates kept by storage (storage.aggregate) with a scan of
+storage.all(), and times the full recount of storage.check_aggregates().
+
+Usage: ./benchmarks/bench_stats.py [count]
+"""
+import sys
+import time
+from dataset import make_record
+from models import storage
+from models.engine.file_storage import FileStorage, classes
+
+
+def timed(function, repeat=20):
+    """Return the mean seconds of function() and its last result."""
+    start = time.perf_counter()
+    for i in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def scan(cls, attr, value, field=None):
+    """Return the count and sum of field of the objects of cls whose
+    attr is value, read from storage.all(cls)."""
+    count = total = 0
+    for obj in storage.all(cls).values():
+        if getattr(obj, attr) == value:
+            count += 1
+            total += getattr(obj, field) if field else 0
+    return count, total
+
+
+def main(count):
+    """Print one row per statistic and access path."""
+    FileStorage._FileStorage__objects = {}
+    for i in range(count):
+        record = make_record(i)
+        storage.new(classes[record["__class__"]].from_dict(record))
+    queries = {
+        "places in city-6": (
+            lambda: storage.aggregate("Place", "city_id", "city-6"),
+            lambda: scan("Place", "city_id", "city-6", "price_by_night")),
+        "reviews of place-4": (
+            lambda: storage.aggregate("Review", "place_id", "place-4"),
+            lambda: scan("Review", "place_id", "place-4")),
+    }
+    print("{:>9} {:>20} {:>12} {:>12}".format("objects", "statistic",
+                                              "kept_ms", "scan_ms"))
+    for name, (kept, recount) in queries.items():
+        kept_seconds, stats = timed(kept)
+        scan_seconds, (number, total) = timed(recount, 3)
+        assert stats["count"] == number
+        assert sum(stats["sum"].values()) == total
+        print("{:>9} {:>20} {:>12.4f} {:>12.3f}".format(
+            count, name, kept_seconds * 1000, scan_seconds * 1000))
+    check_seconds, errors = timed(storage.check_aggregates, 1)
+    assert errors == []
+    print("check_aggregates: {:.3f} s".format(check_seconds))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
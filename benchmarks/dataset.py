@@ -0,0 +1,65 @@
+#!/usr/bin/python3
+"""Builds synthetic HBnB stores for the benchmarks."""
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def make_record(i):
+    """Return the to_dict() form of the i-th object of a synthetic store.
+    One object in three is a Place, the rest are Users, Cities and Reviews.
+    """
+    stamp = (datetime(2024, 1, 1) + timedelta(seconds=i, microseconds=1))
+    record = {
+        "id": "{:08x}-0000-4000-8000-{:012x}".format(i, i),
+        "created_at": stamp.isoformat(),
+        "updated_at": stamp.isoformat(),
+    }
+    kind = i % 6
+    if kind in (0, 1):
+        record.update({
+            "city_id": "city-{}".format(i % 500),
+            "user_id": "user-{}".format(i % 5000),
+            "name": "Place {}".format(i),
+            "description": "A cosy place number {} near the sea".format(i),
+            "number_rooms": i % 7,
+            "number_bathrooms": i % 3,
+            "max_guest": i % 9,
+            "price_by_night": 20 + i % 480,
+            "latitude": -60.0 + (i * 7919 % 120000) / 1000.0,
+            "longitude": -180.0 + (i * 104729 % 360000) / 1000.0,
+            "amenity_ids": ["amenity-{}".format(j) for j in range(i % 5)],
+            "__class__": "Place"})
+    elif kind == 2:
+        record.update({"email": "user{}@hbnb.io".format(i),
+                       "password": "pwd", "first_name": "First",
+                       "last_name": "Last", "__class__": "User"})
+    elif kind == 3:
+        record.update({"state_id": "state-{}".format(i % 50),
+                       "name": "City {}".format(i), "__class__": "City"})
+    else:
+        record.update({"place_id": "place-{}".format(i % 10000),
+                       "user_id": "user-{}".format(i % 5000),
+                       "text": "Great stay, would come back {}".format(i),
+                       "__class__": "Review"})
+    return record
+
+
+def make_store(count):
+    """Return a file.json dictionary holding count objects."""
+    store = {}
+    for i in range(count):
+        record = make_record(i)
+        store["{}.{}".format(record["__class__"], record["id"])] = record
+    return store
+
+
+def write_store(path, count):
+    """Write a file.json holding count objects to path."""
+    with open(path, "w") as f:
+        json.dump(make_store(count), f)
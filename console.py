@@ -1,9 +1,20 @@
-!/usr/bin/python3
+#!/usr/bin/python3
 """Defines the HBnB console."""
+import argparse
 import cmd
+import io
+import json
 import re
+import sys
+import time
+from ast import literal_eval
+from contextlib import redirect_stdout
+from itertools import islice
 from shlex import split
 from models import storage
+from models.engine.file_storage import classes
+from models.engine.bulk import read_records, write_records
+from models.engine.query import Query
 from models.base_model import BaseModel
 from models.user import User
 from models.state import State
@@ -31,13 +42,49 @@ def parse(arg):
         return retl
 
 
+def declared(cls, name):
+    """Return the str, int, float, list or dict default of the class
+    attribute name of cls or of its bases, skipping the slots of the
+    slot-based variants, or None."""
+    for klass in cls.__mro__:
+        default = vars(klass).get(name)
+        if type(default) in {str, int, float, list, dict}:
+            return default
+    return None
+
+
+def cast(obj, name, value):
+    """Return value converted to the type of the class attribute name of
+    obj when that attribute is a str, int or float, or read as a Python
+    literal when it is a list or dict and value is a string, a list of
+    bare words such as [a, b] being read as a list of strings."""
+    default = declared(type(obj), name)
+    if type(default) in {str, int, float}:
+        return type(default)(value)
+    if type(default) in {list, dict} and type(value) is str:
+        try:
+            parsed = literal_eval(value)
+        except (ValueError, SyntaxError):
+            if type(default) is list and re.fullmatch(r"\[.*\]", value):
+                return [item.strip().strip("\"'")
+                        for item in value[1:-1].split(",")
+                        if item.strip()]
+            return value
+        return parsed if type(parsed) is type(default) else value
+    return value
+
+
 class HBNBCommand(cmd.Cmd):
     """Defines the HolbertonBnB command interpreter.
     Attributes:
         prompt (str): The command prompt.
+        batch (bool): Whether run_batch() is running the commands, in a
+            transaction of its own that begin, commit and rollback refuse
+            to touch.
     """
 
     prompt = "(hbnb) "
+    batch = False
     __classes = {
         "BaseModel",
         "User",
@@ -59,7 +106,9 @@ class HBNBCommand(cmd.Cmd):
             "show": self.do_show,
             "destroy": self.do_destroy,
             "count": self.do_count,
-            "update": self.do_update
+            "update": self.do_update,
+            "where": self.do_where,
+            "search": self.do_search
         }
         match = re.search(r"\.", arg)
         if match is not None:
@@ -82,6 +131,36 @@ class HBNBCommand(cmd.Cmd):
         print("")
         return True
 
+    def do_begin(self, arg):
+        """Usage: begin
+        Start a transaction: changes are saved once, on commit."""
+        if self.batch:
+            print("** transactions not allowed in batch mode **")
+        elif storage.in_transaction():
+            print("** transaction already in progress **")
+        else:
+            storage.begin()
+
+    def do_commit(self, arg):
+        """Usage: commit
+        Save the changes made since begin."""
+        if self.batch:
+            print("** transactions not allowed in batch mode **")
+        elif not storage.in_transaction():
+            print("** no transaction in progress **")
+        else:
+            storage.commit()
+
+    def do_rollback(self, arg):
+        """Usage: rollback
+        Discard the changes made since begin."""
+        if self.batch:
+            print("** transactions not allowed in batch mode **")
+        elif not storage.in_transaction():
+            print("** no transaction in progress **")
+        else:
+            storage.rollback()
+
     def do_create(self, line):
         """ Creates a new instance of BaseModel, saves it
         ### Exceptions:
@@ -98,9 +177,14 @@ class HBNBCommand(cmd.Cmd):
             else:  # class name missing
                 raise SyntaxError()
 
+            if cls_name not in HBNBCommand.__classes:
+                raise KeyError()
+
             kwargs = {}
 
             for pair in my_list[1:]:
+                if pair.count("=") != 1:
+                    continue
                 k, v = pair.split("=")
                 if self.is_int(v):
                     kwargs[k] = int(v)
@@ -110,7 +194,7 @@ class HBNBCommand(cmd.Cmd):
                     v = v.replace('_', ' ')
                     kwargs[k] = v.strip('"\'')
 
-            obj = self.all_classes[cls_name](**kwargs)
+            obj = classes[cls_name].from_dict(kwargs)
             storage.new(obj)  # store new object
             obj.save()  # save storage to file
             print(obj.id)  # print id of created object class
@@ -120,67 +204,267 @@ class HBNBCommand(cmd.Cmd):
         except KeyError:
             print("** class doesn't exist **")
 
+    def do_import(self, arg):
+        """Usage: import <file> [<class>]
+        Create the objects stored in a JSON Lines or CSV (.csv) file,
+        of the given class when a record has no __class__, and save once.
+        """
+        argl = parse(arg)
+        if len(argl) == 0:
+            print("** file name missing **")
+        elif len(argl) > 1 and argl[1] not in HBNBCommand.__classes:
+            print("** class doesn't exist **")
+        else:
+            count = 0
+            try:
+                with storage.batch():
+                    for record in read_records(argl[0], classes,
+                                               argl[1] if len(argl) > 1
+                                               else None):
+                        storage.new(classes[record["__class__"]].from_dict(
+                            record))
+                        count += 1
+            except FileNotFoundError:
+                print("** file doesn't exist **")
+            except KeyError:
+                print("** class doesn't exist **")
+            except ValueError:
+                print("** invalid record **")
+            else:
+                print(count)
+
+    def do_export(self, arg):
+        """Usage: export <class> <file>
+        Write the objects of a class to a JSON Lines or CSV (.csv) file."""
+        argl = parse(arg)
+        if len(argl) == 0:
+            print("** class name missing **")
+        elif argl[0] not in HBNBCommand.__classes:
+            print("** class doesn't exist **")
+        elif len(argl) == 1:
+            print("** file name missing **")
+        else:
+            print(write_records(argl[1], storage.all(argl[0]).values()))
+
+    @staticmethod
+    def is_int(value):
+        """Return True if value is the string of an int."""
+        try:
+            int(value)
+            return True
+        except ValueError:
+            return False
+
+    @staticmethod
+    def is_float(value):
+        """Return True if value is the string of a float."""
+        try:
+            float(value)
+            return True
+        except ValueError:
+            return False
+
     def do_show(self, arg):
         """Usage: show <class> <id> or <class>.show(<id>)
         """
         argl = parse(arg)
-        objdict = storage.all()
         if len(argl) == 0:
             print("** class name missing **")
         elif argl[0] not in HBNBCommand.__classes:
             print("** class doesn't exist **")
         elif len(argl) == 1:
             print("** instance id missing **")
-        elif "{}.{}".format(argl[0], argl[1]) not in objdict:
+        elif storage.get(argl[0], argl[1]) is None:
             print("** no instance found **")
         else:
-            print(objdict["{}.{}".format(argl[0], argl[1])])
+            print(storage.get(argl[0], argl[1]))
 
     def do_destroy(self, arg):
         """Usage: destroy <class> <id> or <class>.destroy(<id>)."""
         argl = parse(arg)
-        objdict = storage.all()
         if len(argl) == 0:
             print("** class name missing **")
         elif argl[0] not in HBNBCommand.__classes:
             print("** class doesn't exist **")
         elif len(argl) == 1:
             print("** instance id missing **")
-        elif "{}.{}".format(argl[0], argl[1]) not in objdict.keys():
+        elif storage.get(argl[0], argl[1]) is None:
             print("** no instance found **")
         else:
-            del objdict["{}.{}".format(argl[0], argl[1])]
+            storage.delete(storage.get(argl[0], argl[1]))
             storage.save()
 
     def do_all(self, arg):
         """Usage: all or all <class> or <class>.all()
-        Display string representations of all instances of a given class."""
+        [--lines | --jsonl] [--limit <n>] [--offset <n>]
+        Display string representations of all instances of a given class,
+        as a list, one per line, or as one to_dict() JSON object per line,
+        printing each as soon as it is read."""
         argl = parse(arg)
-        if len(argl) > 0 and argl[0] not in HBNBCommand.__classes:
+        options = {"--lines": False, "--jsonl": False,
+                   "--limit": None, "--offset": 0}
+        args = []
+        i = 0
+        while i < len(argl):
+            if argl[i] in ("--lines", "--jsonl"):
+                options[argl[i]] = True
+            elif argl[i] in ("--limit", "--offset"):
+                if i + 1 == len(argl) or not argl[i + 1].isdigit():
+                    print("** invalid {} **".format(argl[i][2:]))
+                    return
+                options[argl[i]] = int(argl[i + 1])
+                i += 1
+            else:
+                args.append(argl[i])
+            i += 1
+        if len(args) > 0 and args[0] not in HBNBCommand.__classes:
             print("** class doesn't exist **")
+            return
+        objs = islice(storage.iterate(args[0] if len(args) > 0 else None),
+                      options["--offset"], None if options["--limit"] is None
+                      else options["--offset"] + options["--limit"])
+        if options["--jsonl"]:
+            for obj in objs:
+                print(json.dumps(obj.to_dict()))
+        elif options["--lines"]:
+            for obj in objs:
+                print(obj)
         else:
-            objl = []
-            for obj in storage.all().values():
-                if len(argl) > 0 and argl[0] == obj.__class__.__name__:
-                    objl.append(obj.__str__())
-                elif len(argl) == 0:
-                    objl.append(obj.__str__())
-            print(objl)
+            print("[", end="")
+            for i, obj in enumerate(objs):
+                print(", " if i else "", repr(obj.__str__()), sep="", end="")
+            print("]")
+
+    def do_where(self, arg):
+        """Usage: where <class> [<field> <op> <value> [and ...]]
+        [order by <field> [asc|desc]] [limit <n> [offset <n>]]
+        [select <field>, ...] or <class>.where(...)
+        Display the instances matching the filters, one per line, or the
+        JSON object of their selected fields."""
+        try:
+            query = Query(arg)
+        except ValueError as e:
+            print("** invalid query: {} **".format(e))
+            return
+        if query.cls_name not in HBNBCommand.__classes:
+            print("** class doesn't exist **")
+            return
+        try:
+            for result in query.run(storage, classes[query.cls_name]):
+                print(result if query.fields is None else json.dumps(result))
+        except ValueError as e:
+            print("** invalid query: {} **".format(e))
+
+    def do_search(self, arg):
+        """Usage: search <class> <words> [--limit <n>] or
+        <class>.search(<words>)
+        Display the instances whose full-text attributes hold every word,
+        a word ending with * matching every word it starts, best match
+        first, each preceded by its score."""
+        argl = arg.split()
+        limit = None
+        if "--limit" in argl:
+            i = argl.index("--limit")
+            if i + 1 == len(argl) or not argl[i + 1].isdigit():
+                print("** invalid limit **")
+                return
+            limit = int(argl[i + 1])
+            del argl[i:i + 2]
+        if len(argl) == 0:
+            print("** class name missing **")
+            return
+        if argl[0] not in HBNBCommand.__classes:
+            print("** class doesn't exist **")
+            return
+        if not getattr(classes[argl[0]], "__fulltext__", None):
+            print("** class has no full-text attributes **")
+            return
+        if len(argl) == 1:
+            print("** search words missing **")
+            return
+        for score, obj in storage.search(argl[0], " ".join(argl[1:]),
+                                         limit):
+            print("{:.3f} {}".format(score, obj))
+
+    def do_stats(self, arg):
+        """Usage: stats <class> <attribute> [<value>] or stats --check
+        Display as JSON the number of instances whose attribute is value,
+        with the sums and means of the fields aggregated with it, or one
+        line of them per value; --check compares the aggregates kept with
+        a full recount and displays their differences, or OK."""
+        argl = parse(arg)
+        if argl[:1] == ["--check"]:
+            errors = storage.check_aggregates()
+            for error in errors:
+                print(error)
+            if not errors:
+                print("OK")
+            return
+        if len(argl) == 0:
+            print("** class name missing **")
+            return
+        if argl[0] not in HBNBCommand.__classes:
+            print("** class doesn't exist **")
+            return
+        if len(argl) == 1:
+            print("** attribute name missing **")
+            return
+        if len(argl) > 2:
+            value = argl[2]
+            default = declared(classes[argl[0]], argl[1])
+            if type(default) in (int, float):
+                try:
+                    value = type(default)(value)
+                except ValueError:
+                    print("** invalid number **")
+                    return
+            print(json.dumps(storage.aggregate(argl[0], argl[1], value)))
+            return
+        for value, stats in storage.aggregate(argl[0], argl[1]).items():
+            print(json.dumps(dict({argl[1]: value}, **stats)))
+
+    def do_near(self, arg):
+        """Usage: near <latitude> <longitude> <radius_km> [<limit>]
+        Display the places within radius_km of a point, nearest first,
+        each preceded by its distance in km."""
+        argl = parse(arg)
+        if len(argl) < 3:
+            print("** coordinates missing **")
+            return
+        try:
+            lat, lon, radius = (float(a) for a in argl[:3])
+            limit = int(argl[3]) if len(argl) > 3 else None
+        except ValueError:
+            print("** invalid number **")
+            return
+        for distance, obj in storage.near(lat, lon, radius, limit):
+            print("{:.3f} {}".format(distance, obj))
+
+    def do_bbox(self, arg):
+        """Usage: bbox <south> <west> <north> <east>
+        Display the places within a bounding box, which crosses the
+        antimeridian when west > east."""
+        argl = parse(arg)
+        if len(argl) < 4:
+            print("** coordinates missing **")
+            return
+        try:
+            south, west, north, east = (float(a) for a in argl[:4])
+        except ValueError:
+            print("** invalid number **")
+            return
+        for obj in storage.bbox(south, west, north, east).values():
+            print(obj)
 
     def do_count(self, arg):
         """Usage: count <class> or <class>.count()
         Retrieve the number of instances of a given class."""
         argl = parse(arg)
-        count = 0
-        for obj in storage.all().values():
-            if argl[0] == obj.__class__.__name__:
-                count += 1
-        print(count)
+        print(storage.count(argl[0] if len(argl) > 0 else None))
 
     def do_update(self, arg):
         """Usage: update <class> <id> <attribute_name> <attribute_value>."""
         argl = parse(arg)
-        objdict = storage.all()
 
         if len(argl) == 0:
             print("** class name missing **")
@@ -191,7 +475,8 @@ class HBNBCommand(cmd.Cmd):
         if len(argl) == 1:
             print("** instance id missing **")
             return False
-        if "{}.{}".format(argl[0], argl[1]) not in objdict.keys():
+        obj = storage.get(argl[0], argl[1])
+        if obj is None:
             print("** no instance found **")
             return False
         if len(argl) == 2:
@@ -204,24 +489,89 @@ class HBNBCommand(cmd.Cmd):
                 print("** value missing **")
                 return False
 
-        if len(argl) == 4:
-            obj = objdict["{}.{}".format(argl[0], argl[1])]
-            if argl[2] in obj.__class__.__dict__.keys():
-                valtype = type(obj.__class__.__dict__[argl[2]])
-                obj.__dict__[argl[2]] = valtype(argl[3])
-            else:
-                obj.__dict__[argl[2]] = argl[3]
-        elif type(eval(argl[2])) == dict:
-            obj = objdict["{}.{}".format(argl[0], argl[1])]
-            for k, v in eval(argl[2]).items():
-                if (k in obj.__class__.__dict__.keys() and
-                        type(obj.__class__.__dict__[k]) in {str, int, float}):
-                    valtype = type(obj.__class__.__dict__[k])
-                    obj.__dict__[k] = valtype(v)
-                else:
-                    obj.__dict__[k] = v
+        try:
+            if len(argl) == 4:
+                setattr(obj, argl[2], cast(obj, argl[2], argl[3]))
+            elif type(eval(argl[2])) == dict:
+                for k, v in eval(argl[2]).items():
+                    setattr(obj, k, cast(obj, k, v))
+        except AttributeError as e:
+            print("** {} **".format(e))
+            return False
+        storage.new(obj)
         storage.save()
 
 
+def run_batch(console, lines, every=0, report=None):
+    """Run the commands of lines in one transaction, committed every
+    `every` commands (only at the end if 0), echoing their output and
+    writing one JSON line per command to report (stderr if None): its
+    line number, the command, the seconds it took and its error message
+    or null. Return the number of commands that failed. The begin,
+    commit and rollback commands fail, leaving the batch's transaction
+    alone.
+    """
+    report = sys.stderr if report is None else report
+    failed = 0
+    count = 0
+    storage.begin()
+    console.batch = True
+    try:
+        for number, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            output = io.StringIO()
+            error = None
+            start = time.perf_counter()
+            try:
+                with redirect_stdout(output):
+                    stop = console.onecmd(line)
+            except Exception as e:
+                stop = False
+                error = "{}: {}".format(type(e).__name__, e)
+            seconds = time.perf_counter() - start
+            sys.stdout.write(output.getvalue())
+            if error is None:
+                for out in output.getvalue().splitlines():
+                    if out.startswith("*** ") or (out.startswith("** ") and
+                                                  out.endswith(" **")):
+                        error = out.strip("* ")
+            failed += error is not None
+            report.write(json.dumps({"line": number, "command": line,
+                                     "seconds": round(seconds, 6),
+                                     "error": error}) + "\n")
+            count += 1
+            if stop:
+                break
+            if every and count % every == 0:
+                storage.commit()
+                storage.begin()
+    finally:
+        console.batch = False
+        storage.commit()
+    return failed
+
+
+def main(argv=None):
+    """Start the interactive console, or run a script with --batch."""
+    parser = argparse.ArgumentParser(description="HBnB console")
+    parser.add_argument("--batch", nargs="?", const="-", metavar="FILE",
+                        help="run the commands of FILE (stdin if omitted) "
+                        "and save at the end")
+    parser.add_argument("--every", type=int, default=0, metavar="N",
+                        help="with --batch, also save every N commands")
+    args = parser.parse_args(argv)
+    if args.batch is None:
+        HBNBCommand().cmdloop()
+        return 0
+    if args.batch == "-":
+        failed = run_batch(HBNBCommand(), sys.stdin, args.every)
+    else:
+        with open(args.batch) as f:
+            failed = run_batch(HBNBCommand(), f, args.every)
+    return 1 if failed else 0
+
+
 if __name__ == "__main__":
-    HBNBCommand().cmdloop()
+    sys.exit(main())
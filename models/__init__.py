@@ -1,7 +1,11 @@
 #!/usr/bin/python3
 """__init__ method for models directory"""
-from models.engine.file_storage import FileStorage
+from os import getenv
 
-
-storage = FileStorage()
+if getenv("HBNB_TYPE_STORAGE") == "sqlite":
+    from models.engine.sqlite_storage import SQLiteStorage
+    storage = SQLiteStorage()
+else:
+    from models.engine.file_storage import FileStorage
+    storage = FileStorage()
 storage.reload()
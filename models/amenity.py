@@ -2,12 +2,16 @@
 """ Defines the Amenity Class"""
 
 from models.base_model import BaseModel
+from models.relations import ListedIn
 
 
 class Amenity(BaseModel):
     """ Representing an amenity.
     Attributes:
         name (str) : Amenity name
+        places (list) : The places offering the amenity.
     """
 
     name = ""
+
+    places = ListedIn("Place", "amenity_ids")
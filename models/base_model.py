@@ -2,9 +2,26 @@
 """ Define the BaseModel Class."""
 
 import models
+import re
 from uuid import uuid4
 from datetime import datetime
 
+tform = "%Y-%m-%dT%H:%M:%S.%f"
+isoform = re.compile(r"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.\d{6}\Z", re.ASCII)
+
+
+def parse_datetime(value):
+    """ Return datetime.strptime(value, tform), results and errors alike,
+    taking a fast path for the strings datetime.isoformat() writes.
+    """
+    if type(value) is str and isoform.match(value):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    return datetime.strptime(value, tform)
+
+
 class BaseModel:
     """ BaseModel of the HBnB project"""
 
@@ -15,24 +32,57 @@ class BaseModel:
             **kwargs (dict): Key and Value pairs of attributes
         """
 
-        tform = "%Y-%m-%dT%H:%M:%S.%f"
-        self.id = str(uuid4())
-        self.created_at = datetime.today()
-        self.updated_at = datetime.today()
-
         if len(kwargs) != 0:
-            for k, v in kwargs.items():
-                if k == "created_at" or k == "updated_at":
-                    self.__dict__[k] = datetime.strptime(v, tform)
-                else:
-                    self.__dict__[k] = v
+            self._fill(kwargs)
         else:
+            self.id = str(uuid4())
+            self.created_at = datetime.today()
+            self.updated_at = datetime.today()
             models.storage.new(self)
 
+    @classmethod
+    def from_dict(cls, dictionary):
+        """ Return an instance built from a dictionary in the to_dict()
+        format, without registering it in storage. id, created_at and
+        updated_at are only generated when the dictionary lacks them.
+        """
+        obj = cls.__new__(cls)
+        obj._fill(dictionary)
+        return obj
+
+    def _fill(self, dictionary):
+        """ Set the attributes of a new instance from dictionary."""
+        odict = self.__dict__
+        if "id" in dictionary:
+            odict["id"] = dictionary["id"]
+        else:
+            odict["id"] = str(uuid4())
+        for k in ("created_at", "updated_at"):
+            if k in dictionary:
+                odict[k] = parse_datetime(dictionary[k])
+            else:
+                odict[k] = datetime.today()
+        for k, v in dictionary.items():
+            if k not in odict and k != "__class__":
+                odict[k] = v
+
+    def _reset(self, dictionary):
+        """ Replace the attributes of the instance by those of dictionary,
+        without marking it as changed in storage.
+        """
+        self.__dict__.clear()
+        self._fill(dictionary)
+
+    def __setattr__(self, name, value):
+        """ Set an attribute and mark the instance as changed in storage."""
+        super().__setattr__(name, value)
+        models.storage.touch(self, name)
+
     def save(self):
         """ Updates updated_at with the current datetime"""
 
         self.updated_at = datetime.today()
+        models.storage.new(self)
         models.storage.save()
 
     def to_dict(self):
@@ -41,8 +91,10 @@ class BaseModel:
         the class name of the object.
         """
         redict = self.__dict__.copy()
-        redict["created_at"] = self.created_at.isoformat()
-        redict["updated_at"] = self.updated_at.isoformat()
+        redict["created_at"] = self.created_at.isoformat(
+            timespec="microseconds")
+        redict["updated_at"] = self.updated_at.isoformat(
+            timespec="microseconds")
         redict["__class__"] = self.__class__.__name__
         return redict
 
@@ -1,6 +1,7 @@
 #!/usr/bin/python3
 """ Defines the City Class"""
 from models.base_model import BaseModel
+from models.relations import HasMany, BelongsTo
 
 
 class City(BaseModel):
@@ -8,7 +9,14 @@ class City(BaseModel):
     Attributes:
         state id (str) : The State id.
         name (str) : The City name.
+        state (State) : The State of the city.
+        places (list) : The places of the city.
     """
 
+    __indexes__ = ("state_id",)
+
     state_id = ""
     name = ""
+
+    state = BelongsTo("State", "state_id")
+    places = HasMany("Place", "city_id")
@@ -0,0 +1,115 @@
+#!/usr/bin/python3
+"""Defines the readers and writers of the console import and export commands.
+
+Files ending in .csv hold one object per row under a header naming its
+attributes; any other file is read as JSON Lines, one to_dict() dictionary
+per line. The CSV cells of id, the dates and the attributes the class
+declares as strings hold their text as is; the other cells hold the JSON
+document of their value, so that numbers, booleans, lists and the
+attributes the class does not declare come back with their type. Cells
+that are not JSON are read as text.
+"""
+
+
+import csv
+from models.engine import codec
+
+
+def is_csv(path):
+    """Return True if path is read and written as CSV."""
+    return path.lower().endswith(".csv")
+
+
+def read_records(path, classes, default=None):
+    """Yield the to_dict() dictionary of each object stored in path,
+    in the order of the file.
+    Args:
+        path (str): The JSON Lines or CSV file to read.
+        classes (dict): The model classes by name.
+        default (str): The class name of the records without __class__.
+    Raises:
+        KeyError: If a record names a class missing from classes.
+        ValueError: If a line of a JSON Lines file is not a JSON object.
+    """
+    with open(path, newline="") as f:
+        if not is_csv(path):
+            for line in f:
+                if line.strip():
+                    record = codec.loads(line)
+                    if type(record) is not dict:
+                        raise ValueError("record is not a JSON object")
+                    record.setdefault("__class__", default)
+                    classes[record["__class__"]]
+                    yield record
+            return
+        texts = {}
+        for row in csv.DictReader(f):
+            name = row.get("__class__") or default
+            if name not in texts:
+                texts[name] = _texts(classes[name])
+            text = texts[name]
+            record = {}
+            for k, v in row.items():
+                if v:
+                    record[k] = v if k in text else _decode(v)
+            record["__class__"] = name
+            yield record
+
+
+def write_records(path, objs):
+    """Write the objects of the iterable objs to path and return how many
+    there were.
+    """
+    count = 0
+    with open(path, "w", newline="") as f:
+        if not is_csv(path):
+            for obj in objs:
+                f.write(codec.dumps(obj.to_dict()) + "\n")
+                count += 1
+            return count
+        objs = list(objs)
+        records = [obj.to_dict() for obj in objs]
+        fields = ["__class__", "id", "created_at", "updated_at"]
+        seen = set(fields)
+        for record in records:
+            for k in record:
+                if k not in seen:
+                    seen.add(k)
+                    fields.append(k)
+        writer = csv.writer(f)
+        writer.writerow(fields)
+        texts = {}
+        for obj, record in zip(objs, records):
+            if type(obj) not in texts:
+                texts[type(obj)] = _texts(type(obj))
+            text = texts[type(obj)]
+            writer.writerow(["" if k not in record else
+                             record[k] if k in text and
+                             type(record[k]) is str else
+                             codec.dumps(record[k]) for k in fields])
+        return len(records)
+
+
+def _texts(cls):
+    """Return the names of the attributes of cls whose CSV cells hold
+    their text as is: id, the dates and the class attributes that are
+    strings.
+    """
+    texts = {"__class__", "id", "created_at", "updated_at"}
+    for klass in reversed(cls.__mro__):
+        for name, value in vars(klass).items():
+            if type(value) is str:
+                texts.add(name)
+            elif type(value) in (int, float, list, dict):
+                texts.discard(name)
+    return texts
+
+
+def _decode(cell):
+    """Return the value of the JSON document cell, or cell itself if it
+    is not JSON.
+    """
+    try:
+        return codec.loads(cell)
+    except ValueError:
+        return cell
@@ -0,0 +1,39 @@
+#!/usr/bin/python3
+"""Defines the JSON codec used by the storage engines.
+
+loads() goes through the fastest decoder installed, picked at import
+time from DECODERS unless HBNB_JSON_CODEC names one, and falls back to
+the standard library for the documents it rejects (NaN, integers wider
+than 64 bits...). dumps() always uses the C encoder of the standard
+library with its default separators: none of the faster encoders can
+reproduce file.json byte for byte.
+"""
+
+
+import json
+from os import getenv
+
+DECODERS = {"json": json.loads}
+try:
+    import orjson
+    DECODERS["orjson"] = orjson.loads
+except ImportError:
+    pass
+
+BACKEND = getenv("HBNB_JSON_CODEC")
+if BACKEND not in DECODERS:
+    BACKEND = "orjson" if "orjson" in DECODERS else "json"
+_decode = DECODERS[BACKEND]
+
+
+def loads(s):
+    """Return the Python object of the JSON document s (str or bytes)."""
+    try:
+        return _decode(s)
+    except ValueError:
+        return json.loads(s)
+
+
+def dumps(obj):
+    """Return the JSON document of obj, as json.dumps() writes it."""
+    return json.dumps(obj)
@@ -2,7 +2,14 @@
 """Defines the FileStorage class."""
 
 
-import json
+import os
+import math
+import time
+import atexit
+import threading
+import weakref
+from os import getenv
+from contextlib import contextmanager
 from models.base_model import BaseModel
 from models.user import User
 from models.state import State
@@ -10,6 +17,23 @@ from models.city import City
 from models.place import Place
 from models.amenity import Amenity
 from models.review import Review
+from models.engine import codec, snapshot
+from models.engine.index import AttributeIndex, RangeIndex, GeoIndex
+from models.engine.index import SetIndex, TextIndex, Aggregate
+from models.slots import slotted
+from models.engine.json_stream import iter_items
+
+classes = {
+    "BaseModel": BaseModel,
+    "User": User,
+    "State": State,
+    "City": City,
+    "Place": Place,
+    "Amenity": Amenity,
+    "Review": Review
+}
+if getenv("HBNB_SLOTS") == "1":
+    classes = {name: slotted(cls) for name, cls in classes.items()}
 
 
 class FileStorage:
@@ -17,33 +41,1046 @@ class FileStorage:
     Attributes:
         __file_path (str): The name of the file to save objects to.
         __objects (dict): A dictionary of instantiated objects.
+        __by_class (dict): The objects of __objects grouped by class name.
+        __attr_indexes (dict): Class names mapped to the AttributeIndex
+            of each attribute in the class's __indexes__.
+        __range_indexes (dict): Class names mapped to the RangeIndex of
+            each attribute in the class's __ranges__.
+        __geo_indexes (dict): Class names mapped to the GeoIndex of the
+            latitude and longitude attributes in the class's __geo__.
+        __set_indexes (dict): Class names mapped to the SetIndex of each
+            list attribute in the class's __sets__.
+        __text_indexes (dict): Class names mapped to the TextIndex of the
+            string attributes in the class's __fulltext__.
+        __aggregates (dict): Class names mapped to the Aggregate of each
+            attribute in the class's __aggregates__.
+        __class_indexes (dict): Class names mapped to the list of all
+            their indexes.
+        __indexed (dict): The __objects dictionary the indexes were built for.
+        __deferred (dict): Class names mapped to the keys and objects added
+            inside a transaction and not indexed yet; the indexes of a
+            class take them all at once when it is queried or when the
+            outermost transaction is committed.
+        __journal (bool): Append changes to a log next to __file_path
+            instead of rewriting the whole file on every save.
+        __journal_limit (int): Number of log entries after which the log
+            is compacted back into __file_path.
+        __journal_size (int): Number of entries currently in the log.
+        __pending (set): Keys created, updated or deleted since the last save.
+        __cache (dict): Keys mapped to the serialized "<key>": {...} entry
+            written for them by the last save, dropped once they change.
+        __copies (dict): Keys of __cache mapped to copies of the list and
+            dictionary values of their object when it was serialized, to
+            find the ones changed in place, e.g. by list.append(), which
+            do not go through touch().
+        __removed (dict): Keys deleted since the last save mapped to their
+            object, which rollback() restores in place.
+        __detached (weakref.WeakSet): The objects created in a rolled back
+            transaction, which new() and save() refuse.
+        __stream (bool): Parse __file_path one entry at a time on reload
+            instead of loading the whole JSON document first.
+        __lazy (bool): Keep the dictionaries read on reload in __raw and
+            only build each object the first time it is asked for.
+        __raw (dict): Class names mapped to the dictionaries, keyed like
+            __objects, of the objects not built yet.
+        __shards (str): A directory holding one <class name>.json file per
+            class instead of __file_path, or None for the single file.
+        __loaded (set): The class names whose shard was read.
+        __snapshot (str): A binary snapshot (models/engine/snapshot.py)
+            read and written instead of __file_path, whose objects are
+            decoded from the mapped file when they are asked for, or
+            None for __file_path. It is not used with shards.
+        __mapped (snapshot.Snapshot): The snapshot mapping the Records of
+            __raw read from, closed when a reload or a compaction maps
+            the file again, or None.
+        __fsync (str): When written files are forced to disk: "always" on
+            every save, "never", or a number of milliseconds to group the
+            fsyncs of the saves made within that delay. Except with
+            "never", a rewritten file is forced to disk before it is
+            renamed over the old one.
+        __synced_at (float): The time.monotonic() of the last flush.
+        __unsynced (set): The paths written but not forced to disk yet.
+        __flush_at_exit (bool): Whether flush() is registered to run at exit.
+        __timer (threading.Timer): The timer running flush() at the end of
+            the group commit delay, or None.
+        __lock (threading.Lock): Guards __unsynced and __timer, shared with
+            the timer thread.
+        __depth (int): The number of transactions begun and not finished;
+            save() writes nothing while it is not 0.
+        __savepoints (list): One dictionary per transaction begun, mapping
+            the keys already pending when it began to the dictionary of
+            their object then, or None if it was deleted.
     """
     __file_path = "file.json"
     __objects = {}
+    __by_class = {}
+    __attr_indexes = {}
+    __range_indexes = {}
+    __geo_indexes = {}
+    __set_indexes = {}
+    __text_indexes = {}
+    __aggregates = {}
+    __class_indexes = {}
+    __indexed = None
+    __deferred = {}
+    __journal = getenv("HBNB_FILE_JOURNAL") == "1"
+    __journal_limit = 1000
+    __journal_size = 0
+    __pending = set()
+    __cache = {}
+    __copies = {}
+    __removed = {}
+    __detached = weakref.WeakSet()
+    __stream = getenv("HBNB_FILE_STREAM") == "1"
+    __lazy = getenv("HBNB_FILE_LAZY") == "1"
+    __raw = {}
+    __shards = getenv("HBNB_FILE_SHARDS") or None
+    __loaded = set()
+    __snapshot = getenv("HBNB_FILE_SNAPSHOT") or None
+    __mapped = None
+    __fsync = getenv("HBNB_FILE_FSYNC", "never")
+    if __fsync not in ("always", "never") and not __fsync.isdigit():
+        __fsync = "never"
+    __synced_at = 0.0
+    __unsynced = set()
+    __flush_at_exit = False
+    __timer = None
+    __lock = threading.Lock()
+    __depth = 0
+    __savepoints = []
+
+    def all(self, cls=None):
+        """Return the dictionary __objects, or a dictionary of the
+        objects of one class when cls (a class or class name) is given.
+        """
+        self.__sync()
+        if cls is None:
+            self.__hydrate()
+            return FileStorage.__objects
+        name = self.__name(cls)
+        self.__hydrate(name)
+        return dict(FileStorage.__by_class.get(name, {}))
+
+    def iterate(self, cls=None):
+        """Yield the objects stored, or those of one class when cls (a
+        class or class name) is given, building the objects not built yet
+        one at a time instead of all of them first.
+        """
+        self.__sync()
+        if cls is None:
+            yield from list(FileStorage.__objects.values())
+            names = list(FileStorage.__raw)
+        else:
+            name = self.__name(cls)
+            yield from list(FileStorage.__by_class.get(name, {}).values())
+            names = [name]
+        for name in names:
+            raws = FileStorage.__raw.get(name, {})
+            for key in list(raws):
+                if key in raws:
+                    yield self.__load(key, raws.pop(key))
+
+    def count(self, cls=None):
+        """Return the number of objects stored, optionally of one class."""
+        self.__sync()
+        raw = FileStorage.__raw
+        if cls is None:
+            return (len(FileStorage.__objects) +
+                    sum(len(raws) for raws in raw.values()))
+        name = self.__name(cls)
+        return (len(FileStorage.__by_class.get(name, {})) +
+                len(raw.get(name, {})))
+
+    def get(self, cls, id):
+        """Return the object of cls (a class or class name) with the
+        given id, or None if there is none.
+        """
+        self.__sync()
+        name = self.__name(cls)
+        key = "{}.{}".format(name, id)
+        obj = FileStorage.__objects.get(key)
+        if obj is None and key in FileStorage.__raw.get(name, {}):
+            obj = self.__load(key, FileStorage.__raw[name].pop(key))
+        return obj
+
+    def find(self, cls, **filters):
+        """Return a dictionary of the objects of cls whose attributes are
+        equal to the given filters, looked up through an attribute index
+        when one of the filters has one.
+        """
+        self.__sync()
+        name = self.__name(cls)
+        self.__hydrate(name)
+        indexes = FileStorage.__attr_indexes.get(name, {})
+        candidates = None
+        for attr, value in filters.items():
+            if attr in indexes:
+                bucket = indexes[attr].find(value)
+                if bucket is not None and (candidates is None or
+                                           len(bucket) < len(candidates)):
+                    candidates = bucket
+        if candidates is None:
+            candidates = FileStorage.__by_class.get(name, {})
+        return {key: obj for key, obj in candidates.items()
+                if all(getattr(obj, attr, None) == value
+                       for attr, value in filters.items())}
+
+    def find_in(self, cls, attr, values):
+        """Return a dictionary of the values of values some objects of
+        cls hold in their attribute attr, each mapped to the dictionary of
+        those objects; ids are looked up directly, the other attributes
+        through their attribute index when they have one.
+        """
+        self.__sync()
+        name = self.__name(cls)
+        found = {}
+        if attr == "id":
+            for value in values:
+                obj = self.get(name, value) if type(value) is str else None
+                if obj is not None:
+                    found[value] = {"{}.{}".format(name, value): obj}
+            return found
+        self.__hydrate(name)
+        index = FileStorage.__attr_indexes.get(name, {}).get(attr)
+        if index is not None:
+            for value in values:
+                bucket = index.find(value)
+                if bucket:
+                    found[value] = dict(bucket)
+            return found
+        wanted = set()
+        for value in values:
+            try:
+                wanted.add(value)
+            except TypeError:
+                pass
+        for key, obj in FileStorage.__by_class.get(name, {}).items():
+            value = getattr(obj, attr, None)
+            try:
+                if value not in wanted:
+                    continue
+            except TypeError:
+                continue
+            found.setdefault(value, {})[key] = obj
+        return found
+
+    def range(self, cls, attr, low=None, high=None, include_low=True,
+              include_high=True, reverse=False):
+        """Yield the objects of cls whose attribute attr is a number
+        between low and high (None for no bound), sorted on attr, in
+        descending order if reverse. The range index of attr is used when
+        attr is in the class's __ranges__, one is built for the call
+        otherwise.
+        """
+        self.__sync()
+        name = self.__name(cls)
+        self.__hydrate(name)
+        index = FileStorage.__range_indexes.get(name, {}).get(attr)
+        if index is None:
+            index = RangeIndex(attr)
+            for key, obj in FileStorage.__by_class.get(name, {}).items():
+                index.add(key, obj)
+        yield from index.range(low, high, include_low, include_high,
+                               reverse)
+
+    def having(self, cls, attr, values, mode="all"):
+        """Return a dictionary of the objects of cls whose list attribute
+        attr holds every one of values (mode "all") or at least one of them
+        (mode "any"), found by intersecting or joining the bitmaps of the
+        set index of attr when attr is in the class's __sets__.
+        Raises:
+            ValueError: If mode is neither "all" nor "any".
+        """
+        if mode not in ("all", "any"):
+            raise ValueError("mode must be 'all' or 'any'")
+        self.__sync()
+        name = self.__name(cls)
+        self.__hydrate(name)
+        index = FileStorage.__set_indexes.get(name, {}).get(attr)
+        if index is None:
+            index = SetIndex(attr)
+            for key, obj in FileStorage.__by_class.get(name, {}).items():
+                index.add(key, obj)
+        return index.find(values, mode)
 
-    def all(self):
-        """Return the dictionary __objects."""
-        return FileStorage.__objects
+    def search(self, cls, text, limit=None):
+        """Return the (score, object) pairs of the objects of cls whose
+        __fulltext__ attributes hold every word of text, or a word
+        starting like a word of text followed by *, best match first and
+        at most limit of them; [] if cls declares no __fulltext__.
+        """
+        self.__sync()
+        name = self.__name(cls)
+        self.__hydrate(name)
+        index = FileStorage.__text_indexes.get(name)
+        if index is None:
+            return []
+        return [(score, obj) for score, key, obj in index.search(text, limit)]
+
+    def aggregate(self, cls, attr, value=None):
+        """Return the {"count", "sum", "avg"} statistics of the objects
+        of cls whose attribute attr is value, or a dictionary of those of
+        every value of attr if value is None. They are read from the
+        Aggregate kept for attr when attr is in the class's __aggregates__,
+        which sums and averages the fields declared with it; objects are
+        counted for the call otherwise.
+        """
+        self.__sync()
+        name = self.__name(cls)
+        self.__hydrate(name)
+        aggregate = FileStorage.__aggregates.get(name, {}).get(attr)
+        if aggregate is None:
+            aggregate = Aggregate(attr)
+            for key, obj in FileStorage.__by_class.get(name, {}).items():
+                aggregate.add(key, obj)
+        if value is None:
+            return {value: aggregate.stats(value)
+                    for value in aggregate.groups}
+        return aggregate.stats(value)
+
+    def check_aggregates(self):
+        """Return the list of the differences between the aggregates
+        kept and the ones recomputed from every object, as
+        "<class>.<attribute> <value>: <statistic> <kept> != <expected>"
+        strings; empty when they agree.
+        """
+        self.__sync()
+        errors = []
+        for name, aggregates in FileStorage.__aggregates.items():
+            if not aggregates:
+                continue
+            self.__hydrate(name)
+            for attr, kept in aggregates.items():
+                expected = Aggregate(attr, kept.fields)
+                for key, obj in FileStorage.__by_class.get(name,
+                                                          {}).items():
+                    expected.add(key, obj)
+                for value in set(kept.groups) | set(expected.groups):
+                    have, want = kept.stats(value), expected.stats(value)
+                    pairs = [("count", have["count"], want["count"])]
+                    pairs += [("sum " + field, have["sum"][field],
+                               want["sum"][field]) for field in kept.fields]
+                    for what, got, total in pairs:
+                        if not math.isclose(got, total, abs_tol=1e-9):
+                            errors.append("{}.{} {!r}: {} {} != {}".format(
+                                name, attr, value, what, got, total))
+        return errors
+
+    def near(self, lat, lon, radius_km, limit=None, cls=None):
+        """Return the (distance in km, object) pairs of the objects within
+        radius_km of the point lat, lon, nearest first and at most limit
+        of them, among the classes declaring __geo__ (or cls only).
+        """
+        found = []
+        for index in self.__geo(cls):
+            found += index.near(lat, lon, radius_km, limit)
+        found.sort(key=lambda item: item[:2])
+        return [(distance, obj) for distance, key, obj in found[:limit]]
+
+    def bbox(self, south, west, north, east, cls=None):
+        """Return a dictionary of the objects within the bounding box,
+        which crosses the antimeridian when west > east, among the classes
+        declaring __geo__ (or cls only).
+        """
+        found = {}
+        for index in self.__geo(cls):
+            found.update(index.bbox(south, west, north, east))
+        return found
 
     def new(self, obj):
-        """Set in __objects obj with key <obj_class_name>.id"""
-        FileStorage.__objects["{}.{}".format(obj.__class__.__name__, obj.id)] = obj
+        """Set in __objects obj with key <obj_class_name>.id
+        Raises:
+            ValueError: If obj was created in a rolled back transaction.
+        """
+        if obj in FileStorage.__detached:
+            raise ValueError("object was rolled back")
+        name = obj.__class__.__name__
+        key = "{}.{}".format(name, obj.id)
+        self.__sync()
+        if key in FileStorage.__raw.get(name, {}):
+            del FileStorage.__raw[name][key]
+        self.__add(key, obj)
+        FileStorage.__pending.add(key)
+
+    def touch(self, obj, attr=None):
+        """Mark a stored obj as changed so the next save writes it again,
+        and reindex it on attr, or on every indexed attribute if None.
+        """
+        name = obj.__class__.__name__
+        key = "{}.{}".format(name, obj.id)
+        self.__sync()
+        if FileStorage.__objects.get(key) is not obj:
+            return
+        FileStorage.__pending.add(key)
+        if key in FileStorage.__deferred.get(name, ()):
+            return
+        for index in FileStorage.__class_indexes.get(name, ()):
+            if attr is None or attr in index.attrs:
+                index.add(key, obj)
+
+    def delete(self, obj=None):
+        """Delete obj from __objects if it's inside."""
+        if obj is None:
+            return
+        name = obj.__class__.__name__
+        key = "{}.{}".format(name, obj.id)
+        self.__sync()
+        if FileStorage.__raw.get(name, {}).pop(key, None) is not None:
+            FileStorage.__pending.add(key)
+        if FileStorage.__objects.get(key) is obj:
+            FileStorage.__removed[key] = obj
+        if self.__discard(key):
+            FileStorage.__pending.add(key)
 
     def save(self):
-        """Serialize __objects to JSON file __file_path."""
+        """Serialize __objects to JSON file __file_path.
+        Only the objects changed since the last save are serialized again,
+        the others are written from __cache; an object whose list or
+        dictionary values were changed in place counts as changed, and is
+        reindexed then (storage.touch(obj) reindexes it at once).
+        With the journal enabled only the objects changed since the last
+        save are appended to the log, which is folded back into
+        __file_path once it holds more than __journal_limit entries.
+        With shards only the files of the classes that changed are
+        rewritten; the journal is not used. Inside a transaction nothing
+        is written until it is committed.
+        """
+        if FileStorage.__depth:
+            return
+        self.__sync()
+        self.__find_changed()
+        pending = FileStorage.__pending
+        cache = FileStorage.__cache
+        for key in pending:
+            cache.pop(key, None)
+            FileStorage.__copies.pop(key, None)
+        if FileStorage.__shards is not None:
+            if not os.path.isdir(FileStorage.__shards):
+                self.__migrate()
+            for name in {key.split(".", 1)[0] for key in pending}:
+                if name not in FileStorage.__loaded:
+                    self.__merge(name)
+                self.__write(self.__shard_path(name), self.__parts(
+                    FileStorage.__by_class.get(name, {}),
+                    FileStorage.__raw.get(name, {})))
+        elif (not FileStorage.__journal or
+                FileStorage.__journal_size + len(pending) >
+                FileStorage.__journal_limit):
+            self.__compact()
+        elif pending:
+            self.__append(pending)
+        pending.clear()
+        FileStorage.__removed.clear()
+
+    def begin(self):
+        """Start a transaction: write the pending changes, then buffer
+        every change until commit() or rollback(). Transactions nest and
+        only the outermost commit() writes; a nested one records the
+        objects its enclosing transactions changed so far, so that
+        rolling it back restores them.
+        """
+        self.__sync()
+        if FileStorage.__depth == 0 and FileStorage.__pending:
+            self.save()
+        savepoint = {}
+        for key in FileStorage.__pending:
+            obj = FileStorage.__objects.get(key)
+            savepoint[key] = None if obj is None else obj.to_dict()
+        FileStorage.__savepoints.append(savepoint)
+        FileStorage.__depth += 1
+
+    def commit(self):
+        """End a transaction, writing its changes in a single save if it
+        is the outermost one and there are any.
+        """
+        if FileStorage.__depth:
+            FileStorage.__depth -= 1
+            FileStorage.__savepoints.pop()
+        if FileStorage.__depth == 0:
+            self.__index()
+        if FileStorage.__pending:
+            self.save()
+
+    def rollback(self):
+        """End the innermost transaction, discarding the changes made
+        since it began, or outside a transaction those made since the
+        last save: the objects created are dropped, and detached so that
+        saving them again raises ValueError, and those updated or deleted
+        are reset in place as they were, so references already held see
+        the restored values. The enclosing transactions go on.
+        """
+        self.__sync()
+        savepoint = {}
+        if FileStorage.__depth:
+            FileStorage.__depth -= 1
+            savepoint = FileStorage.__savepoints.pop()
+        pending = FileStorage.__pending
+        saved = self.__saved(pending - set(savepoint))
+        saved.update(savepoint)
+        removed = FileStorage.__removed
+        for key in pending:
+            FileStorage.__raw.get(key.split(".", 1)[0], {}).pop(key, None)
+            held = removed.pop(key, None)
+            obj = FileStorage.__objects.get(key)
+            self.__discard(key)
+            a = saved.get(key)
+            if obj is not held and obj is not None and (
+                    a is None or held is not None):
+                FileStorage.__detached.add(obj)
+                obj = None
+            if obj is None:
+                obj = held
+            if a is not None:
+                if obj is None:
+                    self.__load(key, a)
+                else:
+                    obj._reset(a)
+                    FileStorage.__detached.discard(obj)
+                    self.__add(key, obj)
+            elif key in savepoint:
+                if obj is not None:
+                    removed[key] = obj
+            elif obj is not None:
+                FileStorage.__detached.add(obj)
+        pending.clear()
+        pending.update(savepoint)
+
+    def in_transaction(self):
+        """Return True if a transaction is in progress."""
+        return FileStorage.__depth > 0
+
+    @contextmanager
+    def batch(self):
+        """Return a context manager running its block in a transaction,
+        committed at the end of the block or rolled back if an exception
+        escapes it.
+        """
+        self.begin()
+        try:
+            yield self
+        except BaseException:
+            self.rollback()
+            raise
+        self.commit()
+
+    def flush(self):
+        """Force the files written since the last flush, and the
+        directories holding them, to disk.
+        """
+        with FileStorage.__lock:
+            paths = FileStorage.__unsynced
+            FileStorage.__unsynced = set()
+            timer = FileStorage.__timer
+            FileStorage.__timer = None
+            FileStorage.__synced_at = time.monotonic()
+        if timer is not None:
+            timer.cancel()
+        directories = set()
+        for path in paths:
+            self.__fsync_path(path)
+            directories.add(os.path.dirname(path) or ".")
+        for directory in directories:
+            self.__fsync_path(directory)
+
+    def reload(self, *, classes=None):
+        """ Deserialize the JSON file __file_path to __objects,
+        then replay any journal entries written after it. With a
+        snapshot its objects are only decoded when they are asked for.
+        Args:
+            classes (list): The classes (or class names) to load. With
+                shards the files of the other classes are not read; with
+                a single file their objects are kept unbuilt, as in lazy
+                mode, until they are asked for.
+        """
+        names = None
+        if classes is not None:
+            names = {self.__name(cls) for cls in classes}
+        journal = {}
+        if FileStorage.__shards is None:
+            FileStorage.__journal_size = self.__replay(journal)
+        elif not os.path.isdir(FileStorage.__shards):
+            self.__migrate()
+        self.__sync()
+        if FileStorage.__shards is None and FileStorage.__snapshot:
+            self.__map(journal)
+            for name in names or ():
+                self.__hydrate(name)
+            return
+        load = self.__defer if FileStorage.__lazy else self.__load
+        for key, a in self.__entries(names):
+            if key in journal:
+                a = journal.pop(key)
+                if a is None:
+                    continue
+            if names is None or a["__class__"] in names:
+                load(key, a)
+            else:
+                self.__defer(key, a)
+        for key, a in journal.items():
+            if a is not None:
+                if names is None or a["__class__"] in names:
+                    load(key, a)
+                else:
+                    self.__defer(key, a)
+
+    def __map(self, journal):
+        """Keep the objects of the snapshot in __raw, creating it from
+        __file_path if it does not exist, and apply the journal entries
+        of journal. The objects built from an older read are dropped in
+        favour of the snapshot, as a reload of __file_path replaces them.
+        """
+        path = FileStorage.__snapshot
+        if not os.path.exists(path):
+            with self.__replacing(path, "wb") as f:
+                snapshot.write(f, ((key, codec.dumps(a).encode()) for key, a
+                                   in self.__read(FileStorage.__file_path)))
+        self.__remap()
+        raw = FileStorage.__raw
+        for key in list(FileStorage.__objects):
+            if key in raw.get(key.split(".", 1)[0], {}):
+                self.__discard(key)
+        for key, a in journal.items():
+            if a is None:
+                raw.get(key.split(".", 1)[0], {}).pop(key, None)
+            else:
+                self.__discard(key)
+                self.__defer(key, a)
+
+    def __remap(self, built=None):
+        """Map the snapshot again and read __raw from it, leaving out the
+        keys of the objects in built, a dictionary like __by_class, and
+        close the mapping read so far.
+        """
+        snap = snapshot.Snapshot(FileStorage.__snapshot)
+        raw = FileStorage.__raw
+        for name in classes:
+            records = snapshot.Records(snap, name)
+            for key in (built or {}).get(name, ()):
+                try:
+                    del records[key]
+                except KeyError:
+                    pass
+            raw[name] = records
+        if FileStorage.__mapped is not None:
+            FileStorage.__mapped.close()
+        FileStorage.__mapped = snap
+
+    def __entries(self, names=None):
+        """Yield the key and dictionary of each object in __file_path,
+        or in the shards of the classes in names (all if None).
+        """
+        if FileStorage.__shards is None:
+            yield from self.__read(FileStorage.__file_path)
+            return
+        for name in classes if names is None else names:
+            FileStorage.__loaded.add(name)
+            yield from self.__read(self.__shard_path(name))
+
+    def __read(self, path):
+        """Yield the key and dictionary of each object in the file path."""
+        try:
+            if path == FileStorage.__snapshot:
+                with snapshot.Snapshot(path) as snap:
+                    yield from snap.items()
+                return
+            with open(path) as f:
+                if FileStorage.__stream:
+                    yield from iter_items(f)
+                else:
+                    yield from codec.loads(f.read()).items()
+        except FileNotFoundError:
+            return
+
+    def __load(self, key, a):
+        """Build and return the object described by the dictionary a,
+        stored under key.
+        """
+        obj = classes[a["__class__"]].from_dict(a)
+        self.__add(key, obj)
+        return obj
+
+    def __defer(self, key, a):
+        """Keep the dictionary a in __raw until its object is needed."""
+        raw = FileStorage.__raw
+        if a["__class__"] not in raw:
+            raw[a["__class__"]] = {}
+        raw[a["__class__"]][key] = a
+
+    def __hydrate(self, name=None):
+        """Build the objects still in __raw, or only those of class name,
+        and index the deferred ones.
+        """
+        raw = FileStorage.__raw
+        for cls_name in list(raw) if name is None else [name]:
+            for key, a in raw.pop(cls_name, {}).items():
+                self.__load(key, a)
+        self.__index(name)
+
+    def __index(self, name=None):
+        """Add the objects of __deferred, or only those of class name, to
+        the indexes of their class, each index taking them in one call.
+        """
+        deferred = FileStorage.__deferred
+        for cls_name in list(deferred) if name is None else [name]:
+            objs = deferred.pop(cls_name, None)
+            if objs:
+                for index in FileStorage.__class_indexes.get(cls_name, ()):
+                    index.extend(objs.items())
+
+    def __name(self, cls):
+        """Return the class name of cls, which is a class or a name."""
+        return cls if type(cls) is str else cls.__name__
+
+    def __add(self, key, obj):
+        """Put obj in __objects and in the indexes of its class, or in
+        __deferred if it is new and a transaction is in progress.
+        """
+        name = obj.__class__.__name__
+        deferred = FileStorage.__deferred.get(name, ())
+        if FileStorage.__depth and (key not in FileStorage.__objects or
+                                    key in deferred):
+            FileStorage.__deferred.setdefault(name, {})[key] = obj
+            indexes = ()
+        else:
+            indexes = FileStorage.__class_indexes.get(name, ())
+        FileStorage.__objects[key] = obj
+        if name not in FileStorage.__by_class:
+            FileStorage.__by_class[name] = {}
+        FileStorage.__by_class[name][key] = obj
+        for index in indexes:
+            index.add(key, obj)
+
+    def __geo(self, cls=None):
+        """Return the geo indexes of every class, or of cls only, with
+        their objects built.
+        """
+        self.__sync()
+        names = (list(FileStorage.__geo_indexes) if cls is None
+                 else [self.__name(cls)])
+        for name in names:
+            self.__hydrate(name)
+        return [FileStorage.__geo_indexes[name] for name in names
+                if name in FileStorage.__geo_indexes]
+
+    def __discard(self, key):
+        """Remove the object stored under key from __objects and the
+        indexes, and return True if there was one.
+        """
+        obj = FileStorage.__objects.pop(key, None)
+        if obj is None:
+            return False
+        name = obj.__class__.__name__
+        FileStorage.__by_class[name].pop(key, None)
+        FileStorage.__deferred.get(name, {}).pop(key, None)
+        for index in FileStorage.__class_indexes.get(name, ()):
+            index.remove(key)
+        return True
+
+    def __saved(self, keys):
+        """Return the dictionaries last saved for the given keys, read back
+        from __file_path and its journal, looked up one by one in the
+        snapshot, or read from the shards; keys deleted or never saved are
+        missing or mapped to None.
+        """
+        saved = {}
+        if not keys:
+            return saved
+        journal = {}
+        if FileStorage.__shards is None:
+            self.__replay(journal)
+            paths = [FileStorage.__file_path]
+            if FileStorage.__snapshot is not None:
+                paths = []
+                try:
+                    with snapshot.Snapshot(FileStorage.__snapshot) as snap:
+                        for key in keys:
+                            a = snap.get(key)
+                            if a is not None:
+                                saved[key] = a
+                except FileNotFoundError:
+                    pass
+        else:
+            paths = [self.__shard_path(name)
+                     for name in {key.split(".", 1)[0] for key in keys}]
+        for path in paths:
+            for key, a in self.__read(path):
+                if key in keys:
+                    saved[key] = a
+        saved.update((key, a) for key, a in journal.items() if key in keys)
+        return saved
+
+    def __sync(self):
+        """Rebuild the indexes if __objects was replaced."""
+        if FileStorage.__indexed is FileStorage.__objects:
+            return
+        FileStorage.__indexed = FileStorage.__objects
+        FileStorage.__raw = {}
+        FileStorage.__cache = {}
+        FileStorage.__copies = {}
+        FileStorage.__by_class = {}
+        FileStorage.__deferred = {}
+        FileStorage.__attr_indexes = {
+            name: {attr: AttributeIndex(attr)
+                   for attr in getattr(cls, "__indexes__", ())}
+            for name, cls in classes.items()}
+        FileStorage.__range_indexes = {
+            name: {attr: RangeIndex(attr)
+                   for attr in getattr(cls, "__ranges__", ())}
+            for name, cls in classes.items()}
+        FileStorage.__geo_indexes = {
+            name: GeoIndex(cls.__geo__) for name, cls in classes.items()
+            if getattr(cls, "__geo__", None)}
+        FileStorage.__set_indexes = {
+            name: {attr: SetIndex(attr)
+                   for attr in getattr(cls, "__sets__", ())}
+            for name, cls in classes.items()}
+        FileStorage.__text_indexes = {
+            name: TextIndex(cls.__fulltext__) for name, cls in classes.items()
+            if getattr(cls, "__fulltext__", None)}
+        FileStorage.__aggregates = {
+            name: {attr: Aggregate(attr, fields) for attr, fields in
+                   getattr(cls, "__aggregates__", {}).items()}
+            for name, cls in classes.items()}
+        FileStorage.__class_indexes = {}
+        for name in classes:
+            indexes = (list(FileStorage.__attr_indexes[name].values()) +
+                       list(FileStorage.__range_indexes[name].values()) +
+                       list(FileStorage.__set_indexes[name].values()))
+            if name in FileStorage.__geo_indexes:
+                indexes.append(FileStorage.__geo_indexes[name])
+            if name in FileStorage.__text_indexes:
+                indexes.append(FileStorage.__text_indexes[name])
+            indexes += FileStorage.__aggregates[name].values()
+            FileStorage.__class_indexes[name] = indexes
+        for key, obj in list(FileStorage.__objects.items()):
+            self.__add(key, obj)
+
+    def __log_path(self):
+        """Return the path of the journal kept next to __file_path."""
+        return FileStorage.__file_path + ".log"
+
+    def __append(self, keys):
+        """Append the entries of keys to the journal: the dictionary of
+        their object, or None if it was deleted.
+        """
         odict = FileStorage.__objects
-        objdict = {obj: odict[obj].to_dict() for obj in odict.keys()}
-        with open(FileStorage.__file_path, "w") as f:
-            json.dump(objdict, f)
+        lines = []
+        for key in keys:
+            if key in odict:
+                lines.append("{" + self.__entry(key, odict[key]) + "}\n")
+            else:
+                lines.append(codec.dumps({key: None}) + "\n")
+        with open(self.__log_path(), "a") as f:
+            f.write("".join(lines))
+            if FileStorage.__fsync == "always":
+                f.flush()
+                os.fsync(f.fileno())
+        self.__durable(self.__log_path())
+        FileStorage.__journal_size += len(lines)
+
+    def __compact(self):
+        """Rewrite __file_path, or the snapshot, with every object and
+        drop the journal. The pending changes are appended to the journal
+        first, and forced to disk unless fsync is "never", so that a
+        journal left behind by a crash before it is dropped replays to
+        the state just written instead of undoing it.
+        """
+        if FileStorage.__journal_size and FileStorage.__pending:
+            self.__append(FileStorage.__pending)
+            if FileStorage.__fsync != "never":
+                self.flush()
+        if FileStorage.__snapshot:
+            with self.__replacing(FileStorage.__snapshot, "wb") as f:
+                snapshot.write(f, self.__records())
+            if FileStorage.__mapped is not None:
+                self.__remap(FileStorage.__by_class)
+        else:
+            parts = self.__parts(FileStorage.__objects, {})
+            for raws in FileStorage.__raw.values():
+                parts += self.__parts({}, raws)
+            self.__write(FileStorage.__file_path, parts)
+        if FileStorage.__journal_size:
+            try:
+                os.remove(self.__log_path())
+            except FileNotFoundError:
+                pass
+            FileStorage.__journal_size = 0
+
+    def __parts(self, objs, raws):
+        """Return the serialized entries of the objects in objs and of the
+        dictionaries in raws, reusing those in __cache.
+        """
+        cache = FileStorage.__cache
+        parts = []
+        for key, obj in objs.items():
+            parts.append(cache[key] if key in cache
+                         else self.__entry(key, obj))
+        for key, a in raws.items():
+            if key not in cache:
+                cache[key] = self.__dump(key, a)
+            parts.append(cache[key])
+        return parts
 
-    def reload(self):
-        """ Deserialize the JSON file __file_path to __objects"""
+    def __records(self):
+        """Yield the key and encoded dictionary of every object, for a
+        snapshot: the entries of __cache are reused and the objects not
+        built yet are copied from the snapshot they were read from.
+        """
+        cache = FileStorage.__cache
+        for key, obj in FileStorage.__objects.items():
+            entry = cache[key] if key in cache else self.__entry(key, obj)
+            yield key, entry[len(codec.dumps(key)) + 2:].encode()
+        for raws in FileStorage.__raw.values():
+            for key in raws:
+                if isinstance(raws, snapshot.Records):
+                    yield key, raws.payload(key)
+                else:
+                    yield key, codec.dumps(raws[key]).encode()
+
+    def __write(self, path, parts):
+        """Write the JSON object made of the entries parts over path."""
+        with self.__replacing(path) as f:
+            f.write("{" + ", ".join(parts) + "}")
+
+    @contextmanager
+    def __replacing(self, path, mode="w"):
+        """Return a context manager giving a temporary file opened with
+        mode and renamed over path at the end of the block, so that a
+        crash leaves either the old or the new file and never a
+        truncated one.
+        """
+        tmp = path + ".tmp"
+        with open(tmp, mode) as f:
+            yield f
+            if FileStorage.__fsync != "never":
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+        self.__durable(path)
+
+    def __durable(self, path):
+        """Apply the fsync policy to the file path just written: flush now,
+        or once the group commit delay has passed since the last flush,
+        from a timer thread (or at the exit of the interpreter).
+        """
+        policy = FileStorage.__fsync
+        if policy == "never":
+            return
+        delay = 0 if policy == "always" else int(policy) / 1000
+        with FileStorage.__lock:
+            FileStorage.__unsynced.add(path)
+            left = delay - (time.monotonic() - FileStorage.__synced_at)
+            if left > 0 and FileStorage.__timer is None:
+                FileStorage.__timer = threading.Timer(left, self.flush)
+                FileStorage.__timer.daemon = True
+                FileStorage.__timer.start()
+        if left <= 0:
+            self.flush()
+        elif not FileStorage.__flush_at_exit:
+            atexit.register(self.flush)
+            FileStorage.__flush_at_exit = True
+
+    def __fsync_path(self, path):
+        """Force the file or directory path to disk if it still exists."""
         try:
-            with open(FileStorage.__file_path) as f:
-                objdict = json.load(f)
-                for a in onjdict.values():
-                    cls_name = a["__class__"]
-                    del a["__class__"]
-                    self.new(eval(cls_name)(**a))
+            fd = os.open(path, os.O_RDONLY)
         except FileNotFoundError:
             return
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def __shard_path(self, name):
+        """Return the path of the shard of the class name."""
+        return os.path.join(FileStorage.__shards, name + ".json")
+
+    def __merge(self, name):
+        """Read the shard of the class name, which was not loaded, keeping
+        the objects it holds that are neither in __objects nor deleted, so
+        that rewriting it does not lose them.
+        """
+        for key, a in self.__read(self.__shard_path(name)):
+            if (key not in FileStorage.__objects and
+                    key not in FileStorage.__pending):
+                self.__defer(key, a)
+        FileStorage.__loaded.add(name)
+
+    def __migrate(self):
+        """Create the shards directory from __file_path and its journal,
+        which are left in place.
+        """
+        journal = {}
+        self.__replay(journal)
+        shards = {}
+        for key, a in self.__read(FileStorage.__file_path):
+            if key in journal:
+                a = journal.pop(key)
+            if a is not None:
+                shards.setdefault(a["__class__"], []).append(
+                    self.__dump(key, a))
+        for key, a in journal.items():
+            if a is not None:
+                shards.setdefault(a["__class__"], []).append(
+                    self.__dump(key, a))
+        os.makedirs(FileStorage.__shards)
+        for name, parts in shards.items():
+            self.__write(self.__shard_path(name), parts)
+
+    def __entry(self, key, obj):
+        """Serialize obj into __cache under key, keeping copies of its list
+        and dictionary values in __copies, and return its entry.
+        """
+        a = obj.to_dict()
+        FileStorage.__cache[key] = self.__dump(key, a)
+        copies = {attr: value.copy() for attr, value in a.items()
+                  if type(value) in (list, dict)}
+        if copies:
+            FileStorage.__copies[key] = copies
+        return FileStorage.__cache[key]
+
+    def __find_changed(self):
+        """Touch the objects whose list or dictionary values differ from
+        the copies kept when they were serialized.
+        """
+        odict = FileStorage.__objects
+        changed = []
+        for key, copies in FileStorage.__copies.items():
+            obj = odict.get(key)
+            if obj is not None and any(
+                    getattr(obj, attr, None) != value
+                    for attr, value in copies.items()):
+                changed.append(obj)
+        for obj in changed:
+            self.touch(obj)
+
+    def __dump(self, key, a):
+        """Return the "<key>": {...} entry of a in __file_path."""
+        return codec.dumps(key) + ": " + codec.dumps(a)
+
+    def __replay(self, objdict):
+        """Record in objdict the last dictionary logged for each key, or
+        None if it was deleted, and return the number of entries read.
+        A torn last line left by an interrupted append is cut off so that
+        later appends are not hidden behind it.
+        """
+        count = 0
+        try:
+            with open(self.__log_path(), "r+b") as f:
+                good = 0
+                for line in f:
+                    entry = None
+                    if line.endswith(b"\n"):
+                        try:
+                            entry = codec.loads(line)
+                        except ValueError:
+                            pass
+                    if entry is None:
+                        f.truncate(good)
+                        break
+                    objdict.update(entry)
+                    good += len(line)
+                    count += 1
+        except FileNotFoundError:
+            pass
+        return count
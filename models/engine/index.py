@@ -0,0 +1,835 @@
+#!/usr/bin/python3
+"""Defines the secondary indexes kept by the storage engines.
+
+A model class declares the attributes to index in its __indexes__
+tuple, e.g. City.__indexes__ = ("state_id",), the numeric attributes
+to keep sorted for range queries in its __ranges__ tuple, the latitude
+and longitude attributes to index for spatial queries in its __geo__ pair,
+the list attributes to index by member in its __sets__ tuple, the
+string attributes to search by word in its __fulltext__ tuple, and the
+attributes to count its objects by in its __aggregates__ dictionary,
+mapped to the numeric attributes to sum per group, e.g.
+Place.__aggregates__ = {"city_id": ("price_by_night",)}.
+"""
+
+
+import heapq
+import math
+import re
+from bisect import bisect_left, bisect_right, insort
+
+EARTH_RADIUS_KM = 6371.0088
+WORD = re.compile(r"[^\W_]+")
+TERM = re.compile(r"([^\W_]+)(\*?)")
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Return the great-circle distance in km between two points given
+    in degrees."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) *
+         math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def words(text):
+    """Return the lowercase words of text: runs of letters and digits."""
+    return WORD.findall(text.casefold())
+
+
+def terms(query):
+    """Return the (word, is_prefix) pairs of a search query, a word
+    followed by * matching every word it starts."""
+    found = []
+    for word, star in TERM.findall(query.casefold()):
+        if (word, star == "*") not in found:
+            found.append((word, star == "*"))
+    return found
+
+
+def circle_bbox(lat, lon, radius_km):
+    """Return the (south, west, north, east) box holding every point
+    within radius_km of lat, lon; west > east when it crosses the
+    antimeridian."""
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    south, north = lat - dlat, lat + dlat
+    ratio = 2.0
+    if south > -90 and north < 90:
+        ratio = (math.sin(radius_km / EARTH_RADIUS_KM) /
+                 math.cos(math.radians(lat)))
+    if ratio >= 1:
+        return max(south, -90), -180, min(north, 90), 180
+    dlon = math.degrees(math.asin(ratio))
+    return (south, (lon - dlon + 180) % 360 - 180, north,
+            (lon + dlon + 180) % 360 - 180)
+
+
+class AttributeIndex:
+    """Represent a hash index over one attribute of a model class.
+    Attributes:
+        attr (str): The name of the indexed attribute.
+        attrs (tuple): The attributes whose changes require reindexing.
+        buckets (dict): Indexed values mapped to a dictionary of the
+            <class name>.<id> keys and objects holding that value.
+        values (dict): Keys mapped to the value they are indexed under.
+    """
+
+    def __init__(self, attr):
+        """Initialize an empty index.
+        Args:
+            attr (str): The name of the attribute to index.
+        """
+        self.attr = attr
+        self.attrs = (attr,)
+        self.buckets = {}
+        self.values = {}
+
+    def add(self, key, obj):
+        """Index obj under key, replacing what key was indexed under.
+        Unhashable values are not indexed.
+        """
+        self.remove(key)
+        value = getattr(obj, self.attr, None)
+        try:
+            bucket = self.buckets.setdefault(value, {})
+        except TypeError:
+            return
+        bucket[key] = obj
+        self.values[key] = value
+
+    def extend(self, items):
+        """Index the (key, object) pairs of items."""
+        for key, obj in items:
+            self.add(key, obj)
+
+    def remove(self, key):
+        """Drop key from the index if it's inside."""
+        if key not in self.values:
+            return
+        value = self.values.pop(key)
+        bucket = self.buckets[value]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[value]
+
+    def find(self, value):
+        """Return the dictionary of keys and objects indexed under value,
+        or None if value cannot be looked up in the index.
+        """
+        try:
+            return self.buckets.get(value, {})
+        except TypeError:
+            return None
+
+
+class _Top:
+    """Represent a value greater than any key, to bisect past every
+    (value, key) entry of a value."""
+
+    def __lt__(self, other):
+        return False
+
+    def __gt__(self, other):
+        return True
+
+
+_TOP = _Top()
+
+
+class RangeIndex:
+    """Represent a sorted index over one numeric attribute of a model class.
+    Attributes:
+        attr (str): The name of the indexed attribute.
+        attrs (tuple): The attributes whose changes require reindexing.
+        entries (list): The (value, key) pairs of the indexed objects,
+            sorted.
+        objects (dict): Keys mapped to their object.
+        values (dict): Keys mapped to the value they are indexed under.
+    """
+
+    def __init__(self, attr):
+        """Initialize an empty index.
+        Args:
+            attr (str): The name of the attribute to index.
+        """
+        self.attr = attr
+        self.attrs = (attr,)
+        self.entries = []
+        self.objects = {}
+        self.values = {}
+
+    def add(self, key, obj):
+        """Index obj under key, replacing what key was indexed under.
+        Values other than ints and floats, and NaN, are not indexed.
+        """
+        self.remove(key)
+        value = getattr(obj, self.attr, None)
+        if type(value) not in (int, float) or value != value:
+            return
+        insort(self.entries, (value, key))
+        self.objects[key] = obj
+        self.values[key] = value
+
+    def extend(self, items):
+        """Index the (key, object) pairs of items, sorting the entries
+        once instead of inserting each in order.
+        """
+        entries = []
+        for key, obj in dict(items).items():
+            self.remove(key)
+            value = getattr(obj, self.attr, None)
+            if type(value) not in (int, float) or value != value:
+                continue
+            entries.append((value, key))
+            self.objects[key] = obj
+            self.values[key] = value
+        self.entries += entries
+        self.entries.sort()
+
+    def remove(self, key):
+        """Drop key from the index if it's inside."""
+        if key not in self.values:
+            return
+        value = self.values.pop(key)
+        del self.entries[bisect_left(self.entries, (value, key))]
+        del self.objects[key]
+
+    def range(self, low=None, high=None, include_low=True,
+              include_high=True, reverse=False):
+        """Yield the objects whose value is between low and high (None
+        for no bound) in the order of their value, or the reverse order.
+        Finding the bounds takes O(log N), each object yielded O(1).
+        """
+        entries = self.entries
+        start, end = 0, len(entries)
+        if low is not None:
+            start = bisect_left(entries, (low,) if include_low
+                                else (low, _TOP))
+        if high is not None:
+            end = bisect_right(entries, (high, _TOP) if include_high
+                               else (high,))
+        positions = range(start, end)
+        for i in reversed(positions) if reverse else positions:
+            yield self.objects[entries[i][1]]
+
+
+class GeoIndex:
+    """Represent a grid index over the latitude and longitude attributes
+    of a model class.
+    Attributes:
+        attrs (tuple): The names of the latitude and longitude attributes.
+        cell (float): The size of the grid cells in degrees.
+        cells (dict): (row, column) pairs mapped to a dictionary of the
+            keys and objects of the points in that cell.
+        points (dict): Keys mapped to their (latitude, longitude, cell).
+    """
+
+    def __init__(self, attrs, cell=1.0):
+        """Initialize an empty index.
+        Args:
+            attrs (tuple): The names of the latitude and longitude
+                attributes to index.
+            cell (float): The size of the grid cells in degrees.
+        """
+        self.attrs = tuple(attrs)
+        self.cell = cell
+        self.cells = {}
+        self.points = {}
+
+    def __cell(self, lat, lon):
+        """Return the (row, column) of the cell holding lat, lon; the
+        points on the north pole and the antimeridian (longitude 180) go
+        to the last row and column."""
+        return (min(int((lat + 90) // self.cell),
+                    math.ceil(180 / self.cell) - 1),
+                min(int((lon + 180) // self.cell),
+                    math.ceil(360 / self.cell) - 1))
+
+    def add(self, key, obj):
+        """Index obj under key, replacing what key was indexed under.
+        Points that are not numbers within [-90, 90] x [-180, 180] are not
+        indexed.
+        """
+        self.remove(key)
+        lat = getattr(obj, self.attrs[0], None)
+        lon = getattr(obj, self.attrs[1], None)
+        if (type(lat) not in (int, float) or type(lon) not in (int, float)
+                or not -90 <= lat <= 90 or not -180 <= lon <= 180):
+            return
+        cell = self.__cell(lat, lon)
+        self.cells.setdefault(cell, {})[key] = obj
+        self.points[key] = (lat, lon, cell)
+
+    def extend(self, items):
+        """Index the (key, object) pairs of items."""
+        for key, obj in items:
+            self.add(key, obj)
+
+    def remove(self, key):
+        """Drop key from the index if it's inside."""
+        if key not in self.points:
+            return
+        cell = self.points.pop(key)[2]
+        del self.cells[cell][key]
+        if not self.cells[cell]:
+            del self.cells[cell]
+
+    def bbox(self, south, west, north, east):
+        """Yield the (key, object) pairs of the points within the box,
+        which crosses the antimeridian when west > east.
+        """
+        if west > east:
+            yield from self.bbox(south, west, north, 180)
+            yield from self.bbox(south, -180, north, east)
+            return
+        south, north = max(south, -90), min(north, 90)
+        west, east = max(west, -180), min(east, 180)
+        if south > north:
+            return
+        first, last = self.__cell(south, west), self.__cell(north, east)
+        points = self.points
+        for row in range(first[0], last[0] + 1):
+            for column in range(first[1], last[1] + 1):
+                for key, obj in self.cells.get((row, column), {}).items():
+                    lat, lon = points[key][:2]
+                    if south <= lat <= north and west <= lon <= east:
+                        yield key, obj
+
+    def near(self, lat, lon, radius_km, limit=None):
+        """Return the (distance in km, key, object) triples of the points
+        within radius_km of lat, lon, nearest first, at most limit of them
+        if it is not None.
+        """
+        found = []
+        points = self.points
+        for key, obj in self.bbox(*circle_bbox(lat, lon, radius_km)):
+            distance = haversine(lat, lon, *points[key][:2])
+            if distance <= radius_km:
+                found.append((distance, key, obj))
+        if limit is None:
+            return sorted(found, key=lambda item: item[:2])
+        return heapq.nsmallest(limit, found, key=lambda item: item[:2])
+
+
+NONZERO = re.compile(rb"[^\x00]")
+BITS = [tuple(bit for bit in range(8) if byte >> bit & 1)
+        for byte in range(256)]
+
+
+class SetIndex:
+    """Represent an inverted index over a list attribute of a model class,
+    mapping each member to a bitmap of the objects whose list holds it.
+    Attributes:
+        attr (str): The name of the indexed attribute.
+        attrs (tuple): The attributes whose changes require reindexing.
+        bitmaps (dict): Members mapped to a bytearray whose bit n is set
+            when the object in slot n holds the member.
+        slots (dict): Keys mapped to the slot of their object.
+        keys (list): The key of the object in each slot, or None.
+        free (list): The slots left by removed keys, reused first.
+        objects (dict): Keys mapped to their object.
+        values (dict): Keys mapped to the members they are indexed under.
+    """
+
+    def __init__(self, attr):
+        """Initialize an empty index.
+        Args:
+            attr (str): The name of the attribute to index.
+        """
+        self.attr = attr
+        self.attrs = (attr,)
+        self.bitmaps = {}
+        self.slots = {}
+        self.keys = []
+        self.free = []
+        self.objects = {}
+        self.values = {}
+
+    def __set(self, member, slot, on):
+        """Set or clear the bit of slot in the bitmap of member."""
+        bitmap = self.bitmaps.get(member)
+        if bitmap is None:
+            if not on:
+                return
+            bitmap = self.bitmaps[member] = bytearray()
+        if len(bitmap) <= slot >> 3:
+            bitmap.extend(bytes((slot >> 3) + 1 - len(bitmap)))
+        if on:
+            bitmap[slot >> 3] |= 1 << (slot & 7)
+        else:
+            bitmap[slot >> 3] &= ~(1 << (slot & 7)) & 0xff
+
+    def add(self, key, obj):
+        """Index obj under key, updating only the bits of the members
+        added to or removed from its list since it was last indexed.
+        Values other than lists, tuples and sets, and unhashable members,
+        are not indexed.
+        """
+        value = getattr(obj, self.attr, None)
+        members = set()
+        if type(value) in (list, tuple, set, frozenset):
+            for member in value:
+                try:
+                    members.add(member)
+                except TypeError:
+                    pass
+        if not members:
+            self.remove(key)
+            return
+        old = self.values.get(key, frozenset())
+        if key in self.slots:
+            slot = self.slots[key]
+        else:
+            slot = self.free.pop() if self.free else len(self.keys)
+            if slot == len(self.keys):
+                self.keys.append(key)
+            else:
+                self.keys[slot] = key
+            self.slots[key] = slot
+        for member in old - members:
+            self.__set(member, slot, False)
+        for member in members - old:
+            self.__set(member, slot, True)
+        self.values[key] = frozenset(members)
+        self.objects[key] = obj
+
+    def extend(self, items):
+        """Index the (key, object) pairs of items."""
+        for key, obj in items:
+            self.add(key, obj)
+
+    def remove(self, key):
+        """Drop key from the index if it's inside."""
+        if key not in self.slots:
+            return
+        slot = self.slots.pop(key)
+        for member in self.values.pop(key):
+            self.__set(member, slot, False)
+        del self.objects[key]
+        self.keys[slot] = None
+        self.free.append(slot)
+
+    def find(self, members, mode="all"):
+        """Return the dictionary of keys and objects whose list holds
+        every member of members (mode "all") or at least one (mode
+        "any"), computed as the intersection or union of their bitmaps.
+        """
+        bitmaps = []
+        for member in members:
+            try:
+                bitmap = self.bitmaps.get(member)
+            except TypeError:
+                bitmap = None
+            if bitmap is None:
+                if mode == "all":
+                    return {}
+                continue
+            bitmaps.append(int.from_bytes(bitmap, "little"))
+        if not bitmaps:
+            return {}
+        result = bitmaps[0]
+        for bitmap in bitmaps[1:]:
+            if mode == "all":
+                result &= bitmap
+            else:
+                result |= bitmap
+        data = result.to_bytes((result.bit_length() + 7) // 8, "little")
+        found = {}
+        for match in NONZERO.finditer(data):
+            base = match.start() << 3
+            for bit in BITS[data[match.start()]]:
+                key = self.keys[base + bit]
+                found[key] = self.objects[key]
+        return found
+
+
+class Aggregate:
+    """Represent the number of objects of a model class per value of one
+    attribute, with the sum and mean of numeric attributes per value,
+    kept up to date as objects are added and removed.
+    Attributes:
+        attr (str): The attribute the objects are grouped by.
+        fields (tuple): The numeric attributes summed per group.
+        attrs (tuple): The attributes whose changes require reindexing.
+        groups (dict): Values of attr mapped to a [count, sums, counts]
+            list: the number of objects, and the sum and number of the
+            numeric values of each field.
+        values (dict): Keys mapped to the (value, numbers) they are
+            counted under, numbers holding None for fields that are not
+            numbers.
+    """
+
+    def __init__(self, attr, fields=()):
+        """Initialize an empty aggregate.
+        Args:
+            attr (str): The attribute to group objects by.
+            fields (tuple): The numeric attributes to sum per group.
+        """
+        self.attr = attr
+        self.fields = tuple(fields)
+        self.attrs = (attr,) + self.fields
+        self.groups = {}
+        self.values = {}
+
+    def add(self, key, obj):
+        """Count obj under key, replacing what key was counted under.
+        Objects whose attr is unhashable are not counted.
+        """
+        self.remove(key)
+        value = getattr(obj, self.attr, None)
+        numbers = tuple(n if type(n) in (int, float) else None
+                        for n in (getattr(obj, field, None)
+                                  for field in self.fields))
+        try:
+            group = self.groups.get(value)
+        except TypeError:
+            return
+        if group is None:
+            group = self.groups[value] = [0, [0] * len(self.fields),
+                                          [0] * len(self.fields)]
+        group[0] += 1
+        for i, number in enumerate(numbers):
+            if number is not None:
+                group[1][i] += number
+                group[2][i] += 1
+        self.values[key] = value, numbers
+
+    def extend(self, items):
+        """Index the (key, object) pairs of items."""
+        for key, obj in items:
+            self.add(key, obj)
+
+    def remove(self, key):
+        """Stop counting key if it's counted."""
+        if key not in self.values:
+            return
+        value, numbers = self.values.pop(key)
+        group = self.groups[value]
+        group[0] -= 1
+        if group[0] == 0:
+            del self.groups[value]
+            return
+        for i, number in enumerate(numbers):
+            if number is not None:
+                group[2][i] -= 1
+                group[1][i] = group[1][i] - number if group[2][i] else 0
+
+    def stats(self, value):
+        """Return the {"count", "sum", "avg"} dictionary of the objects
+        whose attr is value, "sum" and "avg" mapping each field to the
+        sum and mean of its numeric values (None for a mean of nothing).
+        """
+        try:
+            group = self.groups.get(value)
+        except TypeError:
+            group = None
+        if group is None:
+            group = [0, [0] * len(self.fields), [0] * len(self.fields)]
+        count, sums, counts = group
+        return {"count": count,
+                "sum": dict(zip(self.fields, sums)),
+                "avg": {field: total / n if n else None for field, total, n
+                        in zip(self.fields, sums, counts)}}
+
+
+class TextIndex:
+    """Represent a full-text inverted index over string attributes of a
+    model class, ranking matches with BM25.
+
+    The keys holding a word are grouped by how many times they hold it
+    and how many words they have, the two figures their BM25 weight for
+    that word depends on, so that a one-word query is ranked by sorting
+    the groups rather than the keys, and the best matches of a query
+    with a limit are read group by group, best first, until no key left
+    can score more than the last match kept.
+
+    Attributes:
+        attrs (tuple): The names of the indexed attributes.
+        postings (dict): Words mapped to a dictionary of (count, length)
+            pairs mapped to a dictionary of the keys holding the word
+            count times among length words.
+        frequencies (dict): Words mapped to the number of keys holding them.
+        lengths (dict): Keys mapped to their number of words.
+        counts (dict): Keys mapped to their words and word counts.
+        objects (dict): Keys mapped to their object.
+        total (int): The number of words of every key.
+        vocabulary (list): The words sorted for prefix lookups; it may
+            hold words no key holds anymore.
+        listed (set): The words in vocabulary.
+        unlisted (set): The words not sorted into vocabulary yet.
+        waiting (dict): Keys mapped to the objects given to extend() and
+            not indexed yet; they are indexed in one pass before the next
+            search or add.
+    """
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, attrs):
+        """Initialize an empty index.
+        Args:
+            attrs (tuple): The names of the string attributes to index.
+        """
+        self.attrs = tuple(attrs)
+        self.postings = {}
+        self.frequencies = {}
+        self.lengths = {}
+        self.counts = {}
+        self.objects = {}
+        self.total = 0
+        self.vocabulary = []
+        self.listed = set()
+        self.unlisted = set()
+        self.waiting = {}
+
+    def add(self, key, obj):
+        """Index the words of the string attributes of obj under key,
+        replacing those key was indexed under. Values that are not
+        strings are not indexed. The waiting objects are indexed first,
+        so that the keys keep the order they were given in.
+        """
+        if key in self.waiting:
+            self.waiting[key] = obj
+            return
+        self.__build()
+        self.remove(key)
+        counts = {}
+        for attr in self.attrs:
+            value = getattr(obj, attr, None)
+            if type(value) is str:
+                for word in words(value):
+                    counts[word] = counts.get(word, 0) + 1
+        if not counts:
+            return
+        length = sum(counts.values())
+        for word, count in counts.items():
+            posting = self.postings.get(word)
+            if posting is None:
+                posting = self.postings[word] = {}
+                self.frequencies[word] = 0
+                if word not in self.listed:
+                    self.unlisted.add(word)
+            posting.setdefault((count, length), {})[key] = None
+            self.frequencies[word] += 1
+        self.counts[key] = counts
+        self.lengths[key] = length
+        self.objects[key] = obj
+        self.total += length
+
+    def extend(self, items):
+        """Queue the (key, object) pairs of items, to be indexed in one
+        pass before the next search or add.
+        """
+        waiting = self.waiting
+        for key, obj in items:
+            if key not in waiting:
+                self.remove(key)
+            waiting[key] = obj
+
+    def remove(self, key):
+        """Drop key from the index if it's inside."""
+        self.waiting.pop(key, None)
+        counts = self.counts.pop(key, None)
+        if counts is None:
+            return
+        length = self.lengths.pop(key)
+        for word, count in counts.items():
+            posting = self.postings[word]
+            group = posting[count, length]
+            del group[key]
+            if not group:
+                del posting[count, length]
+            self.frequencies[word] -= 1
+            if not posting:
+                del self.postings[word]
+                del self.frequencies[word]
+        self.total -= length
+        del self.objects[key]
+
+    def expand(self, prefix):
+        """Return the indexed words starting with prefix."""
+        self.__build()
+        if self.unlisted:
+            self.vocabulary += sorted(self.unlisted)
+            self.vocabulary.sort()
+            self.listed |= self.unlisted
+            self.unlisted = set()
+        found = []
+        for i in range(bisect_left(self.vocabulary, prefix),
+                       len(self.vocabulary)):
+            word = self.vocabulary[i]
+            if not word.startswith(prefix):
+                break
+            if word in self.postings:
+                found.append(word)
+        return found
+
+    def search(self, query, limit=None):
+        """Return the (score, key, object) triples of the keys holding
+        every word of query (or a word it starts, for a word followed by
+        *), best BM25 score first, ties in the order they were indexed,
+        and at most limit of them.
+        """
+        self.__build()
+        groups = []
+        for word, prefix in terms(query):
+            expanded = self.expand(word) if prefix else [word]
+            expanded = [w for w in expanded if w in self.postings]
+            if not expanded:
+                return []
+            groups.append(expanded)
+        if not groups:
+            return []
+        groups.sort(key=lambda group: sum(self.frequencies[w] for w in group))
+        weight = self.__weight()
+        if len(groups) == 1 and len(groups[0]) == 1:
+            word = groups[0][0]
+            idf = self.__idf(word)
+            ranked = sorted(((idf * weight(count, length), keys) for
+                             (count, length), keys in
+                             self.postings[word].items()),
+                            key=lambda item: -item[0])
+            found = []
+            for score, keys in ranked:
+                for key in keys:
+                    if len(found) == limit:
+                        return found
+                    found.append((score, key, self.objects[key]))
+            return found
+        if limit is not None and len(groups[0]) == 1:
+            return self.__top(groups, limit, weight)
+        scores = {}
+        for word in groups[0]:
+            idf = self.__idf(word)
+            for (count, length), keys in self.postings[word].items():
+                score = idf * weight(count, length)
+                for key in keys:
+                    scores[key] = scores.get(key, 0.0) + score
+        for group in groups[1:]:
+            idfs = [(word, self.__idf(word)) for word in group]
+            found = {}
+            for key, score in scores.items():
+                counts = self.counts[key]
+                matched = False
+                for word, idf in idfs:
+                    if word in counts:
+                        matched = True
+                        score += idf * weight(counts[word],
+                                              self.lengths[key])
+                if matched:
+                    found[key] = score
+            scores = found
+            if not scores:
+                return []
+        ranked = scores.items()
+        if limit is None:
+            ranked = sorted(ranked, key=lambda item: -item[1])
+        else:
+            ranked = heapq.nlargest(limit, ranked, key=lambda item: item[1])
+        return [(score, key, self.objects[key]) for key, score in ranked]
+
+    def __build(self):
+        """Index the waiting objects, with the tables looked up once."""
+        waiting = self.waiting
+        if not waiting:
+            return
+        self.waiting = {}
+        postings = self.postings
+        frequencies = self.frequencies
+        listed = self.listed
+        attrs = self.attrs
+        total = 0
+        for key, obj in waiting.items():
+            found = []
+            for attr in attrs:
+                value = getattr(obj, attr, None)
+                if type(value) is str:
+                    found += words(value)
+            if not found:
+                continue
+            counts = {}
+            for word in found:
+                counts[word] = counts.get(word, 0) + 1
+            length = len(found)
+            for word, count in counts.items():
+                posting = postings.get(word)
+                if posting is None:
+                    posting = postings[word] = {}
+                    frequencies[word] = 1
+                    if word not in listed:
+                        self.unlisted.add(word)
+                else:
+                    frequencies[word] += 1
+                group = posting.get((count, length))
+                if group is None:
+                    posting[count, length] = {key: None}
+                else:
+                    group[key] = None
+            self.counts[key] = counts
+            self.lengths[key] = length
+            self.objects[key] = obj
+            total += length
+        self.total += total
+
+    def __top(self, groups, limit, weight):
+        """Return the limit best (score, key, object) triples of the keys
+        holding the one word of groups[0] and a word of every other group,
+        reading the keys of groups[0] by decreasing weight and stopping
+        once the best score the keys left can reach is not more than the
+        worst one kept.
+        """
+        word = groups[0][0]
+        idf = self.__idf(word)
+        others = [[(w, self.__idf(w)) for w in group] for group in groups[1:]]
+        rest = sum(idf * max(weight(count, length) for count, length in
+                             self.postings[w])
+                   for group in others for w, idf in group)
+        ranked = sorted(((idf * weight(count, length), keys) for
+                         (count, length), keys in
+                         self.postings[word].items()),
+                        key=lambda item: -item[0])
+        kept = []
+        order = 0
+        for first, keys in ranked:
+            if len(kept) == limit and first + rest <= kept[0][0]:
+                break
+            for key in keys:
+                counts = self.counts[key]
+                score = first
+                for group in others:
+                    matched = False
+                    for w, idf in group:
+                        if w in counts:
+                            matched = True
+                            score += idf * weight(counts[w],
+                                                  self.lengths[key])
+                    if not matched:
+                        break
+                else:
+                    order -= 1
+                    if len(kept) < limit:
+                        heapq.heappush(kept, (score, order, key))
+                    elif score > kept[0][0]:
+                        heapq.heapreplace(kept, (score, order, key))
+                    if len(kept) == limit and first + rest <= kept[0][0]:
+                        break
+            else:
+                continue
+            break
+        return [(score, key, self.objects[key])
+                for score, order, key in sorted(kept, reverse=True)]
+
+    def __idf(self, word):
+        """Return the BM25 inverse document frequency of word."""
+        n = self.frequencies[word]
+        return math.log(1 + (len(self.lengths) - n + 0.5) / (n + 0.5))
+
+    def __weight(self):
+        """Return the function giving the BM25 term weight of a word held
+        count times by a key of length words."""
+        k1, b = self.K1, self.B
+        average = self.total / len(self.lengths)
+
+        def weight(count, length):
+            return count * (k1 + 1) / (count + k1 * (1 - b + b * length /
+                                                     average))
+        return weight
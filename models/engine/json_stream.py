@@ -0,0 +1,91 @@
+#!/usr/bin/python3
+"""Defines an incremental reader for the top-level JSON object of a file."""
+
+
+import json
+import re
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def iter_items(f, size=65536):
+    """Yield the (key, value) pairs of the JSON object stored in f
+    one at a time, reading the file in chunks of size characters so
+    that only one entry has to be held in memory at once.
+    Args:
+        f (file): A text file opened for reading.
+        size (int): The number of characters read at a time.
+    Raises:
+        ValueError: If the file does not hold a JSON object.
+    """
+    reader = _Reader(f, size)
+    if reader.char() != "{":
+        raise ValueError("Expecting '{' at offset 0")
+    reader.pos += 1
+    if reader.char() == "}":
+        return
+    while True:
+        if reader.char() != '"':
+            raise ValueError("Expecting a key")
+        key = reader.value()
+        if reader.char() != ":":
+            raise ValueError("Expecting ':' after key {}".format(key))
+        reader.pos += 1
+        yield key, reader.value()
+        char = reader.char()
+        reader.pos += 1
+        if char == "}":
+            return
+        if char != ",":
+            raise ValueError("Expecting ',' after key {}".format(key))
+
+
+class _Reader:
+    """Represent a window over a file being decoded.
+    Attributes:
+        buf (str): The characters read but not consumed yet.
+        pos (int): The position of the next character to consume in buf.
+        eof (bool): Whether the whole file was read.
+    """
+
+    def __init__(self, f, size):
+        """Initialize a reader over the text file f."""
+        self.f = f
+        self.size = size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decode = json.JSONDecoder().raw_decode
+
+    def fill(self):
+        """Drop the consumed characters and read the next chunk."""
+        if self.eof:
+            raise ValueError("Unexpected end of JSON data")
+        chunk = self.f.read(self.size)
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        self.eof = not chunk
+
+    def char(self):
+        """Skip whitespace and return the next character, unconsumed."""
+        while True:
+            self.pos = WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            self.fill()
+
+    def value(self):
+        """Decode and consume the JSON value at the next character."""
+        self.char()
+        while True:
+            try:
+                value, end = self.decode(self.buf, self.pos)
+            except ValueError:
+                if self.eof:
+                    raise
+                self.fill()
+                continue
+            if end < len(self.buf) or self.eof:
+                self.pos = end
+                return value
+            self.fill()
@@ -0,0 +1,252 @@
+#!/usr/bin/python3
+"""Defines the queries of the console where command.
+
+A query names a class followed by any of these clauses:
+    <field> <op> <value> [and ...]   with op one of = == != < <= > >=
+                                     or has (the list holds the value)
+    order by <field> [asc|desc]
+    limit <n> [offset <n>]
+    select <field>[, <field> ...]
+Values are numbers, quoted strings or bare words (read as strings).
+"""
+
+
+import heapq
+import re
+import operator
+from itertools import islice
+
+OPERATORS = {
+    "=": operator.eq,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "has": operator.contains,
+}
+TOKEN = re.compile(r"""\s*(?:("(?:[^"\\]|\\.)*"|'[^']*')"""
+                   r"""|(<=|>=|!=|==|[=<>,])|([^\s,<>=!"']+))""")
+
+
+def tokenize(text):
+    """Return the (kind, token) pairs of text, kind being "str" for
+    quoted strings, "op" for operators and commas, and "word" otherwise.
+    Raises:
+        ValueError: If text holds a character no token starts with.
+    """
+    tokens = []
+    pos = 0
+    text = text.strip()
+    while pos < len(text):
+        match = TOKEN.match(text, pos)
+        if match is None or match.end() == pos:
+            raise ValueError("unexpected {!r}".format(text[pos:].strip()))
+        quoted, op, word = match.groups()
+        if quoted is not None:
+            tokens.append(("str", re.sub(r"\\(.)", r"\1", quoted[1:-1])))
+        elif op is not None:
+            tokens.append(("op", op))
+        else:
+            tokens.append(("word", word))
+        pos = match.end()
+    return tokens
+
+
+def literal(kind, token):
+    """Return the Python value of a value token: int, float or str."""
+    if kind == "word":
+        for convert in (int, float):
+            try:
+                return convert(token)
+            except ValueError:
+                pass
+    return token
+
+
+class Query:
+    """Represent a parsed where query.
+    Attributes:
+        cls_name (str): The class queried.
+        filters (list): The (field, op, value) conditions, all required.
+        order (str): The field to sort on, or None.
+        descending (bool): Whether to sort in descending order.
+        limit (int): The maximum number of results, or None.
+        offset (int): The number of results skipped.
+        fields (list): The fields to project on, or None for the objects.
+    """
+
+    def __init__(self, text):
+        """Parse the query text.
+        Raises:
+            ValueError: If text is not a valid query.
+        """
+        tokens = tokenize(text)
+        if not tokens or tokens[0][0] != "word":
+            raise ValueError("class name missing")
+        self.cls_name = tokens[0][1]
+        self.filters = []
+        self.order = None
+        self.descending = False
+        self.limit = None
+        self.offset = 0
+        self.fields = None
+        self.__tokens = tokens[1:]
+        while self.__tokens:
+            word = self.__next()
+            if word == "and":
+                continue
+            if word == "order":
+                if self.__next() != "by":
+                    raise ValueError("expected 'by' after 'order'")
+                self.order = self.__next("field name")
+                if self.__peek() in ("asc", "desc"):
+                    self.descending = self.__next() == "desc"
+            elif word == "limit":
+                self.limit = self.__count("limit")
+                if self.__peek() == "offset":
+                    self.__next()
+                    self.offset = self.__count("offset")
+            elif word == "offset":
+                self.offset = self.__count("offset")
+            elif word == "select":
+                self.fields = [self.__next("field name")]
+                while self.__peek() == ",":
+                    self.__next()
+                    self.fields.append(self.__next("field name"))
+            else:
+                op = self.__next("operator")
+                if op not in OPERATORS:
+                    raise ValueError("unknown operator {!r}".format(op))
+                if not self.__tokens:
+                    raise ValueError("value missing after {}".format(op))
+                kind, token = self.__tokens.pop(0)
+                if kind == "op":
+                    raise ValueError("value missing after {}".format(op))
+                self.filters.append((word, op, literal(kind, token)))
+
+    def __peek(self):
+        """Return the next token without consuming it, or None."""
+        return self.__tokens[0][1] if self.__tokens else None
+
+    def __next(self, what="token"):
+        """Consume and return the next token."""
+        if not self.__tokens:
+            raise ValueError("{} missing".format(what))
+        return self.__tokens.pop(0)[1]
+
+    def __count(self, what):
+        """Consume and return the next token as a non-negative int."""
+        token = self.__next(what)
+        if not token.isdigit():
+            raise ValueError("invalid {} {!r}".format(what, token))
+        return int(token)
+
+    def plan(self, cls):
+        """Return how the objects of cls are selected:
+        ("index", filters) when equality filters on an attribute of
+        cls.__indexes__ let storage.find() look them up, filters holding
+        only those on indexed attributes;
+        ("set", arguments) when has filters on an attribute of
+        cls.__sets__ let storage.having() intersect its member sets;
+        ("range", arguments) when numeric comparisons on an attribute of
+        cls.__ranges__, or the order of one with a limit, let
+        storage.range() read them sorted on it (an index-ordered read
+        leaves out the objects whose value is not a number);
+        ("scan", None) otherwise.
+        """
+        indexes = getattr(cls, "__indexes__", ())
+        equal = {field: value for field, op, value in self.filters
+                 if op in ("=", "==") and field in indexes}
+        if equal:
+            return "index", equal
+        sets = getattr(cls, "__sets__", ())
+        for attr in sets:
+            values = [value for field, op, value in self.filters
+                      if field == attr and op == "has"]
+            if values:
+                return "set", {"attr": attr, "values": values}
+        ranges = getattr(cls, "__ranges__", ())
+        bounds = {}
+        for field, op, value in self.filters:
+            if field not in ranges or type(value) not in (int, float):
+                continue
+            spec = bounds.setdefault(field, {"attr": field})
+            if op in ("=", "==", ">", ">="):
+                if ("low" not in spec or value > spec["low"] or
+                        value == spec["low"] and op == ">"):
+                    spec["low"], spec["include_low"] = value, op != ">"
+            if op in ("=", "==", "<", "<="):
+                if ("high" not in spec or value < spec["high"] or
+                        value == spec["high"] and op == "<"):
+                    spec["high"], spec["include_high"] = value, op != "<"
+        if self.order in bounds:
+            spec = bounds[self.order]
+        elif bounds:
+            spec = next(iter(bounds.values()))
+        elif self.order in ranges and self.limit is not None:
+            spec = {"attr": self.order}
+        else:
+            return "scan", None
+        if spec["attr"] == self.order:
+            spec["reverse"] = self.descending
+        return "range", spec
+
+    def run(self, storage, cls):
+        """Return an iterator over the objects of cls in storage matching
+        the query, sorted and paginated, or over the dictionaries of
+        their selected fields.
+        """
+        how, arguments = self.plan(cls)
+        if how == "index":
+            objs = storage.find(cls, **arguments).values()
+        elif how == "set":
+            objs = storage.having(cls, **arguments).values()
+        elif how == "range":
+            objs = storage.range(cls, **arguments)
+        else:
+            objs = storage.iterate(cls)
+        objs = (obj for obj in objs if self.match(obj))
+        end = None if self.limit is None else self.offset + self.limit
+        ordered = how == "range" and arguments["attr"] == self.order
+        if self.order is not None and not ordered:
+            key = self.__key
+            try:
+                if end is None:
+                    objs = sorted(objs, key=key, reverse=self.descending)
+                elif self.descending:
+                    objs = heapq.nlargest(end, objs, key=key)
+                else:
+                    objs = heapq.nsmallest(end, objs, key=key)
+            except TypeError:
+                raise ValueError("cannot order by {}".format(self.order))
+        objs = islice(objs, self.offset, end)
+        if self.fields is None:
+            return objs
+        return (self.project(obj) for obj in objs)
+
+    def match(self, obj):
+        """Return True if obj satisfies every filter of the query."""
+        for field, op, value in self.filters:
+            try:
+                if not OPERATORS[op](getattr(obj, field, None), value):
+                    return False
+            except TypeError:
+                return False
+        return True
+
+    def project(self, obj):
+        """Return the dictionary of the selected fields of obj, with the
+        values to_dict() gives them.
+        """
+        odict = obj.to_dict()
+        return {field: odict[field] if field in odict
+                else getattr(obj, field, None) for field in self.fields}
+
+    def __key(self, obj):
+        """Return the sort key of obj: missing values sort last."""
+        value = getattr(obj, self.order, None)
+        if value is None:
+            return not self.descending, 0
+        return self.descending, value
@@ -0,0 +1,293 @@
+#!/usr/bin/python3
+"""Defines the binary snapshot format of FileStorage.
+
+A snapshot holds the objects of file.json in a file mapped in memory
+and read on demand, so that opening it takes the same time whatever
+the number of objects:
+
+    header    b"HBNBSNAP", version (u16), 0 (u16), count (u32),
+              index offset (u64), file size (u64)
+    payloads  the JSON document of the dictionary of each object,
+              as codec.dumps() writes it, in the order written
+    keys      the "<class name>.<id>" key of each object
+    index     count entries of key offset (u64), key length (u32),
+              payload offset (u64), payload length (u32), sorted on
+              the key bytes
+
+Integers are little endian and text is UTF-8. A key is looked up by a
+binary search of the index, the keys of a class ("<class name>." and
+the id) form a contiguous range of it, and only the payloads asked for
+are decoded. from_json() and to_json() convert file.json to a snapshot
+and back, entry for entry.
+"""
+
+
+import mmap
+import struct
+from collections.abc import MutableMapping
+from models.engine import codec
+
+MAGIC = b"HBNBSNAP"
+VERSION = 1
+HEADER = struct.Struct("<8sHHIQQ")
+ENTRY = struct.Struct("<QIQI")
+
+
+def write(f, records):
+    """Write the snapshot of records to f.
+    Args:
+        f (file): A binary file opened for writing.
+        records (iterable): (key, payload) pairs, payload being the
+            encoded JSON document of the dictionary stored under key.
+    Raises:
+        ValueError: If a key appears twice.
+    """
+    keys = []
+    payloads = []
+    for key, payload in records:
+        keys.append(key.encode())
+        payloads.append(payload)
+    offsets = []
+    pos = HEADER.size
+    for payload in payloads:
+        offsets.append(pos)
+        pos += len(payload)
+    key_offsets = []
+    for key in keys:
+        key_offsets.append(pos)
+        pos += len(key)
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    for i, j in zip(order, order[1:]):
+        if keys[i] == keys[j]:
+            raise ValueError("duplicate key {!r}".format(keys[i].decode()))
+    index = b"".join(ENTRY.pack(key_offsets[i], len(keys[i]), offsets[i],
+                                len(payloads[i])) for i in order)
+    f.write(HEADER.pack(MAGIC, VERSION, 0, len(keys), pos,
+                        pos + len(index)))
+    f.writelines(payloads)
+    f.writelines(keys)
+    f.write(index)
+
+
+def from_json(src, dst):
+    """Write to dst the snapshot of the file.json src."""
+    with open(src, "rb") as f:
+        store = codec.loads(f.read())
+    with open(dst, "wb") as f:
+        write(f, ((key, codec.dumps(a).encode())
+                  for key, a in store.items()))
+
+
+def to_json(src, dst):
+    """Write to dst the file.json of the snapshot src, as
+    FileStorage.save() writes it.
+    """
+    with Snapshot(src) as snap, open(dst, "w") as f:
+        f.write("{" + ", ".join(codec.dumps(key) + ": " + payload.decode()
+                                for key, payload in snap.records()) + "}")
+
+
+class Snapshot:
+    """Represent a snapshot file mapped in memory.
+    Attributes:
+        path (str): The path of the file.
+        count (int): The number of objects it holds.
+    """
+
+    def __init__(self, path):
+        """Map the snapshot path and check its header.
+        Raises:
+            ValueError: If path is not a complete snapshot.
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            try:
+                self.__map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError("{} is not a snapshot".format(path))
+        if len(self.__map) < HEADER.size:
+            raise ValueError("{} is not a snapshot".format(path))
+        magic, version, _, count, index, size = HEADER.unpack_from(
+            self.__map, 0)
+        if magic != MAGIC:
+            raise ValueError("{} is not a snapshot".format(path))
+        if version != VERSION:
+            raise ValueError("unsupported snapshot version {}".format(
+                version))
+        if size != len(self.__map) or index + count * ENTRY.size != size:
+            raise ValueError("{} is truncated".format(path))
+        self.count = count
+        self.__index = index
+
+    def __enter__(self):
+        """Return the snapshot."""
+        return self
+
+    def __exit__(self, *exc):
+        """Unmap the snapshot."""
+        self.close()
+        return False
+
+    def __len__(self):
+        """Return the number of objects in the snapshot."""
+        return self.count
+
+    def close(self):
+        """Unmap the snapshot."""
+        self.__map.close()
+
+    def key(self, i):
+        """Return the i-th key in sorted order."""
+        return self.__key(i).decode()
+
+    def payload(self, i):
+        """Return the payload of the i-th key in sorted order."""
+        _, _, offset, length = ENTRY.unpack_from(
+            self.__map, self.__index + i * ENTRY.size)
+        return self.__map[offset:offset + length]
+
+    def find(self, key):
+        """Return the position of key in sorted order, or -1."""
+        target = key.encode()
+        i = self.__lower(target)
+        if i < self.count and self.__key(i) == target:
+            return i
+        return -1
+
+    def bounds(self, prefix):
+        """Return the (start, stop) range of the positions of the keys
+        starting with prefix, which ends with a character below U+007F.
+        """
+        low = prefix.encode()
+        high = low[:-1] + bytes([low[-1] + 1])
+        return self.__lower(low), self.__lower(high)
+
+    def get(self, key):
+        """Return the dictionary stored under key, or None."""
+        i = self.find(key)
+        return None if i < 0 else codec.loads(self.payload(i))
+
+    def records(self):
+        """Yield the (key, payload) pairs in the order they were written."""
+        entries = sorted(ENTRY.iter_unpack(
+            self.__map[self.__index:self.__index +
+                       self.count * ENTRY.size]), key=lambda e: e[2])
+        for key_offset, key_length, offset, length in entries:
+            yield (self.__map[key_offset:key_offset + key_length].decode(),
+                   self.__map[offset:offset + length])
+
+    def items(self):
+        """Yield the (key, dictionary) pairs in the order they were
+        written.
+        """
+        for key, payload in self.records():
+            yield key, codec.loads(payload)
+
+    def __key(self, i):
+        """Return the bytes of the i-th key in sorted order."""
+        offset, length, _, _ = ENTRY.unpack_from(
+            self.__map, self.__index + i * ENTRY.size)
+        return self.__map[offset:offset + length]
+
+    def __lower(self, target):
+        """Return the position of the first key not below target."""
+        low, high = 0, self.count
+        while low < high:
+            mid = (low + high) // 2
+            if self.__key(mid) < target:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+
+class Records(MutableMapping):
+    """Represent the dictionaries of the objects of one class in a
+    snapshot, keyed like FileStorage.__objects and decoded when read.
+    Dictionaries set and keys deleted are kept aside: the snapshot is
+    never changed.
+    Attributes:
+        snapshot (Snapshot): The snapshot read.
+        name (str): The class name.
+    """
+
+    def __init__(self, snapshot, name):
+        """Initialize the records of the class name in snapshot."""
+        self.snapshot = snapshot
+        self.name = name
+        self.__start, self.__stop = snapshot.bounds(name + ".")
+        self.__set = {}
+        self.__gone = set()
+
+    def __len__(self):
+        """Return the number of records."""
+        return (self.__stop - self.__start - len(self.__gone) +
+                len(self.__set))
+
+    def __contains__(self, key):
+        """Return True if there is a record for key."""
+        if key in self.__set:
+            return True
+        return key not in self.__gone and self.__find(key) >= 0
+
+    def __getitem__(self, key):
+        """Return the dictionary of key, decoding it from the snapshot."""
+        if key in self.__set:
+            return self.__set[key]
+        i = self.__find(key) if key not in self.__gone else -1
+        if i < 0:
+            raise KeyError(key)
+        return codec.loads(self.snapshot.payload(i))
+
+    def __setitem__(self, key, a):
+        """Make a the dictionary of key."""
+        if self.__find(key) >= 0:
+            self.__gone.add(key)
+        self.__set[key] = a
+
+    def __delitem__(self, key):
+        """Remove the record of key."""
+        if key in self.__set:
+            del self.__set[key]
+        elif key not in self.__gone and self.__find(key) >= 0:
+            self.__gone.add(key)
+        else:
+            raise KeyError(key)
+
+    def __iter__(self):
+        """Yield the keys of the records, those of the snapshot first."""
+        gone = self.__gone
+        for i in range(self.__start, self.__stop):
+            key = self.snapshot.key(i)
+            if key not in gone:
+                yield key
+        yield from list(self.__set)
+
+    def items(self):
+        """Yield the (key, dictionary) pairs of the records without
+        looking each key up again.
+        """
+        gone = self.__gone
+        for i in range(self.__start, self.__stop):
+            key = self.snapshot.key(i)
+            if key not in gone:
+                yield key, codec.loads(self.snapshot.payload(i))
+        yield from list(self.__set.items())
+
+    def payload(self, key):
+        """Return the encoded JSON document of the dictionary of key,
+        copied from the snapshot when it was not replaced.
+        """
+        if key in self.__set:
+            return codec.dumps(self.__set[key]).encode()
+        i = self.__find(key) if key not in self.__gone else -1
+        if i < 0:
+            raise KeyError(key)
+        return self.snapshot.payload(i)
+
+    def __find(self, key):
+        """Return the position of key in the snapshot, or -1."""
+        if type(key) is not str:
+            return -1
+        i = self.snapshot.find(key)
+        return i if self.__start <= i < self.__stop else -1
@@ -0,0 +1,742 @@
+#!/usr/bin/python3
+"""Defines the SQLiteStorage class."""
+
+
+import heapq
+import sqlite3
+import weakref
+from os import getenv
+from contextlib import contextmanager
+from models.engine import codec
+from models.engine.file_storage import classes
+from models.engine.index import RangeIndex, GeoIndex, SetIndex, TextIndex
+from models.engine.index import Aggregate
+from models.engine.index import circle_bbox, terms
+
+
+class SQLiteStorage:
+    """Represent a storage engine backed by a local SQLite database.
+
+    Every model class has its own table holding the to_dict() JSON of
+    its objects, keyed by id, plus one indexed column per attribute in
+    the class's __indexes__, __ranges__, __geo__ and __aggregates__, whose
+    statistics are computed from those columns. Each list attribute
+    in its __sets__ has a "<class name>.<attribute>" table holding one
+    (id, member) row per member of the list, and the string attributes in
+    its __fulltext__ an FTS5 table "<class name>.fts" sharing the rowids of
+    the class's table. Objects are read on demand and the same instance
+    is returned as long as it is in use, but only the objects changed
+    since the last save are held by the storage; nothing is written
+    before save().
+
+    Attributes:
+        __db_path (str): The path of the SQLite database.
+        __conn (sqlite3.Connection): The open connection to the database.
+        __objects (WeakValueDictionary): The objects read or created,
+            keyed like FileStorage: <class name>.<id>, dropped once
+            nothing else refers to them.
+        __changed (dict): The objects of __objects created or updated
+            since the last save, kept until it writes them.
+        __pending (set): Keys created, updated or deleted since the last save.
+        __removed (dict): Keys deleted since the last save mapped to their
+            object, which rollback() restores in place.
+        __detached (weakref.WeakSet): The objects created in a rolled back
+            transaction, which new() and save() refuse.
+        __depth (int): The number of transactions begun and not finished;
+            save() writes nothing while it is not 0.
+        __savepoints (list): One dictionary per transaction begun, mapping
+            the keys already pending when it began to the dictionary of
+            their object then, or None if it was deleted.
+        __fts (set): The class names having a full-text table; none do
+            when SQLite is built without FTS5.
+    """
+    __db_path = getenv("HBNB_SQLITE_PATH", "hbnb.db")
+    __conn = None
+    __objects = weakref.WeakValueDictionary()
+    __changed = {}
+    __pending = set()
+    __removed = {}
+    __detached = weakref.WeakSet()
+    __depth = 0
+    __savepoints = []
+    __fts = set()
+
+    def all(self, cls=None):
+        """Return a dictionary of every object, or of the objects of one
+        class when cls (a class or class name) is given.
+        """
+        names = classes if cls is None else [self.__name(cls)]
+        objdict = {}
+        for name in names:
+            rows = self.__conn.execute(
+                'SELECT id, data FROM "{}"'.format(name))
+            for id, data in rows:
+                obj = self.__build(name, id, data)
+                if obj is not None:
+                    objdict[obj.__class__.__name__ + "." + id] = obj
+            for key, obj in SQLiteStorage.__changed.items():
+                if obj.__class__.__name__ == name:
+                    objdict[key] = obj
+        return objdict
+
+    def iterate(self, cls=None):
+        """Yield the objects stored, or those of one class when cls (a
+        class or class name) is given, reading the rows one at a time.
+        """
+        names = classes if cls is None else [self.__name(cls)]
+        for name in names:
+            rows = self.__conn.execute(
+                'SELECT id, data FROM "{}"'.format(name))
+            for id, data in rows:
+                obj = self.__build(name, id, data)
+                if obj is not None:
+                    yield obj
+            for key in list(SQLiteStorage.__pending):
+                obj = SQLiteStorage.__changed.get(key)
+                if (obj is not None and obj.__class__.__name__ == name and
+                        self.__row(name, obj.id) is None):
+                    yield obj
+
+    def count(self, cls=None):
+        """Return the number of objects stored, optionally of one class."""
+        if cls is None:
+            return sum(self.count(name) for name in classes)
+        name = self.__name(cls)
+        total = self.__conn.execute(
+            'SELECT COUNT(*) FROM "{}"'.format(name)).fetchone()[0]
+        for key in SQLiteStorage.__pending:
+            if key.split(".", 1)[0] == name:
+                stored = self.__row(name, key.split(".", 1)[1]) is not None
+                total += (key in SQLiteStorage.__changed) - stored
+        return total
+
+    def get(self, cls, id):
+        """Return the object of cls (a class or class name) with the
+        given id, or None if there is none.
+        """
+        name = self.__name(cls)
+        key = "{}.{}".format(name, id)
+        obj = SQLiteStorage.__objects.get(key)
+        if obj is not None:
+            return obj
+        row = self.__row(name, id)
+        return None if row is None else self.__build(name, id, row[0])
+
+    def find(self, cls, **filters):
+        """Return a dictionary of the objects of cls whose attributes are
+        equal to the given filters, selected through the indexed columns
+        when one of the filters has one.
+        """
+        name = self.__name(cls)
+        indexed = {attr: value for attr, value in filters.items()
+                   if attr in self.__columns(classes[name])
+                   and self.__column(value) is value}
+        if not indexed:
+            candidates = self.all(name)
+        else:
+            query = 'SELECT id, data FROM "{}" WHERE {}'.format(
+                name, " AND ".join('"{}" = ?'.format(attr)
+                                   for attr in indexed))
+            candidates = {}
+            for id, data in self.__conn.execute(query,
+                                                list(indexed.values())):
+                obj = self.__build(name, id, data)
+                if obj is not None:
+                    candidates[name + "." + id] = obj
+            for key, obj in SQLiteStorage.__changed.items():
+                if obj.__class__.__name__ == name:
+                    candidates[key] = obj
+        return {key: obj for key, obj in candidates.items()
+                if all(getattr(obj, attr, None) == value
+                       for attr, value in filters.items())}
+
+    def find_in(self, cls, attr, values):
+        """Return a dictionary of the values of values some objects of
+        cls hold in their attribute attr, each mapped to the dictionary of
+        those objects, selected with one query per 500 values when attr
+        is the id or an indexed column.
+        """
+        name = self.__name(cls)
+        wanted = {value: None for value in values
+                  if value is not None and self.__column(value) is value}
+        found = {}
+        if attr != "id" and attr not in self.__columns(classes[name]):
+            for key, obj in self.all(name).items():
+                value = self.__column(getattr(obj, attr, None))
+                if value in wanted:
+                    found.setdefault(value, {})[key] = obj
+            return found
+        pending = SQLiteStorage.__pending
+        ordered = list(wanted)
+        for i in range(0, len(ordered), 500):
+            chunk = ordered[i:i + 500]
+            rows = self.__conn.execute(
+                'SELECT id, data FROM "{}" WHERE "{}" IN ({})'.format(
+                    name, attr, ", ".join("?" * len(chunk))), chunk)
+            for id, data in rows:
+                if name + "." + id not in pending:
+                    obj = self.__build(name, id, data)
+                    value = getattr(obj, attr, None)
+                    found.setdefault(value, {})[name + "." + id] = obj
+        for key in pending:
+            obj = SQLiteStorage.__changed.get(key)
+            if obj is not None and obj.__class__.__name__ == name:
+                value = self.__column(getattr(obj, attr, None))
+                if value in wanted:
+                    found.setdefault(value, {})[key] = obj
+        return found
+
+    def range(self, cls, attr, low=None, high=None, include_low=True,
+              include_high=True, reverse=False):
+        """Yield the objects of cls whose attribute attr is a number
+        between low and high (None for no bound), sorted on attr, in
+        descending order if reverse, reading the indexed column of attr
+        when there is one.
+        """
+        name = self.__name(cls)
+        if attr not in self.__columns(classes[name]):
+            index = RangeIndex(attr)
+            for key, obj in self.all(name).items():
+                index.add(key, obj)
+            yield from index.range(low, high, include_low, include_high,
+                                   reverse)
+            return
+        where = ['typeof("{0}") IN (\'integer\', \'real\')'.format(attr)]
+        params = []
+        if low is not None:
+            where.append('"{}" {} ?'.format(attr, ">=" if include_low
+                                             else ">"))
+            params.append(low)
+        if high is not None:
+            where.append('"{}" {} ?'.format(attr, "<=" if include_high
+                                             else "<"))
+            params.append(high)
+        order = " DESC" if reverse else ""
+        rows = self.__conn.execute(
+            'SELECT id, data FROM "{0}" WHERE {1} '
+            'ORDER BY "{2}"{3}, id{3}'.format(name, " AND ".join(where),
+                                             attr, order), params)
+        pending = SQLiteStorage.__pending
+        stored = (obj for id, data in rows
+                  if name + "." + id not in pending
+                  for obj in [self.__build(name, id, data)])
+        changed = RangeIndex(attr)
+        for key in pending:
+            obj = SQLiteStorage.__changed.get(key)
+            if obj is not None and obj.__class__.__name__ == name:
+                changed.add(key, obj)
+        yield from heapq.merge(
+            stored, changed.range(low, high, include_low, include_high,
+                                  reverse),
+            key=lambda obj: (getattr(obj, attr), obj.id), reverse=reverse)
+
+    def having(self, cls, attr, values, mode="all"):
+        """Return a dictionary of the objects of cls whose list attribute
+        attr holds every one of values (mode "all") or at least one of them
+        (mode "any"), selected through the member table of attr when attr
+        is in the class's __sets__.
+        Raises:
+            ValueError: If mode is neither "all" nor "any".
+        """
+        if mode not in ("all", "any"):
+            raise ValueError("mode must be 'all' or 'any'")
+        name = self.__name(cls)
+        if attr not in getattr(classes[name], "__sets__", ()):
+            index = SetIndex(attr)
+            for key, obj in self.all(name).items():
+                index.add(key, obj)
+            return index.find(values, mode)
+        members = []
+        for value in values:
+            if self.__column(value) is value and value not in members:
+                members.append(value)
+        found = {}
+        pending = SQLiteStorage.__pending
+        if members and (mode == "any" or len(members) == len(values)):
+            query = ('SELECT id, data FROM "{0}" WHERE id IN '
+                     '(SELECT id FROM "{0}.{1}" WHERE member IN ({2})'
+                     .format(name, attr, ", ".join("?" * len(members))))
+            if mode == "all":
+                query += " GROUP BY id HAVING COUNT(*) = {}".format(
+                    len(members))
+            for id, data in self.__conn.execute(query + ")", members):
+                if name + "." + id not in pending:
+                    found[name + "." + id] = self.__build(name, id, data)
+        changed = SetIndex(attr)
+        for key in pending:
+            obj = SQLiteStorage.__changed.get(key)
+            if obj is not None and obj.__class__.__name__ == name:
+                changed.add(key, obj)
+        found.update(changed.find(values, mode))
+        return found
+
+    def search(self, cls, text, limit=None):
+        """Return the (score, object) pairs of the objects of cls whose
+        __fulltext__ attributes hold every word of text, or a word
+        starting like a word of text followed by *, best match first and
+        at most limit of them; [] if cls declares no __fulltext__. Objects
+        are ranked by the FTS5 table of cls, into which the objects
+        changed since the last save are written for the query only, in
+        an SQL savepoint rolled back after it, so that one BM25 scorer
+        ranks them all.
+        """
+        name = self.__name(cls)
+        attrs = getattr(classes[name], "__fulltext__", ())
+        if not attrs:
+            return []
+        if name not in SQLiteStorage.__fts:
+            index = TextIndex(attrs)
+            for key, obj in self.all(name).items():
+                index.add(key, obj)
+            return [(score, obj) for score, key, obj
+                    in index.search(text, limit)]
+        match = " ".join('"{}"{}'.format(word, "*" if prefix else "")
+                         for word, prefix in terms(text))
+        if not match:
+            return []
+        conn = self.__conn
+        changed = [key for key in SQLiteStorage.__pending
+                   if key.split(".", 1)[0] == name]
+        staged = {}
+        if changed:
+            conn.execute("SAVEPOINT search")
+        try:
+            for key in changed:
+                conn.execute(
+                    'DELETE FROM "{0}.fts" WHERE rowid = '
+                    '(SELECT rowid FROM "{0}" WHERE id = ?)'.format(name),
+                    (key.split(".", 1)[1],))
+                obj = SQLiteStorage.__changed.get(key)
+                if obj is not None:
+                    rowid = -1 - len(staged)
+                    staged[rowid] = key, obj
+                    conn.execute(
+                        'INSERT INTO "{}.fts" (rowid{}) VALUES (?{})'.format(
+                            name, "".join(', "{}"'.format(a) for a in attrs),
+                            ", ?" * len(attrs)),
+                        [rowid] + [value if type(value) is str else None
+                                   for value in (getattr(obj, attr, None)
+                                                 for attr in attrs)])
+            rows = conn.execute(
+                'SELECT "{0}.fts".rowid, c.id, c.data, -bm25("{0}.fts") '
+                'FROM "{0}.fts" LEFT JOIN "{0}" AS c '
+                'ON c.rowid = "{0}.fts".rowid WHERE "{0}.fts" MATCH ? '
+                'ORDER BY bm25("{0}.fts"), c.id{1}'.format(
+                    name, "" if limit is None or changed
+                    else " LIMIT {:d}".format(limit)), (match,)).fetchall()
+        finally:
+            if changed:
+                conn.execute("ROLLBACK TO search")
+                conn.execute("RELEASE search")
+        found = []
+        for rowid, id, data, score in rows:
+            if rowid in staged:
+                key, obj = staged[rowid]
+            else:
+                key, obj = name + "." + id, self.__build(name, id, data)
+            found.append((score, key, obj))
+        found.sort(key=lambda item: (-item[0], item[1]))
+        return [(score, obj) for score, key, obj in found[:limit]]
+
+    def aggregate(self, cls, attr, value=None):
+        """Return the {"count", "sum", "avg"} statistics of the objects
+        of cls whose attribute attr is value, or a dictionary of those of
+        every value of attr if value is None, grouping the indexed column
+        of attr when attr is in the class's __aggregates__ and summing
+        the fields declared with it.
+        """
+        name = self.__name(cls)
+        fields = getattr(classes[name], "__aggregates__", {}).get(attr)
+        if fields is None:
+            aggregate = Aggregate(attr)
+            for key, obj in self.all(name).items():
+                aggregate.add(key, obj)
+            if value is None:
+                return {value: aggregate.stats(value)
+                        for value in aggregate.groups}
+            return aggregate.stats(value)
+        aggregate = Aggregate(attr, fields)
+        pending = [key.split(".", 1)[1] for key in SQLiteStorage.__pending
+                   if key.split(".", 1)[0] == name]
+        where = ["id NOT IN ({})".format(", ".join("?" * len(pending)))]
+        params = list(pending)
+        if value is not None:
+            where.append('"{}" = ?'.format(attr))
+            params.append(value)
+        numeric = "typeof(\"{0}\") IN ('integer', 'real')"
+        rows = self.__conn.execute(
+            'SELECT "{0}", COUNT(*){1} FROM "{2}" WHERE {3} '
+            'GROUP BY "{0}"'.format(attr, "".join(
+                ', SUM(CASE WHEN {0} THEN "{1}" END), '
+                'COUNT(CASE WHEN {0} THEN 1 END)'.format(
+                    numeric.format(field), field) for field in fields),
+                name, " AND ".join(where)), params)
+        for row in rows:
+            aggregate.groups[row[0]] = [
+                row[1], [row[2 + 2 * i] or 0 for i in range(len(fields))],
+                [row[3 + 2 * i] for i in range(len(fields))]]
+        for key in pending:
+            obj = SQLiteStorage.__changed.get(name + "." + key)
+            if obj is not None and (value is None or
+                                    getattr(obj, attr, None) == value):
+                aggregate.add(name + "." + key, obj)
+        if value is None:
+            return {value: aggregate.stats(value)
+                    for value in aggregate.groups}
+        return aggregate.stats(value)
+
+    def check_aggregates(self):
+        """Return the differences between the aggregates kept and the
+        ones recomputed from every object: none, since they are computed
+        from the rows when asked for.
+        """
+        return []
+
+    def near(self, lat, lon, radius_km, limit=None, cls=None):
+        """Return the (distance in km, object) pairs of the objects within
+        radius_km of the point lat, lon, nearest first and at most limit
+        of them, among the classes declaring __geo__ (or cls only).
+        """
+        found = []
+        box = circle_bbox(lat, lon, radius_km)
+        for name in self.__geo_names(cls):
+            index = GeoIndex(classes[name].__geo__)
+            for key, obj in self.bbox(*box, cls=name).items():
+                index.add(key, obj)
+            found += index.near(lat, lon, radius_km, limit)
+        found.sort(key=lambda item: item[:2])
+        return [(distance, obj) for distance, key, obj in found[:limit]]
+
+    def bbox(self, south, west, north, east, cls=None):
+        """Return a dictionary of the objects within the bounding box,
+        which crosses the antimeridian when west > east, among the classes
+        declaring __geo__ (or cls only), selected through the indexed
+        latitude column.
+        """
+        found = {}
+        pending = SQLiteStorage.__pending
+        for name in self.__geo_names(cls):
+            lat, lon = classes[name].__geo__
+            where = ('typeof("{0}") IN (\'integer\', \'real\') AND '
+                     'typeof("{1}") IN (\'integer\', \'real\') AND '
+                     '"{0}" BETWEEN ? AND ? AND ("{1}" >= ? {2} "{1}" <= ?)'
+                     .format(lat, lon, "OR" if west > east else "AND"))
+            rows = self.__conn.execute(
+                'SELECT id, data FROM "{}" WHERE {}'.format(name, where),
+                (south, north, west, east))
+            for id, data in rows:
+                if name + "." + id not in pending:
+                    found[name + "." + id] = self.__build(name, id, data)
+            changed = GeoIndex((lat, lon))
+            for key in pending:
+                obj = SQLiteStorage.__changed.get(key)
+                if obj is not None and obj.__class__.__name__ == name:
+                    changed.add(key, obj)
+            found.update(changed.bbox(south, west, north, east))
+        return found
+
+    def new(self, obj):
+        """Add obj to the objects to write on the next save.
+        Raises:
+            ValueError: If obj was created in a rolled back transaction.
+        """
+        if obj in SQLiteStorage.__detached:
+            raise ValueError("object was rolled back")
+        key = "{}.{}".format(obj.__class__.__name__, obj.id)
+        SQLiteStorage.__objects[key] = obj
+        SQLiteStorage.__changed[key] = obj
+        SQLiteStorage.__pending.add(key)
+
+    def touch(self, obj, attr=None):
+        """Mark a stored obj as changed so the next save writes it again."""
+        key = "{}.{}".format(obj.__class__.__name__, obj.id)
+        if SQLiteStorage.__objects.get(key) is obj:
+            SQLiteStorage.__changed[key] = obj
+            SQLiteStorage.__pending.add(key)
+
+    def delete(self, obj=None):
+        """Delete obj from the database on the next save."""
+        if obj is None:
+            return
+        key = "{}.{}".format(obj.__class__.__name__, obj.id)
+        if SQLiteStorage.__objects.pop(key, None) is obj:
+            SQLiteStorage.__removed[key] = obj
+        SQLiteStorage.__changed.pop(key, None)
+        SQLiteStorage.__pending.add(key)
+
+    def save(self):
+        """Write the objects created, updated or deleted since the last
+        save to the database in one transaction, unless a transaction of
+        this storage is in progress.
+        """
+        if SQLiteStorage.__depth:
+            return
+        conn = SQLiteStorage.__conn
+        with conn:
+            for key in SQLiteStorage.__pending:
+                name, id = key.split(".", 1)
+                obj = SQLiteStorage.__changed.get(key)
+                for attr in getattr(classes[name], "__sets__", ()):
+                    table = '"{}.{}"'.format(name, attr)
+                    conn.execute("DELETE FROM {} WHERE id = ?".format(table),
+                                 (id,))
+                    value = getattr(obj, attr, None)
+                    if type(value) in (list, tuple, set, frozenset):
+                        conn.executemany(
+                            "INSERT OR IGNORE INTO {} (id, member) "
+                            "VALUES (?, ?)".format(table),
+                            [(id, member) for member in value
+                             if self.__column(member) is member])
+                if name in SQLiteStorage.__fts:
+                    conn.execute(
+                        'DELETE FROM "{0}.fts" WHERE rowid = '
+                        '(SELECT rowid FROM "{0}" WHERE id = ?)'.format(name),
+                        (id,))
+                if obj is None:
+                    conn.execute('DELETE FROM "{}" WHERE id = ?'.format(name),
+                                 (id,))
+                    continue
+                attrs = self.__columns(classes[name])
+                conn.execute(
+                    'INSERT OR REPLACE INTO "{}" (id, data{}) '
+                    'VALUES ({})'.format(
+                        name, "".join(', "{}"'.format(a) for a in attrs),
+                        ", ".join("?" * (2 + len(attrs)))),
+                    [id, codec.dumps(obj.to_dict())] +
+                    [self.__column(getattr(obj, attr, None))
+                     for attr in attrs])
+                if name in SQLiteStorage.__fts:
+                    text = classes[name].__fulltext__
+                    conn.execute(
+                        'INSERT INTO "{0}.fts" (rowid{1}) SELECT rowid{2} '
+                        'FROM "{0}" WHERE id = ?'.format(
+                            name, "".join(', "{}"'.format(a) for a in text),
+                            ", ?" * len(text)),
+                        [value if type(value) is str else None
+                         for value in (getattr(obj, attr, None)
+                                       for attr in text)] + [id])
+        SQLiteStorage.__pending.clear()
+        SQLiteStorage.__changed.clear()
+        SQLiteStorage.__removed.clear()
+
+    def begin(self):
+        """Start a transaction: write the pending changes, then buffer
+        every change until commit() or rollback(). Transactions nest and
+        only the outermost commit() writes; a nested one records the
+        objects its enclosing transactions changed so far, so that
+        rolling it back restores them.
+        """
+        if SQLiteStorage.__depth == 0:
+            self.save()
+        savepoint = {}
+        for key in SQLiteStorage.__pending:
+            obj = SQLiteStorage.__changed.get(key)
+            savepoint[key] = None if obj is None else obj.to_dict()
+        SQLiteStorage.__savepoints.append(savepoint)
+        SQLiteStorage.__depth += 1
+
+    def commit(self):
+        """End a transaction, writing its changes if it is the outermost
+        one.
+        """
+        if SQLiteStorage.__depth:
+            SQLiteStorage.__depth -= 1
+            SQLiteStorage.__savepoints.pop()
+        self.save()
+
+    def rollback(self):
+        """End the innermost transaction, discarding the changes made
+        since it began, or outside a transaction those made since the
+        last save: the objects created are dropped, and detached so that
+        saving them again raises ValueError, and those updated or deleted
+        are reset in place as the database or the enclosing transactions
+        hold them, so references already held see the restored values.
+        The enclosing transactions go on.
+        """
+        savepoint = {}
+        if SQLiteStorage.__depth:
+            SQLiteStorage.__depth -= 1
+            savepoint = SQLiteStorage.__savepoints.pop()
+        removed = SQLiteStorage.__removed
+        changed = {}
+        for key in SQLiteStorage.__pending:
+            held = removed.pop(key, None)
+            obj = SQLiteStorage.__objects.pop(key, None)
+            if key in savepoint:
+                a = savepoint[key]
+            else:
+                row = self.__row(*key.split(".", 1))
+                a = None if row is None else codec.loads(row[0])
+            if obj is not held and obj is not None and (
+                    a is None or held is not None):
+                SQLiteStorage.__detached.add(obj)
+                obj = None
+            if obj is None:
+                obj = held
+            if a is None:
+                if key in savepoint:
+                    if obj is not None:
+                        removed[key] = obj
+                elif obj is not None:
+                    SQLiteStorage.__detached.add(obj)
+                continue
+            if obj is None:
+                obj = classes[a["__class__"]].from_dict(a)
+            else:
+                obj._reset(a)
+                SQLiteStorage.__detached.discard(obj)
+            SQLiteStorage.__objects[key] = obj
+            if key in savepoint:
+                changed[key] = obj
+        SQLiteStorage.__pending = set(savepoint)
+        SQLiteStorage.__changed = changed
+
+    def in_transaction(self):
+        """Return True if a transaction is in progress."""
+        return SQLiteStorage.__depth > 0
+
+    @contextmanager
+    def batch(self):
+        """Return a context manager running its block in a transaction,
+        committed at the end of the block or rolled back if an exception
+        escapes it.
+        """
+        self.begin()
+        try:
+            yield self
+        except BaseException:
+            self.rollback()
+            raise
+        self.commit()
+
+    def reload(self):
+        """Open the database, creating the tables and indexes it lacks
+        (filled from the rows already stored), and forget the objects read
+        so far.
+        """
+        if SQLiteStorage.__conn is not None:
+            SQLiteStorage.__conn.close()
+        conn = sqlite3.connect(SQLiteStorage.__db_path)
+        fts = set()
+        with conn:
+            for name, cls in classes.items():
+                attrs = self.__columns(cls)
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS "{}" '
+                    '(id TEXT PRIMARY KEY, data TEXT NOT NULL{})'.format(
+                        name, "".join(', "{}"'.format(a) for a in attrs)))
+                present = {row[1] for row in conn.execute(
+                    'PRAGMA table_info("{}")'.format(name))}
+                for attr in attrs:
+                    if attr not in present:
+                        conn.execute('ALTER TABLE "{0}" ADD COLUMN "{1}"'
+                                     .format(name, attr))
+                        conn.execute(
+                            'UPDATE "{0}" SET "{1}" = '
+                            'json_extract(data, \'$."{1}"\')'.format(
+                                name, attr))
+                for attr in attrs:
+                    conn.execute(
+                        'CREATE INDEX IF NOT EXISTS "{0}_{1}" '
+                        'ON "{0}" ("{1}")'.format(name, attr))
+                for attr in getattr(cls, "__sets__", ()):
+                    table = "{}.{}".format(name, attr)
+                    if conn.execute(
+                            "SELECT 1 FROM sqlite_master WHERE name = ?",
+                            (table,)).fetchone() is not None:
+                        continue
+                    conn.execute(
+                        'CREATE TABLE "{}" (id TEXT NOT NULL, member, '
+                        'PRIMARY KEY (member, id)) WITHOUT ROWID'
+                        .format(table))
+                    conn.execute('CREATE INDEX "{0}_id" ON "{0}" (id)'
+                                 .format(table))
+                    conn.execute(
+                        'INSERT OR IGNORE INTO "{0}" (id, member) '
+                        'SELECT c.id, j.value FROM "{1}" AS c, '
+                        'json_each(c.data, \'$."{2}"\') AS j '
+                        'WHERE json_type(c.data, \'$."{2}"\') = \'array\' '
+                        'AND j.type IN (\'text\', \'integer\', \'real\')'
+                        .format(table, name, attr))
+                text = getattr(cls, "__fulltext__", ())
+                if not text:
+                    continue
+                if conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?",
+                                (name + ".fts",)).fetchone() is None:
+                    try:
+                        conn.execute(
+                            'CREATE VIRTUAL TABLE "{}.fts" USING fts5({}, '
+                            'tokenize = "unicode61 remove_diacritics 0")'
+                            .format(name, ", ".join('"{}"'.format(a)
+                                                    for a in text)))
+                    except sqlite3.OperationalError:
+                        continue
+                    conn.execute(
+                        'INSERT INTO "{0}.fts" (rowid{1}) SELECT rowid{2} '
+                        'FROM "{0}"'.format(name, "".join(
+                            ', "{}"'.format(a) for a in text), "".join(
+                            ', CASE WHEN json_type(data, \'$."{0}"\') = '
+                            '\'text\' THEN json_extract(data, \'$."{0}"\') '
+                            'END'.format(a) for a in text)))
+                fts.add(name)
+        SQLiteStorage.__fts = fts
+        SQLiteStorage.__conn = conn
+        SQLiteStorage.__objects = weakref.WeakValueDictionary()
+        SQLiteStorage.__changed = {}
+        SQLiteStorage.__pending = set()
+
+    def close(self):
+        """Close the connection to the database."""
+        if SQLiteStorage.__conn is not None:
+            SQLiteStorage.__conn.close()
+            SQLiteStorage.__conn = None
+
+    def __name(self, cls):
+        """Return the class name of cls, which is a class or a name."""
+        return cls if type(cls) is str else cls.__name__
+
+    def __columns(self, cls):
+        """Return the attributes of cls kept in indexed columns."""
+        attrs = []
+        aggregates = getattr(cls, "__aggregates__", {})
+        for attr in (getattr(cls, "__indexes__", ()) +
+                     getattr(cls, "__ranges__", ()) +
+                     getattr(cls, "__geo__", ()) + tuple(aggregates) +
+                     sum(aggregates.values(), ())):
+            if attr not in attrs:
+                attrs.append(attr)
+        return tuple(attrs)
+
+    def __geo_names(self, cls=None):
+        """Return the names of the classes declaring __geo__, or of cls
+        only if it does."""
+        names = classes if cls is None else [self.__name(cls)]
+        return [name for name in names
+                if getattr(classes[name], "__geo__", None)]
+
+    def __column(self, value):
+        """Return value as stored in an indexed column: scalars as they
+        are, anything else as NULL.
+        """
+        return value if type(value) in (str, int, float, bool) else None
+
+    def __row(self, name, id):
+        """Return the (data,) row of the object name.id, or None."""
+        return self.__conn.execute(
+            'SELECT data FROM "{}" WHERE id = ?'.format(name),
+            (id,)).fetchone()
+
+    def __build(self, name, id, data):
+        """Return the object of the row name.id holding data, reusing the
+        instance already read, or None if it was deleted since the last
+        save.
+        """
+        key = "{}.{}".format(name, id)
+        obj = SQLiteStorage.__objects.get(key)
+        if obj is not None:
+            return obj
+        if key in SQLiteStorage.__pending:
+            return None
+        obj = classes[name].from_dict(codec.loads(data))
+        SQLiteStorage.__objects[key] = obj
+        return obj
@@ -2,6 +2,7 @@
 """ Defines the Place Class"""
 
 from models.base_model import BaseModel
+from models.relations import HasMany, BelongsTo, ListOf
 
 
 class Place(BaseModel):
@@ -18,8 +19,20 @@ class Place(BaseModel):
         latitude (float) : The latitude of the place.
         longitude (float) : The longitude of the place.
         amenity_ids (list): The list of amenity ids.
+        city (City) : The City of the place.
+        user (User) : The owner of the place.
+        reviews (list) : The reviews of the place.
+        amenities (list) : The amenities of the place.
     """
 
+    __indexes__ = ("city_id", "user_id")
+    __ranges__ = ("price_by_night", "number_rooms", "number_bathrooms",
+                  "max_guest")
+    __geo__ = ("latitude", "longitude")
+    __sets__ = ("amenity_ids",)
+    __fulltext__ = ("description",)
+    __aggregates__ = {"city_id": ("price_by_night",)}
+
     city_id = ""
     user_id = ""
     name = ""
@@ -31,3 +44,8 @@ class Place(BaseModel):
     latitude = 0.0
     longitude = 0.0
     amenity_ids = []
+
+    city = BelongsTo("City", "city_id")
+    user = BelongsTo("User", "user_id")
+    reviews = HasMany("Review", "place_id")
+    amenities = ListOf("Amenity", "amenity_ids")
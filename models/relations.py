@@ -0,0 +1,206 @@
+#!/usr/bin/python3
+""" Defines the relationship accessors of the model classes.
+
+The models link to each other by id: City.state_id, Place.city_id,
+Place.user_id, Place.amenity_ids, Review.place_id and Review.user_id.
+The classes of this module turn those links into read-only attributes
+answered through the storage indexes, e.g. state.cities, city.places,
+place.reviews or review.place, and prefetch() resolves several hops of
+them for many objects at once, one storage lookup per relation and
+level instead of one per object.
+"""
+
+import models
+
+_active = []
+
+
+class Relation:
+    """ Represent a read-only attribute holding the objects linked to an
+    instance, computed on each access.
+    Attributes:
+        cls_name (str): The name of the class of the linked objects.
+        attr (str): The attribute holding the link.
+        name (str): The name of the relation in its class.
+    """
+
+    def __init__(self, cls_name, attr):
+        """ Initialize a relation.
+        Args:
+            cls_name (str): The name of the class of the linked objects.
+            attr (str): The attribute holding the link.
+        """
+        self.cls_name = cls_name
+        self.attr = attr
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        """ Record the name the relation is assigned to."""
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        """ Return the linked objects of obj, prefetched or looked up."""
+        if obj is None:
+            return self
+        for cache in reversed(_active):
+            found = cache.get((id(obj), self.name))
+            if found is not None:
+                value = found[1]
+                return list(value) if type(value) is list else value
+        return self.load([obj])[id(obj)]
+
+    def __set__(self, obj, value):
+        """ Refuse to set the relation: its links are set instead."""
+        raise AttributeError("can't set attribute '{}'".format(self.name))
+
+    def load(self, objs):
+        """ Return the linked objects of each object of objs, keyed by
+        the id() of the object.
+        """
+        raise NotImplementedError
+
+
+class HasMany(Relation):
+    """ Represent the objects whose attribute attr holds the id of an
+    instance, as a list: State.cities = HasMany("City", "state_id").
+    """
+
+    def load(self, objs):
+        """ Return the linked objects of each object of objs, keyed by
+        the id() of the object.
+        """
+        found = models.storage.find_in(self.cls_name, self.attr,
+                                       [obj.id for obj in objs])
+        return {id(obj): list(found.get(obj.id, {}).values())
+                for obj in objs}
+
+
+class BelongsTo(Relation):
+    """ Represent the object whose id is the attribute attr of an
+    instance, or None: City.state = BelongsTo("State", "state_id").
+    """
+
+    def load(self, objs):
+        """ Return the linked object of each object of objs, keyed by
+        the id() of the object.
+        """
+        ids = {id(obj): self.__id(obj) for obj in objs}
+        found = models.storage.find_in(
+            self.cls_name, "id", [i for i in ids.values() if i is not None])
+        return {key: next(iter(found.get(i, {}).values()), None)
+                for key, i in ids.items()}
+
+    def __id(self, obj):
+        """ Return the id in the attribute attr of obj, or None if it is
+        not a string."""
+        i = getattr(obj, self.attr, None)
+        return i if type(i) is str else None
+
+
+class ListOf(Relation):
+    """ Represent the objects whose ids are listed in the attribute attr
+    of an instance, in the order of the list, skipping missing ones:
+    Place.amenities = ListOf("Amenity", "amenity_ids").
+    """
+
+    def load(self, objs):
+        """ Return the linked objects of each object of objs, keyed by
+        the id() of the object.
+        """
+        lists = {id(obj): self.__ids(obj) for obj in objs}
+        found = models.storage.find_in(
+            self.cls_name, "id", [i for ids in lists.values() for i in ids])
+        return {key: [obj for i in ids for obj in found.get(i, {}).values()]
+                for key, ids in lists.items()}
+
+    def __ids(self, obj):
+        """ Return the hashable ids listed in the attribute attr of obj."""
+        ids = getattr(obj, self.attr, None)
+        if type(ids) not in (list, tuple):
+            return []
+        return [i for i in ids if type(i) is str]
+
+
+class ListedIn(Relation):
+    """ Represent the objects whose list attribute attr holds the id of
+    an instance: Amenity.places = ListedIn("Place", "amenity_ids").
+    """
+
+    def load(self, objs):
+        """ Return the linked objects of each object of objs, keyed by
+        the id() of the object.
+        """
+        linked = {obj.id: [] for obj in objs}
+        found = models.storage.having(self.cls_name, self.attr,
+                                      list(linked), "any")
+        for other in found.values():
+            for i in {i for i in getattr(other, self.attr, ())
+                      if type(i) is str}:
+                if i in linked:
+                    linked[i].append(other)
+        return {id(obj): list(linked[obj.id]) for obj in objs}
+
+
+class prefetch:
+    """ Represent a context in which the relations named by dotted paths,
+    e.g. "cities.places.reviews", are resolved for a list of objects in
+    advance: each relation of each level is loaded once for every object
+    of that level, and the accessors return those results, unchanged by
+    later writes, until the end of the with block.
+    Attributes:
+        objs (list): The objects the paths start from.
+        cache (dict): (id(object), relation name) pairs mapped to an
+            (object, linked objects) pair.
+    """
+
+    def __init__(self, objs, *paths):
+        """ Resolve paths for every object of objs.
+        Args:
+            objs (iterable): The objects the paths start from.
+            *paths (str): Dotted paths of relation names.
+        Raises:
+            AttributeError: If a name is not a relation of the class of
+                an object it applies to.
+        """
+        self.objs = list(objs)
+        self.cache = {}
+        tree = {}
+        for path in paths:
+            node = tree
+            for name in path.split("."):
+                node = node.setdefault(name, {})
+        self.__resolve(self.objs, tree)
+
+    def __enter__(self):
+        """ Make the accessors return the prefetched objects."""
+        _active.append(self.cache)
+        return self.objs
+
+    def __exit__(self, *exc):
+        """ Make the accessors look the objects up again."""
+        _active.remove(self.cache)
+        return False
+
+    def __resolve(self, objs, tree):
+        """ Load the relations of tree for objs, then their subtrees for
+        the objects they link to.
+        """
+        for name, subtree in tree.items():
+            groups = {}
+            for obj in objs:
+                relation = getattr(type(obj), name, None)
+                if not isinstance(relation, Relation):
+                    raise AttributeError("'{}' has no relation '{}'".format(
+                        type(obj).__name__, name))
+                groups.setdefault(relation, []).append(obj)
+            linked = {}
+            for relation, members in groups.items():
+                found = relation.load(members)
+                for obj in members:
+                    value = found[id(obj)]
+                    self.cache[id(obj), name] = obj, value
+                    for other in value if type(value) is list else [value]:
+                        if other is not None:
+                            linked[id(other)] = other
+            if subtree:
+                self.__resolve(list(linked.values()), subtree)
@@ -2,6 +2,7 @@
 """ Defines a Review class"""
 
 from models.base_model import BaseModel
+from models.relations import BelongsTo
 
 class Review(BaseModel):
     """ Representing a review.
@@ -9,8 +10,17 @@ class Review(BaseModel):
         place_id (str) : The Place id.
         user_id (str) : The User id.
         text (str) : The review text.
+        place (Place) : The reviewed place.
+        user (User) : The author of the review.
     """
 
+    __indexes__ = ("place_id", "user_id")
+    __fulltext__ = ("text",)
+    __aggregates__ = {"place_id": ()}
+
     place_id = ""
     user_id = ""
     text = ""
+
+    place = BelongsTo("Place", "place_id")
+    user = BelongsTo("User", "user_id")
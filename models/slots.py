@@ -0,0 +1,145 @@
+#!/usr/bin/python3
+""" Defines the slot-based variants of the model classes.
+
+slotted(Place) returns a class named Place, subclassing Place, that keeps
+id, created_at, updated_at and the declared class attributes of Place in
+__slots__ instead of an instance dictionary. Attributes that are not
+declared go to a small overflow dictionary created on first use.
+"""
+
+import models
+from uuid import uuid4
+from datetime import datetime
+from models.base_model import parse_datetime
+from models.relations import Relation
+
+_variants = {}
+
+
+def slotted(cls):
+    """ Return the slot-based variant of the model class cls."""
+    if cls not in _variants:
+        fields = ["id", "created_at", "updated_at"]
+        for klass in reversed(cls.__mro__):
+            for name, value in vars(klass).items():
+                if (not name.startswith("_") and name not in fields and
+                        not callable(value) and
+                        not isinstance(value, (property, classmethod,
+                                               staticmethod, Relation))):
+                    fields.append(name)
+        defaults = {name: getattr(cls, name) for name in fields[3:]}
+        defaults["_extra"] = None
+        namespace = {
+            "__slots__": tuple(fields) + ("_extra",),
+            "__module__": cls.__module__,
+            "__doc__": cls.__doc__,
+            "_defaults": defaults,
+            "_fields": frozenset(fields),
+        }
+        _variants[cls] = type(cls.__name__, (SlottedModel, cls), namespace)
+    return _variants[cls]
+
+
+class SlottedModel:
+    """ Mixin of the slot-based model variants built by slotted().
+    Attributes:
+        _defaults (dict): Declared attributes mapped to the class default
+            returned while their slot is unset.
+        _fields (frozenset): The attributes kept in slots.
+    """
+
+    __slots__ = ()
+
+    def _fill(self, dictionary):
+        """ Set the attributes of a new instance from dictionary."""
+        setter = object.__setattr__
+        if "id" in dictionary:
+            setter(self, "id", dictionary["id"])
+        else:
+            setter(self, "id", str(uuid4()))
+        for k in ("created_at", "updated_at"):
+            if k in dictionary:
+                setter(self, k, parse_datetime(dictionary[k]))
+            else:
+                setter(self, k, datetime.today())
+        fields = self._fields
+        extra = None
+        for k, v in dictionary.items():
+            if k in ("id", "created_at", "updated_at", "__class__"):
+                continue
+            if k in fields:
+                setter(self, k, v)
+            else:
+                if extra is None:
+                    extra = {}
+                    setter(self, "_extra", extra)
+                extra[k] = v
+
+    def _reset(self, dictionary):
+        """ Replace the attributes of the instance by those of dictionary,
+        without marking it as changed in storage.
+        """
+        for name in type(self).__slots__:
+            try:
+                object.__delattr__(self, name)
+            except AttributeError:
+                pass
+        self._fill(dictionary)
+
+    def __getattr__(self, name):
+        """ Return the class default of an unset slot or an overflow
+        attribute.
+        """
+        defaults = type(self)._defaults
+        if name in defaults:
+            return defaults[name]
+        extra = self._extra
+        if extra is not None and name in extra:
+            return extra[name]
+        raise AttributeError("'{}' object has no attribute '{}'".format(
+            type(self).__name__, name))
+
+    def __setattr__(self, name, value):
+        """ Set an attribute and mark the instance as changed in storage.
+        The relations of the class refuse to be set, as on the regular
+        models.
+        """
+        if name in self._fields:
+            object.__setattr__(self, name, value)
+        elif isinstance(getattr(type(self), name, None), Relation):
+            getattr(type(self), name).__set__(self, value)
+        else:
+            if self._extra is None:
+                object.__setattr__(self, "_extra", {})
+            self._extra[name] = value
+        models.storage.touch(self, name)
+
+    def attributes(self):
+        """ Return the dictionary of the attributes set on the instance,
+        the counterpart of __dict__ for regular models.
+        """
+        attrs = {}
+        cls = type(self)
+        for name in cls.__slots__[:-1]:
+            try:
+                attrs[name] = getattr(cls, name).__get__(self, cls)
+            except AttributeError:
+                pass
+        if self._extra is not None:
+            attrs.update(self._extra)
+        return attrs
+
+    def to_dict(self):
+        """ Return the dictionary of the instance, as BaseModel.to_dict()."""
+        redict = self.attributes()
+        redict["created_at"] = self.created_at.isoformat(
+            timespec="microseconds")
+        redict["updated_at"] = self.updated_at.isoformat(
+            timespec="microseconds")
+        redict["__class__"] = self.__class__.__name__
+        return redict
+
+    def __str__(self):
+        """ Return the string representation of the instance."""
+        clsname = self.__class__.__name__
+        return "[{}] ({}) {}".format(clsname, self.id, self.attributes())
@@ -2,12 +2,16 @@
 """ Defines the State Class"""
 
 from models.base_model import BaseModel
+from models.relations import HasMany
 
 
 class State(BaseModel):
     """ Representing a State.
     Attributes:
         name (str) : Name of State.
+        cities (list) : The cities of the State.
     """
 
     name = ""
+
+    cities = HasMany("City", "state_id")
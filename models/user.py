@@ -2,6 +2,7 @@
 """ Defines a User Class that inherits from BaseModel"""
 
 from models.base_model import BaseModel
+from models.relations import HasMany
 
 
 class User(BaseModel):
@@ -11,9 +12,14 @@ class User(BaseModel):
         password (str) : User password.
         first_name (str) : User first name.
         last_name (str) : User last name.
+        places (list) : The places of the user.
+        reviews (list) : The reviews written by the user.
     """
 
     email = ""
     password = ""
     first_name = ""
     last_name = ""
+
+    places = HasMany("Place", "user_id")
+    reviews = HasMany("Review", "user_id")
@@ -0,0 +1,814 @@
+#!/usr/bin/python3
+"""Defines unittests for console.py.
+Unittest classes:
+    TestHBNBCommand_create
+    TestHBNBCommand_all
+    TestHBNBCommand_count
+    TestHBNBCommand_show
+    TestHBNBCommand_update
+    TestHBNBCommand_transaction
+    TestHBNBCommand_import_export
+    TestHBNBCommand_batch
+    TestHBNBCommand_where
+    TestHBNBCommand_search
+    TestHBNBCommand_stats
+    TestHBNBCommand_geo
+"""
+import os
+import unittest
+from io import StringIO
+from unittest.mock import patch
+import json
+import console
+from console import HBNBCommand, run_batch, main
+from models import storage
+from models.engine.file_storage import FileStorage
+from models.city import City
+from models.place import Place
+from models.user import User
+from models.state import State
+from models.review import Review
+from models.slots import slotted
+
+
+class TestHBNBCommand_create(unittest.TestCase):
+    """Unittests for the create command of the HBNB command interpreter."""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_create(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("create User"))
+            uid = output.getvalue().strip()
+        self.assertIsInstance(storage.get(User, uid), User)
+        with open("file.json", "r") as f:
+            self.assertIn("User." + uid, f.read())
+
+    def test_create_with_parameters(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd('create Place name="My_little_house" '
+                                 'number_rooms=4 latitude=37.77 bad')
+            plc = storage.get(Place, output.getvalue().strip())
+        self.assertEqual("My little house", plc.name)
+        self.assertEqual(4, plc.number_rooms)
+        self.assertEqual(37.77, plc.latitude)
+        self.assertNotIn("bad", plc.__dict__)
+
+    def test_create_missing_class(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("create")
+            self.assertEqual("** class name missing **",
+                             output.getvalue().strip())
+
+    def test_create_invalid_class(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("create MyModel")
+            self.assertEqual("** class doesn't exist **",
+                             output.getvalue().strip())
+
+
+class TestHBNBCommand_all(unittest.TestCase):
+    """Unittests for the all command of the HBNB command interpreter."""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_all_objects(self):
+        usr = User()
+        ste = State()
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("all"))
+            self.assertIn(usr.id, output.getvalue())
+            self.assertIn(ste.id, output.getvalue())
+
+    def test_all_single_class(self):
+        usr = User()
+        ste = State()
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("all User"))
+            self.assertIn(usr.id, output.getvalue())
+            self.assertNotIn(ste.id, output.getvalue())
+
+    def test_all_single_class_dot_notation(self):
+        usr = User()
+        ste = State()
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("State.all()"))
+            self.assertIn(ste.id, output.getvalue())
+            self.assertNotIn(usr.id, output.getvalue())
+
+    def test_all_invalid_class(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("all MyModel"))
+            self.assertEqual("** class doesn't exist **",
+                             output.getvalue().strip())
+
+    def test_all_same_output_as_list(self):
+        objs = [User(), State(), User()]
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("all")
+        self.assertEqual(str([str(obj) for obj in objs]) + "\n",
+                         output.getvalue())
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("all Amenity")
+        self.assertEqual("[]\n", output.getvalue())
+
+    def test_all_lines(self):
+        objs = [User(), User()]
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("all User --lines")
+        self.assertEqual([str(obj) for obj in objs],
+                         output.getvalue().splitlines())
+
+    def test_all_jsonl(self):
+        objs = [User(), User()]
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("User.all(--jsonl)")
+        self.assertEqual([obj.to_dict() for obj in objs],
+                         [json.loads(line) for line
+                          in output.getvalue().splitlines()])
+
+    def test_all_limit_offset(self):
+        objs = [State() for i in range(5)]
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("all State --lines --offset 1 --limit 2")
+        self.assertEqual([str(obj) for obj in objs[1:3]],
+                         output.getvalue().splitlines())
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("all --offset 4 --lines")
+        self.assertEqual([str(objs[4])], output.getvalue().splitlines())
+
+    def test_all_invalid_limit(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("all State --limit x")
+        self.assertEqual("** invalid limit **", output.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("all --offset")
+        self.assertEqual("** invalid offset **", output.getvalue().strip())
+
+
+class TestHBNBCommand_count(unittest.TestCase):
+    """Unittests for the count command of the HBNB command interpreter."""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_count_class(self):
+        User()
+        User()
+        State()
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("count User"))
+            self.assertEqual("2", output.getvalue().strip())
+
+    def test_count_dot_notation(self):
+        State()
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("State.count()"))
+            self.assertEqual("1", output.getvalue().strip())
+
+    def test_count_after_destroy(self):
+        usr = User()
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("destroy User {}".format(usr.id))
+            HBNBCommand().onecmd("count User")
+            self.assertEqual("0", output.getvalue().strip())
+
+
+class TestHBNBCommand_show(unittest.TestCase):
+    """Unittests for the show command of the HBNB command interpreter."""
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+
+    def test_show(self):
+        usr = User()
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("show User " + usr.id))
+            self.assertEqual(usr.__str__(), output.getvalue().strip())
+
+    def test_show_dot_notation(self):
+        usr = User()
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                "User.show({})".format(usr.id)))
+            self.assertEqual(usr.__str__(), output.getvalue().strip())
+
+    def test_show_missing_instance(self):
+        usr = User()
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("show State " + usr.id))
+            self.assertEqual("** no instance found **",
+                             output.getvalue().strip())
+
+
+class TestHBNBCommand_update(unittest.TestCase):
+    """Unittests for the update command of the HBNB command interpreter."""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_update_keeps_index(self):
+        cty = City()
+        cty.state_id = "CA"
+        cty.save()
+        with patch("sys.stdout", new=StringIO()):
+            HBNBCommand().onecmd(
+                'update City {} state_id "NV"'.format(cty.id))
+        self.assertEqual({}, storage.find(City, state_id="CA"))
+        self.assertIn("City." + cty.id, storage.find(City, state_id="NV"))
+
+    def test_update_dictionary_keeps_index(self):
+        cty = City()
+        with patch("sys.stdout", new=StringIO()):
+            HBNBCommand().onecmd(
+                "City.update({}, {{'state_id': 'TX'}})".format(cty.id))
+        self.assertIn("City." + cty.id, storage.find(City, state_id="TX"))
+
+    def test_update_list(self):
+        plc = Place()
+        for value, expected in [('["wifi", "pool"]', ["wifi", "pool"]),
+                                ("[wifi, 'spa']", ["wifi", "spa"]),
+                                ("[]", []), ("{'a': 1}", "{'a': 1}")]:
+            with patch("sys.stdout", new=StringIO()):
+                HBNBCommand().onecmd("update Place {} amenity_ids {}"
+                                     .format(plc.id, value))
+            self.assertEqual(expected, plc.amenity_ids)
+
+    def test_update_list_keeps_index(self):
+        plc = Place()
+        with patch("sys.stdout", new=StringIO()):
+            HBNBCommand().onecmd('update Place {} amenity_ids ["a", "b"]'
+                                 .format(plc.id))
+        self.assertIn("Place." + plc.id,
+                      storage.having(Place, "amenity_ids", ["a", "b"]))
+        with patch("sys.stdout", new=StringIO()):
+            HBNBCommand().onecmd(
+                "Place.update({}, {{'amenity_ids': ['c']}})".format(plc.id))
+        self.assertEqual({}, storage.having(Place, "amenity_ids", ["a"]))
+        self.assertIn("Place." + plc.id,
+                      storage.having(Place, "amenity_ids", ["c"]))
+
+    def test_update_relation(self):
+        cty = City()
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("update City {} places x".format(cty.id))
+        self.assertEqual("** can't set attribute 'places' **",
+                         output.getvalue().strip())
+        self.assertEqual([], cty.places)
+
+    def test_destroy_keeps_index(self):
+        cty = City()
+        cty.state_id = "CA"
+        cty.save()
+        with patch("sys.stdout", new=StringIO()):
+            HBNBCommand().onecmd("destroy City {}".format(cty.id))
+        self.assertEqual({}, storage.find(City, state_id="CA"))
+
+
+class TestHBNBCommand_transaction(unittest.TestCase):
+    """Unittests for the begin, commit and rollback commands."""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        FileStorage._FileStorage__depth = 0
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def run_cmd(self, line):
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd(line)
+        return output.getvalue().strip()
+
+    def test_commit(self):
+        self.assertEqual("", self.run_cmd("begin"))
+        uid = self.run_cmd("create User")
+        self.assertFalse(os.path.exists("file.json"))
+        self.assertEqual("", self.run_cmd("commit"))
+        with open("file.json") as f:
+            self.assertIn("User." + uid, f.read())
+
+    def test_rollback(self):
+        self.run_cmd("begin")
+        uid = self.run_cmd("create User")
+        self.run_cmd("rollback")
+        self.assertEqual("** no instance found **",
+                         self.run_cmd("show User " + uid))
+        self.assertFalse(storage.in_transaction())
+
+    def test_no_transaction(self):
+        self.assertEqual("** no transaction in progress **",
+                         self.run_cmd("commit"))
+        self.assertEqual("** no transaction in progress **",
+                         self.run_cmd("rollback"))
+
+    def test_begin_twice(self):
+        self.run_cmd("begin")
+        self.assertEqual("** transaction already in progress **",
+                         self.run_cmd("begin"))
+
+
+class TestHBNBCommand_import_export(unittest.TestCase):
+    """Unittests for the import and export commands."""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        FileStorage._FileStorage__depth = 0
+        FileStorage._FileStorage__savepoints = []
+        for path in ("file.json", "test_import.jsonl", "test_import.csv"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def run_cmd(self, line):
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd(line)
+        return output.getvalue().strip()
+
+    def test_import_saves_once(self):
+        with open("test_import.jsonl", "w") as f:
+            for i in range(5):
+                f.write('{{"__class__": "City", "name": "C{}"}}\n'.format(i))
+        with patch.object(storage, "save", wraps=storage.save) as save:
+            self.assertEqual("5", self.run_cmd("import test_import.jsonl"))
+        self.assertEqual(1, save.call_count)
+        self.assertEqual(5, storage.count(City))
+        with open("file.json") as f:
+            self.assertIn("C4", f.read())
+
+    def test_export_import(self):
+        for i in range(3):
+            State.from_dict({"name": "S{}".format(i)}).save()
+        for path in ("test_import.jsonl", "test_import.csv"):
+            before = {k: v.to_dict() for k, v in storage.all(State).items()}
+            self.assertEqual("3", self.run_cmd("export State " + path))
+            FileStorage._FileStorage__objects = {}
+            self.assertEqual("3", self.run_cmd("import " + path))
+            self.assertEqual(before, {k: v.to_dict() for k, v
+                                      in storage.all(State).items()})
+
+    def test_import_default_class(self):
+        with open("test_import.csv", "w") as f:
+            f.write("name,number_rooms\nLoft,3\n")
+        self.assertEqual("1", self.run_cmd("import test_import.csv Place"))
+        plc = list(storage.all(Place).values())[0]
+        self.assertEqual(("Loft", 3), (plc.name, plc.number_rooms))
+
+    def test_import_rolls_back(self):
+        with open("test_import.jsonl", "w") as f:
+            f.write('{"__class__": "City"}\n{"__class__": "Nope"}\n')
+        self.assertEqual("** class doesn't exist **",
+                         self.run_cmd("import test_import.jsonl"))
+        self.assertEqual(0, storage.count())
+        with open("test_import.jsonl", "w") as f:
+            f.write('{"__class__": "City"}\n{"__class__"\n')
+        self.assertEqual("** invalid record **",
+                         self.run_cmd("import test_import.jsonl"))
+        self.assertEqual(0, storage.count())
+        with open("test_import.jsonl", "w") as f:
+            f.write('{"__class__": "City"}\n[1, 2]\n')
+        self.assertEqual("** invalid record **",
+                         self.run_cmd("import test_import.jsonl"))
+        self.assertEqual(0, storage.count())
+
+    def test_import_rollback_keeps_transaction(self):
+        with open("test_import.jsonl", "w") as f:
+            f.write('{"__class__": "City"}\n{"__class__": "Nope"}\n')
+        self.run_cmd("begin")
+        uid = self.run_cmd("create State name=\"Utah\"")
+        self.assertEqual("** class doesn't exist **",
+                         self.run_cmd("import test_import.jsonl"))
+        self.assertTrue(storage.in_transaction())
+        self.assertEqual(0, storage.count(City))
+        self.assertEqual("Utah", storage.get(State, uid).name)
+        self.run_cmd("commit")
+        with open("file.json") as f:
+            self.assertIn("State." + uid, f.read())
+
+    def test_import_errors(self):
+        self.assertEqual("** file name missing **", self.run_cmd("import"))
+        self.assertEqual("** file doesn't exist **",
+                         self.run_cmd("import missing.jsonl"))
+        self.assertEqual("** class doesn't exist **",
+                         self.run_cmd("import test_import.jsonl Nope"))
+
+    def test_export_errors(self):
+        self.assertEqual("** class name missing **", self.run_cmd("export"))
+        self.assertEqual("** class doesn't exist **",
+                         self.run_cmd("export Nope out.jsonl"))
+        self.assertEqual("** file name missing **",
+                         self.run_cmd("export User"))
+
+
+class TestHBNBCommand_batch(unittest.TestCase):
+    """Unittests for the --batch mode of the console."""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        for path in ("file.json", "test_batch.txt"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def run_batch(self, lines, every=0):
+        report = StringIO()
+        with patch("sys.stdout", new=StringIO()) as output:
+            failed = run_batch(HBNBCommand(), lines, every, report)
+        return (failed, output.getvalue(),
+                [json.loads(line) for line in report.getvalue().splitlines()])
+
+    def test_saves_at_end(self):
+        lines = ["create User"] * 20
+        with patch.object(FileStorage, "_FileStorage__compact") as compact:
+            failed, output, report = self.run_batch(lines)
+        self.assertEqual(0, failed)
+        self.assertEqual(1, compact.call_count)
+        self.assertEqual(20, len(output.split()))
+        self.assertEqual(20, storage.count(User))
+        self.assertFalse(storage.in_transaction())
+
+    def test_saves_every(self):
+        with patch.object(FileStorage, "_FileStorage__compact") as compact:
+            self.run_batch(["create User"] * 20, every=5)
+        self.assertEqual(4, compact.call_count)
+
+    def test_report(self):
+        failed, output, report = self.run_batch(
+            ["create State", "", "# comment", "show Nope 1", "foo.bar()"])
+        self.assertEqual(2, failed)
+        self.assertEqual([1, 4, 5], [entry["line"] for entry in report])
+        self.assertEqual([None, "class doesn't exist",
+                          "Unknown syntax: foo.bar()"],
+                         [entry["error"] for entry in report])
+        self.assertEqual("show Nope 1", report[1]["command"])
+        self.assertIsInstance(report[0]["seconds"], float)
+
+    def test_exception_reported(self):
+        with patch.object(HBNBCommand, "do_count", side_effect=OSError("x")):
+            failed, output, report = self.run_batch(["count", "create User"])
+        self.assertEqual(1, failed)
+        self.assertEqual("OSError: x", report[0]["error"])
+        self.assertEqual(1, storage.count(User))
+
+    def test_failed_import_keeps_batch(self):
+        with open("test_batch.txt", "w") as f:
+            f.write('{"__class__": "City"}\n{"__class__"\n')
+        failed, output, report = self.run_batch(
+            ["create State name=\"California\"",
+             "import test_batch.txt", "create User"])
+        self.assertEqual(1, failed)
+        self.assertEqual("invalid record", report[1]["error"])
+        self.assertEqual(1, storage.count(State))
+        self.assertEqual(0, storage.count(City))
+        self.assertEqual(1, storage.count(User))
+        with open("file.json") as f:
+            self.assertIn("California", f.read())
+
+    def test_transaction_commands_refused(self):
+        failed, output, report = self.run_batch(
+            ["create User", "begin", "rollback", "commit", "create User"])
+        self.assertEqual(3, failed)
+        self.assertEqual(["transactions not allowed in batch mode"] * 3,
+                         [entry["error"] for entry in report[1:4]])
+        self.assertEqual(2, storage.count(User))
+        self.assertFalse(storage.in_transaction())
+        self.assertFalse(HBNBCommand.batch)
+
+    def test_quit_stops(self):
+        failed, output, report = self.run_batch(["quit", "create User"])
+        self.assertEqual(1, len(report))
+        self.assertEqual(0, storage.count())
+
+    def test_main_file(self):
+        with open("test_batch.txt", "w") as f:
+            f.write("create City\nshow City\n")
+        with patch("sys.stdout", new=StringIO()), \
+                patch("sys.stderr", new=StringIO()) as report:
+            self.assertEqual(1, main(["--batch", "test_batch.txt"]))
+        self.assertEqual(2, len(report.getvalue().splitlines()))
+        with open("file.json") as f:
+            self.assertIn("City.", f.read())
+
+
+class TestHBNBCommand_where(unittest.TestCase):
+    """Unittests for the where command."""
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        for i in range(4):
+            plc = Place.from_dict({"name": "P{}".format(i),
+                                   "city_id": "c{}".format(i % 2),
+                                   "price_by_night": 50 * i,
+                                   "number_rooms": i})
+            storage.new(plc)
+
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+
+    def run_cmd(self, line):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(line))
+        return output.getvalue().splitlines()
+
+    def test_where(self):
+        lines = self.run_cmd("where Place price_by_night < 120 and "
+                             "number_rooms > 0 and city_id = c1")
+        self.assertEqual(1, len(lines))
+        self.assertTrue(lines[0].startswith("[Place] ("))
+        self.assertIn("'name': 'P1'", lines[0])
+
+    def test_where_dot_notation(self):
+        self.assertEqual(['{"name": "P3"}', '{"name": "P2"}'], self.run_cmd(
+            "Place.where(order by number_rooms desc limit 2 select name)"))
+
+    def test_where_has(self):
+        plc = next(iter(storage.find(Place, name="P2").values()))
+        plc.amenity_ids = ["wifi", "pool"]
+        lines = self.run_cmd("where Place amenity_ids has wifi and "
+                             "amenity_ids has pool select name")
+        self.assertEqual(['{"name": "P2"}'], lines)
+        self.assertEqual([], self.run_cmd("where Place amenity_ids has "
+                                          "wifi and amenity_ids has spa"))
+
+    def test_where_reserved_names(self):
+        storage.new(City.from_dict({"name": "Provo", "state_id": "c1",
+                                    "cls": 1}))
+        self.assertEqual(['{"name": "Provo"}'], self.run_cmd(
+            "where City cls = 1 and state_id = c1 select name"))
+
+    def test_where_errors(self):
+        self.assertEqual(["** invalid query: class name missing **"],
+                         self.run_cmd("where"))
+        self.assertEqual(["** class doesn't exist **"],
+                         self.run_cmd("where Nope"))
+        self.assertEqual(["** invalid query: value missing after < **"],
+                         self.run_cmd("where Place number_rooms <"))
+        storage.new(Place.from_dict({"number_rooms": "two"}))
+        self.assertEqual(["** invalid query: cannot order by "
+                          "number_rooms **"],
+                         self.run_cmd("where Place order by number_rooms"))
+
+
+class TestHBNBCommand_search(unittest.TestCase):
+    """Unittests for the search command."""
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        for text in ["Great pool", "Pool with a great view", "Noisy"]:
+            storage.new(Review.from_dict({"text": text}))
+
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+
+    def run_cmd(self, line):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(line))
+        return output.getvalue().splitlines()
+
+    def test_search(self):
+        lines = self.run_cmd("search Review great po*")
+        self.assertEqual(2, len(lines))
+        self.assertIn("'text': 'Great pool'", lines[0])
+        self.assertRegex(lines[0], r"^\d+\.\d{3} \[Review\] \(")
+        self.assertEqual(lines[:1],
+                         self.run_cmd("search Review --limit 1 great pool"))
+        self.assertEqual(lines, self.run_cmd(
+            'Review.search("great po*")'))
+        self.assertEqual([], self.run_cmd("search Review quiet"))
+
+    def test_search_errors(self):
+        self.assertEqual(["** class name missing **"],
+                         self.run_cmd("search"))
+        self.assertEqual(["** class doesn't exist **"],
+                         self.run_cmd("search Nope pool"))
+        self.assertEqual(["** class has no full-text attributes **"],
+                         self.run_cmd("search City pool"))
+        self.assertEqual(["** search words missing **"],
+                         self.run_cmd("search Review"))
+        self.assertEqual(["** invalid limit **"],
+                         self.run_cmd("search Review pool --limit x"))
+
+
+class TestHBNBCommand_stats(unittest.TestCase):
+    """Unittests for the stats command."""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        for city, price in [("c1", 100), ("c1", 50), ("c2", 80)]:
+            storage.new(Place.from_dict({"city_id": city,
+                                         "price_by_night": price,
+                                         "max_guest": 2}))
+
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def run_cmd(self, line):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(line))
+        return output.getvalue().splitlines()
+
+    def test_stats(self):
+        self.assertEqual({"count": 2, "sum": {"price_by_night": 150},
+                          "avg": {"price_by_night": 75.0}},
+                         json.loads(self.run_cmd("stats Place city_id c1")[0]))
+        self.assertEqual([{"city_id": "c1", "count": 2,
+                           "sum": {"price_by_night": 150},
+                           "avg": {"price_by_night": 75.0}},
+                          {"city_id": "c2", "count": 1,
+                           "sum": {"price_by_night": 80},
+                           "avg": {"price_by_night": 80.0}}],
+                         sorted((json.loads(line) for line in
+                                 self.run_cmd("stats Place city_id")),
+                                key=lambda stats: stats["city_id"]))
+        self.assertEqual(3, json.loads(self.run_cmd(
+            "stats Place max_guest 2")[0])["count"])
+
+    def test_update_destroy(self):
+        plc = next(iter(storage.find(Place, city_id="c2").values()))
+        self.run_cmd("update Place {} price_by_night 120".format(plc.id))
+        self.run_cmd('update Place {} city_id "c1"'.format(plc.id))
+        self.assertEqual(3, storage.aggregate(Place, "city_id",
+                                              "c1")["count"])
+        self.assertEqual(270, storage.aggregate(
+            Place, "city_id", "c1")["sum"]["price_by_night"])
+        self.run_cmd("destroy Place {}".format(plc.id))
+        self.assertEqual(150, storage.aggregate(
+            Place, "city_id", "c1")["sum"]["price_by_night"])
+        self.assertEqual(["OK"], self.run_cmd("stats --check"))
+
+    def test_stats_errors(self):
+        self.assertEqual(["** class name missing **"], self.run_cmd("stats"))
+        self.assertEqual(["** class doesn't exist **"],
+                         self.run_cmd("stats Nope city_id"))
+        self.assertEqual(["** attribute name missing **"],
+                         self.run_cmd("stats Place"))
+        self.assertEqual(["** invalid number **"],
+                         self.run_cmd("stats Place max_guest two"))
+
+    def test_stats_slotted(self):
+        with patch.dict(console.classes, {"Place": slotted(Place)}):
+            self.assertEqual(3, json.loads(self.run_cmd(
+                "stats Place max_guest 2")[0])["count"])
+            self.assertEqual(["** invalid number **"],
+                             self.run_cmd("stats Place max_guest two"))
+
+
+class TestHBNBCommand_geo(unittest.TestCase):
+    """Unittests for the near and bbox commands."""
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        self.paris = Place.from_dict({"name": "Paris", "latitude": 48.8566,
+                                      "longitude": 2.3522})
+        self.london = Place.from_dict({"name": "London",
+                                       "latitude": 51.5072,
+                                       "longitude": -0.1276})
+        storage.new(self.paris)
+        storage.new(self.london)
+
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+
+    def run_cmd(self, line):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(line))
+        return output.getvalue().splitlines()
+
+    def test_near(self):
+        lines = self.run_cmd("near 48.85 2.35 400")
+        self.assertEqual(2, len(lines))
+        self.assertTrue(lines[0].startswith("0.7"))
+        self.assertIn(self.paris.id, lines[0])
+        self.assertIn(self.london.id, lines[1])
+        self.assertEqual(1, len(self.run_cmd("near 48.85 2.35 400 1")))
+
+    def test_bbox(self):
+        self.assertEqual([str(self.london)],
+                         self.run_cmd("bbox 50 -1 52 1"))
+
+    def test_errors(self):
+        self.assertEqual(["** coordinates missing **"],
+                         self.run_cmd("near 1 2"))
+        self.assertEqual(["** invalid number **"],
+                         self.run_cmd("near 1 2 x"))
+        self.assertEqual(["** coordinates missing **"],
+                         self.run_cmd("bbox 1 2 3"))
+        self.assertEqual(["** invalid number **"],
+                         self.run_cmd("bbox 1 2 3 y"))
+
+
+if __name__ == "__main__":
+    unittest.main()
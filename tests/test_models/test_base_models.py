@@ -4,6 +4,8 @@ Unittest classes:
     TestBaseModel_instantiation
     TestBaseModel_save
     TestBaseModel_to_dict
+    TestBaseModel_from_dict
+    TestBaseModel_parse_datetime
 """
 
 import os
@@ -11,7 +13,8 @@ import models
 import unittest
 from datetime import datetime
 from time import sleep
-from models.base_model import BaseModel
+from unittest.mock import patch
+from models.base_model import BaseModel, parse_datetime, tform
 
 class TestBaseModel_instantiation(unittest.TestCase):
     """ Unittest for testing instantiation of BaseModel class"""
@@ -180,6 +183,14 @@ class TestBaseModel_to_dict(unittest.TestCase):
         }
         self.assertDictEqual(bmodel.to_dict(), tdict)
 
+    def test_to_dict_whole_second(self):
+        dtime = datetime(2017, 9, 28, 21, 5, 54)
+        bmodel = BaseModel()
+        bmodel.created_at = bmodel.updated_at = dtime
+        bmodel_dict = bmodel.to_dict()
+        self.assertEqual("2017-09-28T21:05:54.000000", bmodel_dict["created_at"])
+        self.assertEqual(dtime, BaseModel(**bmodel_dict).updated_at)
+
     def test_contrast_to_dict_dunder_dict(self):
         bmodel = BaseModel()
         self.assertNotEqual(bmodel.to_dict(), bmodel.__dict__)
@@ -190,6 +201,93 @@ class TestBaseModel_to_dict(unittest.TestCase):
             bmodel.to_dict(None)
 
 
+class TestBaseModel_from_dict(unittest.TestCase):
+    """ Unittests for the from_dict classmethod of the BaseModel class"""
+
+    def test_round_trip(self):
+        bmodel = BaseModel()
+        bmodel.name = "School"
+        copy = BaseModel.from_dict(bmodel.to_dict())
+        self.assertEqual(BaseModel, type(copy))
+        self.assertEqual(bmodel.__dict__, copy.__dict__)
+        self.assertEqual(bmodel.to_dict(), copy.to_dict())
+
+    def test_attribute_order(self):
+        dtime = datetime.today().isoformat()
+        bmodel = BaseModel.from_dict({"name": "x", "updated_at": dtime,
+                                      "id": "1", "created_at": dtime})
+        self.assertEqual(["id", "created_at", "updated_at", "name"],
+                         list(bmodel.__dict__))
+
+    def test_skips_defaults(self):
+        tdict = BaseModel().to_dict()
+        with patch("models.base_model.uuid4") as uuid4, \
+                patch("models.base_model.datetime") as dtime:
+            dtime.fromisoformat = datetime.fromisoformat
+            BaseModel.from_dict(tdict)
+            BaseModel(**tdict)
+            uuid4.assert_not_called()
+            dtime.today.assert_not_called()
+
+    def test_does_not_change_dictionary(self):
+        tdict = BaseModel().to_dict()
+        copy = dict(tdict)
+        BaseModel.from_dict(tdict)
+        self.assertEqual(copy, tdict)
+        self.assertNotIn("__class__", BaseModel.from_dict(tdict).__dict__)
+
+    def test_not_stored(self):
+        bmodel = BaseModel.from_dict({"id": "from_dict"})
+        self.assertNotIn("BaseModel.from_dict", models.storage.all())
+
+    def test_generates_missing_values(self):
+        bmodel = BaseModel.from_dict({"name": "x"})
+        self.assertEqual(str, type(bmodel.id))
+        self.assertEqual(datetime, type(bmodel.created_at))
+        self.assertEqual(datetime, type(bmodel.updated_at))
+        self.assertEqual("x", bmodel.name)
+
+    def test_subclass(self):
+        from models.place import Place
+        plc = Place.from_dict({"id": "1", "number_rooms": 3})
+        self.assertEqual(Place, type(plc))
+        self.assertEqual(3, plc.number_rooms)
+
+
+class TestBaseModel_parse_datetime(unittest.TestCase):
+    """ Unittests for the parse_datetime function of models/base_model.py"""
+
+    def assertSameAsStrptime(self, value):
+        try:
+            expected = datetime.strptime(value, tform)
+        except Exception as e:
+            with self.assertRaises(type(e)) as cm:
+                parse_datetime(value)
+            self.assertEqual(str(e), str(cm.exception))
+        else:
+            self.assertEqual(expected, parse_datetime(value))
+            self.assertIsNone(parse_datetime(value).tzinfo)
+
+    def test_isoformat(self):
+        dtime = datetime(2024, 3, 12, 0, 42, 45, 884699)
+        self.assertEqual(dtime, parse_datetime(dtime.isoformat()))
+        self.assertSameAsStrptime(dtime.isoformat())
+
+    def test_other_accepted_forms(self):
+        self.assertSameAsStrptime("2024-3-2T0:4:5.1")
+        self.assertSameAsStrptime("2024-03-12T00:42:45.000001")
+
+    def test_malformed(self):
+        for value in ("2024-03-12T00:42:45", "2024-03-12 00:42:45.884699",
+                      "2024-02-30T00:42:45.884699",
+                      "2024-13-12T00:42:45.884699",
+                      "2024-03-12T00:42:45.884699+00:00",
+                      "2024-03-12T00:42:45.88469Z", "", "garbage"):
+            self.assertSameAsStrptime(value)
+
+    def test_not_a_string(self):
+        for value in (None, 12, b"2024-03-12T00:42:45.884699"):
+            self.assertSameAsStrptime(value)
 
 
 if __name__ == "__main__":
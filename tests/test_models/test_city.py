@@ -191,4 +191,4 @@ class TestCity_to_dict(unittest.TestCase):
 
 
 if __name__ == "__main__":
-    unittest.main()1
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/python3
+""" Defines unittests for models/engine/bulk.py
+unittests class:
+    TestBulk_read_write
+"""
+
+import os
+import unittest
+from models.engine.bulk import is_csv, read_records, write_records
+from models.engine.file_storage import classes
+from models.place import Place
+from models.user import User
+
+
+class TestBulk_read_write(unittest.TestCase):
+    """ Unittests for read_records and write_records """
+
+    def tearDown(self):
+        for path in ("test_bulk.jsonl", "test_bulk.csv"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+
+    def places(self):
+        pl = Place.from_dict({"name": "Loft", "number_rooms": 3,
+                              "latitude": 1.5, "amenity_ids": ["a", "b"]})
+        return [pl, Place.from_dict({"name": "Flat"})]
+
+    def test_is_csv(self):
+        self.assertTrue(is_csv("dump.CSV"))
+        self.assertFalse(is_csv("dump.jsonl"))
+
+    def test_jsonl_round_trip(self):
+        objs = self.places()
+        self.assertEqual(2, write_records("test_bulk.jsonl", objs))
+        self.assertEqual([obj.to_dict() for obj in objs],
+                         list(read_records("test_bulk.jsonl", classes)))
+
+    def test_csv_round_trip(self):
+        objs = self.places()
+        self.assertEqual(2, write_records("test_bulk.csv", objs))
+        self.assertEqual([obj.to_dict() for obj in objs],
+                         list(read_records("test_bulk.csv", classes)))
+
+    def test_csv_round_trip_types(self):
+        plc = Place.from_dict({"name": "89", "description": "true",
+                               "number_rooms": 2.5, "price_by_night": "x",
+                               "rank": 89, "pets": True, "view": "sea",
+                               "code": "007", "tags": ["a"], "note": ""})
+        write_records("test_bulk.csv", iter([plc]))
+        self.assertEqual([plc.to_dict()],
+                         list(read_records("test_bulk.csv", classes)))
+
+    def test_csv_text_cells(self):
+        with open("test_bulk.csv", "w") as f:
+            f.write("name,number_rooms,view,rank\nLoft,3,sea,89\n")
+        self.assertEqual([{"name": "Loft", "number_rooms": 3, "view": "sea",
+                           "rank": 89, "__class__": "Place"}],
+                         list(read_records("test_bulk.csv", classes,
+                                           "Place")))
+
+    def test_jsonl_not_an_object(self):
+        with open("test_bulk.jsonl", "w") as f:
+            f.write('{"__class__": "User"}\n[1, 2]\n')
+        with self.assertRaises(ValueError):
+            list(read_records("test_bulk.jsonl", classes))
+
+    def test_csv_header(self):
+        write_records("test_bulk.csv", self.places())
+        with open("test_bulk.csv") as f:
+            self.assertEqual("__class__,id,created_at,updated_at,name,"
+                             "number_rooms,latitude,amenity_ids",
+                             f.readline().strip())
+
+    def test_default_class(self):
+        with open("test_bulk.jsonl", "w") as f:
+            f.write('{"email": "a@b.c"}\n\n')
+        self.assertEqual([{"email": "a@b.c", "__class__": "User"}],
+                         list(read_records("test_bulk.jsonl", classes,
+                                           "User")))
+        with open("test_bulk.csv", "w") as f:
+            f.write("email,first_name\na@b.c,\n")
+        self.assertEqual([{"email": "a@b.c", "__class__": "User"}],
+                         list(read_records("test_bulk.csv", classes,
+                                           "User")))
+
+    def test_unknown_class(self):
+        with open("test_bulk.jsonl", "w") as f:
+            f.write('{"__class__": "Nope"}\n')
+        with self.assertRaises(KeyError):
+            list(read_records("test_bulk.jsonl", classes))
+
+
+if __name__ == "__main__":
+    unittest.main()
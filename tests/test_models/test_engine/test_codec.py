@@ -0,0 +1,52 @@
+#!/usr/bin/python3
+""" Defines unittests for models/engine/codec.py
+unittests class:
+    TestCodec
+"""
+
+import json
+import math
+import unittest
+from models.engine import codec
+
+
+class TestCodec(unittest.TestCase):
+    """ Unittests for the codec module """
+
+    def setUp(self):
+        self.doc = {
+            "Place.1": {"id": "1", "name": "Café ☃", "rooms": 3,
+                        "latitude": 37.7749295, "longitude": -0.1,
+                        "amenity_ids": ["a", "b"], "note": None,
+                        "flag": True, "quote": "\"x\"\n"},
+            "User.2": {}
+        }
+
+    def test_backend_available(self):
+        self.assertIn(codec.BACKEND, codec.DECODERS)
+        self.assertIn("json", codec.DECODERS)
+
+    def test_dumps_matches_json(self):
+        self.assertEqual(json.dumps(self.doc), codec.dumps(self.doc))
+
+    def test_loads_round_trip(self):
+        text = codec.dumps(self.doc)
+        self.assertEqual(self.doc, codec.loads(text))
+        self.assertEqual(self.doc, codec.loads(text.encode("utf-8")))
+
+    def test_loads_every_decoder_agrees(self):
+        text = codec.dumps(self.doc)
+        for decode in codec.DECODERS.values():
+            self.assertEqual(json.loads(text), decode(text))
+
+    def test_loads_falls_back(self):
+        self.assertEqual(2 ** 80, codec.loads(str(2 ** 80)))
+        self.assertTrue(math.isnan(codec.loads('{"a": NaN}')["a"]))
+
+    def test_loads_invalid(self):
+        with self.assertRaises(ValueError):
+            codec.loads('{"a": ')
+
+
+if __name__ == "__main__":
+    unittest.main()
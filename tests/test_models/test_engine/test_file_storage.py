@@ -3,15 +3,28 @@
 unittests class:
     TestFileStorage_instantiation
     TestFileStorage_methods
+    TestFileStorage_journal
+    TestFileStorage_stream
+    TestFileStorage_lazy
+    TestFileStorage_dirty
+    TestFileStorage_shards
+    TestFileStorage_snapshot
+    TestFileStorage_durability
+    TestFileStorage_transaction
 """
 
 import os
+import shutil
+import time
 import json
 import models
 import unittest
 from datetime import datetime
+from unittest.mock import patch
 from models.base_model import BaseModel
+from models.engine import snapshot
 from models.engine.file_storage import FileStorage
+from models.engine.index import AttributeIndex
 from models.user import User
 from models.city import City
 from models.review import Review
@@ -67,9 +80,41 @@ class TestFileStorage_methods(unittest.TestCase):
     def test_all(self):
         self.assertEqual(dict, type(models.storage.all()))
 
-    def test_all_with_arg(self):
+    def test_all_with_None(self):
+        self.assertIs(models.storage.all(), models.storage.all(None))
+
+    def test_all_with_args(self):
         with self.assertRaises(TypeError):
-            models.storage.all(None)
+            models.storage.all(None, None)
+
+    def test_all_with_cls(self):
+        usr = User()
+        ste = State()
+        users = models.storage.all(User)
+        self.assertIn("User." + usr.id, users)
+        self.assertNotIn("State." + ste.id, users)
+        self.assertEqual(users, models.storage.all("User"))
+
+    def test_all_with_cls_after_delete(self):
+        usr = User()
+        models.storage.delete(usr)
+        self.assertNotIn("User." + usr.id, models.storage.all(User))
+        self.assertNotIn("User." + usr.id, models.storage.all())
+
+    def test_all_with_cls_after_objects_replaced(self):
+        User()
+        FileStorage._FileStorage__objects = {}
+        self.assertEqual({}, models.storage.all(User))
+
+    def test_count(self):
+        FileStorage._FileStorage__objects = {}
+        User()
+        User()
+        State()
+        self.assertEqual(2, models.storage.count(User))
+        self.assertEqual(1, models.storage.count("State"))
+        self.assertEqual(0, models.storage.count(Review))
+        self.assertEqual(3, models.storage.count())
 
     def test_new(self):
         bmodel = BaseModel()
@@ -102,6 +147,191 @@ class TestFileStorage_methods(unittest.TestCase):
         self.assertIn(rvw, models.storage.all().values())
 
 
+    def test_find_indexed_attribute(self):
+        cty1 = City(id="c1", state_id="CA")
+        cty2 = City(id="c2", state_id="NV")
+        models.storage.new(cty1)
+        models.storage.new(cty2)
+        self.assertEqual({"City.c1": cty1},
+                         models.storage.find(City, state_id="CA"))
+        self.assertEqual({}, models.storage.find("City", state_id="TX"))
+
+    def test_find_follows_updates(self):
+        plc = Place(id="p1", city_id="SF", user_id="u1")
+        models.storage.new(plc)
+        plc.city_id = "LA"
+        models.storage.new(plc)
+        self.assertEqual({}, models.storage.find(Place, city_id="SF"))
+        self.assertEqual({"Place.p1": plc},
+                         models.storage.find(Place, city_id="LA"))
+        models.storage.delete(plc)
+        self.assertEqual({}, models.storage.find(Place, city_id="LA"))
+
+    def test_find_several_filters(self):
+        rvw1 = Review(id="r1", place_id="p1", user_id="u1", text="ok")
+        rvw2 = Review(id="r2", place_id="p1", user_id="u2", text="ok")
+        models.storage.new(rvw1)
+        models.storage.new(rvw2)
+        self.assertEqual({"Review.r2": rvw2},
+                         models.storage.find(Review, place_id="p1",
+                                             user_id="u2"))
+        self.assertEqual({"Review.r1": rvw1, "Review.r2": rvw2},
+                         models.storage.find(Review, text="ok"))
+
+    def test_find_in(self):
+        cities = [City(), City(), City()]
+        for cty, state_id in zip(cities, ["s1", "s1", "s2"]):
+            cty.state_id = state_id
+        found = models.storage.find_in(City, "state_id", ["s1", "s3", []])
+        self.assertEqual({"s1": {"City." + cities[0].id: cities[0],
+                                 "City." + cities[1].id: cities[1]}}, found)
+        self.assertEqual({cities[2].id: {"City." + cities[2].id:
+                                         cities[2]}},
+                         models.storage.find_in("City", "id",
+                                                [cities[2].id, "x", 1]))
+        cities[2].name = "Reno"
+        self.assertEqual({"Reno": {"City." + cities[2].id: cities[2]}},
+                         models.storage.find_in(City, "name",
+                                                ["Reno", "Elko", {}]))
+
+    def test_range(self):
+        places = []
+        for price in [30, 10, 20]:
+            plc = Place()
+            plc.price_by_night = price
+            places.append(plc)
+        self.assertEqual([places[2], places[0]],
+                         list(models.storage.range(Place, "price_by_night",
+                                                   low=15)))
+        places[1].price_by_night = 25
+        models.storage.delete(places[0])
+        self.assertEqual([places[1], places[2]],
+                         list(models.storage.range("Place",
+                                                   "price_by_night",
+                                                   reverse=True)))
+
+    def test_range_not_declared(self):
+        plc = Place()
+        plc.latitude = 12.5
+        self.assertEqual([plc], list(models.storage.range(
+            Place, "latitude", low=10)))
+        self.assertEqual([], list(models.storage.range(
+            Place, "latitude", high=10)))
+
+    def test_having(self):
+        wifi_pool = Place()
+        wifi_pool.amenity_ids = ["wifi", "pool"]
+        wifi = Place()
+        wifi.amenity_ids = ["wifi"]
+        Place()
+        self.assertEqual({"Place." + wifi_pool.id: wifi_pool},
+                         models.storage.having(Place, "amenity_ids",
+                                               ["pool", "wifi"]))
+        self.assertEqual({"Place." + wifi_pool.id, "Place." + wifi.id},
+                         set(models.storage.having("Place", "amenity_ids",
+                                                   ["pool", "wifi"], "any")))
+        wifi.amenity_ids = ["wifi", "pool"]
+        models.storage.delete(wifi_pool)
+        self.assertEqual({"Place." + wifi.id: wifi},
+                         models.storage.having(Place, "amenity_ids",
+                                               ["pool"]))
+        with self.assertRaises(ValueError):
+            models.storage.having(Place, "amenity_ids", ["pool"], "some")
+
+    def test_having_not_declared(self):
+        usr = User()
+        usr.tags = ["a", "b"]
+        self.assertEqual({"User." + usr.id: usr},
+                         models.storage.having(User, "tags", ["b"]))
+
+    def test_search(self):
+        pool = Review()
+        pool.text = "Great pool"
+        view = Review()
+        view.text = "Pool with a great view"
+        plc = Place()
+        plc.description = "Pool house"
+        self.assertEqual([pool, view], [obj for s, obj in
+                                        models.storage.search(Review,
+                                                              "pool")])
+        self.assertEqual([plc], [obj for s, obj in models.storage.search(
+            "Place", "poo*", limit=5)])
+        pool.text = "Quiet street"
+        models.storage.delete(view)
+        self.assertEqual([], models.storage.search(Review, "pool"))
+        self.assertEqual([pool], [obj for s, obj in
+                                  models.storage.search(Review, "quiet")])
+        self.assertEqual([], models.storage.search(User, "quiet"))
+
+    def test_aggregate(self):
+        places = []
+        for city, price in [("c1", 100), ("c1", 50), ("c2", 80)]:
+            plc = Place()
+            plc.city_id, plc.price_by_night = city, price
+            places.append(plc)
+        rvw = Review()
+        rvw.place_id = places[0].id
+        self.assertEqual({"count": 2, "sum": {"price_by_night": 150},
+                          "avg": {"price_by_night": 75.0}},
+                         models.storage.aggregate(Place, "city_id", "c1"))
+        self.assertEqual({places[0].id: {"count": 1, "sum": {}, "avg": {}}},
+                         models.storage.aggregate("Review", "place_id"))
+        places[1].price_by_night = 70
+        places[2].city_id = "c1"
+        models.storage.delete(places[0])
+        self.assertEqual({"c1": {"count": 2, "sum": {"price_by_night": 150},
+                                 "avg": {"price_by_night": 75.0}}},
+                         models.storage.aggregate(Place, "city_id"))
+        self.assertEqual([], models.storage.check_aggregates())
+
+    def test_aggregate_not_declared(self):
+        for name in ["a", "b", "a"]:
+            usr = User()
+            usr.first_name = name
+        self.assertEqual(2, models.storage.aggregate(
+            User, "first_name", "a")["count"])
+        self.assertEqual({"a", "b"},
+                         set(models.storage.aggregate(User, "first_name")))
+
+    def test_check_aggregates(self):
+        plc = Place()
+        plc.city_id, plc.price_by_night = "c1", 10
+        self.assertEqual([], models.storage.check_aggregates())
+        object.__setattr__(plc, "price_by_night", 15)
+        object.__setattr__(plc, "city_id", "c2")
+        self.assertEqual(sorted([
+            "Place.city_id 'c1': count 1 != 0",
+            "Place.city_id 'c1': sum price_by_night 10 != 0",
+            "Place.city_id 'c2': count 0 != 1",
+            "Place.city_id 'c2': sum price_by_night 0 != 15"]),
+            sorted(models.storage.check_aggregates()))
+        models.storage.touch(plc)
+        self.assertEqual([], models.storage.check_aggregates())
+
+    def test_near_and_bbox(self):
+        paris = Place()
+        paris.latitude, paris.longitude = 48.8566, 2.3522
+        london = Place()
+        london.latitude, london.longitude = 51.5072, -0.1276
+        found = models.storage.near(48.85, 2.35, 400)
+        self.assertEqual([paris, london], [obj for d, obj in found])
+        self.assertEqual([paris], [obj for d, obj in models.storage.near(
+            48.85, 2.35, 400, limit=1, cls=Place)])
+        self.assertEqual({"Place." + london.id: london},
+                         models.storage.bbox(50, -1, 52, 1))
+        london.latitude, london.longitude = 48.9, 2.4
+        models.storage.delete(paris)
+        self.assertEqual([london], [obj for d, obj in models.storage.near(
+            48.85, 2.35, 20)])
+        self.assertEqual([], models.storage.near(48.85, 2.35, 20, cls=City))
+
+    def test_get(self):
+        usr = User()
+        self.assertIs(usr, models.storage.get(User, usr.id))
+        self.assertIs(usr, models.storage.get("User", usr.id))
+        self.assertIsNone(models.storage.get(State, usr.id))
+        self.assertIsNone(models.storage.get(User, "missing"))
+
     def test_new_with_args(self):
         with self.assertRaises(TypeError):
             models.storage.new(BaseModel(), 1)
@@ -170,5 +400,960 @@ class TestFileStorage_methods(unittest.TestCase):
             models.storage.reload(None)
 
 
+class TestFileStorage_journal(unittest.TestCase):
+    """ Unittests for the append-only journal of the FileStorage class """
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__pending = set()
+        FileStorage._FileStorage__journal = True
+        FileStorage._FileStorage__journal_size = 0
+
+    def tearDown(self):
+        for name in ("file.json", "file.json.log"):
+            try:
+                os.remove(name)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__pending = set()
+        FileStorage._FileStorage__journal = False
+        FileStorage._FileStorage__journal_limit = 1000
+        FileStorage._FileStorage__journal_size = 0
+
+    def test_save_appends_to_log(self):
+        usr = User()
+        usr.save()
+        self.assertFalse(os.path.exists("file.json"))
+        with open("file.json.log", "r") as f:
+            lines = f.readlines()
+        self.assertEqual(1, len(lines))
+        self.assertIn("User." + usr.id, lines[0])
+
+    def test_save_only_writes_changed_objects(self):
+        usr = User()
+        ste = State()
+        models.storage.save()
+        ste.name = "California"
+        ste.save()
+        with open("file.json.log", "r") as f:
+            lines = f.readlines()
+        self.assertEqual(3, len(lines))
+        self.assertIn("State." + ste.id, lines[2])
+        self.assertIn("California", lines[2])
+
+    def test_reload_replays_log(self):
+        ste = State()
+        ste.save()
+        ste.name = "Texas"
+        ste.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        objs = models.storage.all()
+        self.assertIn("State." + ste.id, objs)
+        self.assertEqual("Texas", objs["State." + ste.id].name)
+
+    def test_reload_replays_delete(self):
+        usr = User()
+        usr.save()
+        models.storage.delete(usr)
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertNotIn("User." + usr.id, models.storage.all())
+
+    def test_log_compacted_past_limit(self):
+        FileStorage._FileStorage__journal_limit = 2
+        usr = User()
+        usr.save()
+        usr.save()
+        self.assertTrue(os.path.exists("file.json.log"))
+        usr.save()
+        self.assertFalse(os.path.exists("file.json.log"))
+        with open("file.json", "r") as f:
+            self.assertIn("User." + usr.id, json.load(f))
+
+    def test_log_left_by_compaction_replays_to_new_state(self):
+        FileStorage._FileStorage__journal_limit = 4
+        ste = State()
+        usr = User()
+        for version in ("v1", "v2", "v3"):
+            ste.name = version
+            models.storage.save()
+        ste.name = "v4"
+        models.storage.delete(usr)
+        with patch("os.remove", side_effect=OSError("crash")):
+            with self.assertRaises(OSError):
+                models.storage.save()
+        self.assertTrue(os.path.exists("file.json.log"))
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual("v4", models.storage.get(State, ste.id).name)
+        self.assertIsNone(models.storage.get(User, usr.id))
+
+    def test_reload_drops_torn_entry(self):
+        usr = User()
+        usr.save()
+        with open("file.json.log", "a") as f:
+            f.write('{"User.torn": {"id": "to')
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertIn("User." + usr.id, models.storage.all())
+        self.assertNotIn("User.torn", models.storage.all())
+        amy = Amenity()
+        amy.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertIn("Amenity." + amy.id, models.storage.all())
+
+
+class TestFileStorage_stream(unittest.TestCase):
+    """ Unittests for the streaming reload of the FileStorage class """
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__stream = True
+
+    def tearDown(self):
+        for name in ("file.json", "file.json.log"):
+            try:
+                os.remove(name)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__stream = False
+        FileStorage._FileStorage__journal = False
+        FileStorage._FileStorage__journal_size = 0
+
+    def test_reload(self):
+        usr = User()
+        plc = Place()
+        plc.name = "Loft"
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        objs = models.storage.all()
+        self.assertEqual(["User." + usr.id, "Place." + plc.id],
+                         list(objs.keys()))
+        self.assertEqual("Loft", objs["Place." + plc.id].name)
+        self.assertEqual(plc.created_at, objs["Place." + plc.id].created_at)
+
+    def test_reload_with_journal(self):
+        usr = User()
+        ste = State()
+        models.storage.save()
+        FileStorage._FileStorage__journal = True
+        ste.name = "Ohio"
+        ste.save()
+        models.storage.delete(usr)
+        amy = Amenity()
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(["State." + ste.id, "Amenity." + amy.id],
+                         list(models.storage.all().keys()))
+        self.assertEqual("Ohio", models.storage.all()["State." + ste.id].name)
+
+    def test_reload_empty_file(self):
+        with open("file.json", "w") as f:
+            f.write("{}")
+        models.storage.reload()
+        self.assertEqual({}, models.storage.all())
+
+
+class TestFileStorage_lazy(unittest.TestCase):
+    """ Unittests for the lazy reload of the FileStorage class """
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.usr = User()
+        self.ste = State()
+        self.ste.name = "Utah"
+        self.cty = City()
+        self.cty.state_id = self.ste.id
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__lazy = True
+        models.storage.reload()
+
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__lazy = False
+
+    def test_reload_builds_nothing(self):
+        self.assertEqual({}, FileStorage._FileStorage__objects)
+        self.assertEqual(3, models.storage.count())
+        self.assertEqual(1, models.storage.count(State))
+
+    def test_iterate_builds_one_object_at_a_time(self):
+        objs = models.storage.iterate(User)
+        self.assertEqual(self.usr.id, next(objs).id)
+        self.assertEqual(["User." + self.usr.id],
+                         list(FileStorage._FileStorage__objects))
+        self.assertEqual([], list(objs))
+        self.assertEqual({self.usr.id, self.ste.id, self.cty.id},
+                         {obj.id for obj in models.storage.iterate()})
+
+    def test_get_builds_one_object(self):
+        ste = models.storage.get(State, self.ste.id)
+        self.assertEqual(State, type(ste))
+        self.assertEqual("Utah", ste.name)
+        self.assertEqual(self.ste.created_at, ste.created_at)
+        self.assertEqual(["State." + self.ste.id],
+                         list(FileStorage._FileStorage__objects))
+        self.assertIs(ste, models.storage.get(State, self.ste.id))
+        self.assertEqual(3, models.storage.count())
+
+    def test_all_with_cls_builds_class(self):
+        self.assertIn("City." + self.cty.id, models.storage.all(City))
+        self.assertEqual(["City." + self.cty.id],
+                         list(FileStorage._FileStorage__objects))
+
+    def test_all_builds_everything(self):
+        self.assertEqual(3, len(models.storage.all()))
+
+    def test_find(self):
+        self.assertIn("City." + self.cty.id,
+                      models.storage.find(City, state_id=self.ste.id))
+
+    def test_save_keeps_unbuilt_objects(self):
+        ste = models.storage.get(State, self.ste.id)
+        ste.name = "Iowa"
+        ste.save()
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__lazy = False
+        models.storage.reload()
+        objs = models.storage.all()
+        self.assertEqual(3, len(objs))
+        self.assertEqual("Iowa", objs["State." + self.ste.id].name)
+
+    def test_delete_unbuilt_object(self):
+        models.storage.delete(self.usr)
+        self.assertIsNone(models.storage.get(User, self.usr.id))
+        self.assertEqual(2, models.storage.count())
+
+
+class TestFileStorage_dirty(unittest.TestCase):
+    """ Unittests for the dirty tracking of the FileStorage class """
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_save_output_unchanged(self):
+        usr = User()
+        usr.first_name = "Betty"
+        plc = Place()
+        plc.amenity_ids = ["a", "b"]
+        plc.latitude = 1.5
+        models.storage.save()
+        plc.name = "Caf\u00e9"
+        models.storage.save()
+        objdict = {key: obj.to_dict()
+                   for key, obj in models.storage.all().items()}
+        with open("file.json", "r") as f:
+            self.assertEqual(json.dumps(objdict), f.read())
+
+    def test_save_serializes_changed_objects_only(self):
+        usrs = [User() for i in range(5)]
+        models.storage.save()
+        usrs[2].save()
+        with patch.object(User, "to_dict", autospec=True,
+                          side_effect=BaseModel.to_dict) as to_dict:
+            models.storage.save()
+            self.assertEqual(0, to_dict.call_count)
+            usrs[3].last_name = "Holberton"
+            models.storage.save()
+            self.assertEqual(1, to_dict.call_count)
+        with open("file.json", "r") as f:
+            self.assertIn("Holberton", f.read())
+
+    def test_attribute_set_marks_object(self):
+        ste = State()
+        models.storage.save()
+        ste.name = "Oregon"
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual("Oregon",
+                         models.storage.get(State, ste.id).name)
+
+    def test_attribute_set_reindexes(self):
+        cty = City()
+        cty.state_id = "CA"
+        self.assertIn("City." + cty.id,
+                      models.storage.find(City, state_id="CA"))
+        cty.state_id = "NV"
+        self.assertEqual({}, models.storage.find(City, state_id="CA"))
+        self.assertIn("City." + cty.id,
+                      models.storage.find(City, state_id="NV"))
+
+    def test_change_in_place_saved(self):
+        plc = Place()
+        plc.amenity_ids = ["a"]
+        plc.rules = {"pets": False}
+        models.storage.save()
+        plc.amenity_ids.append("b")
+        models.storage.save()
+        self.assertIn("Place." + plc.id,
+                      models.storage.having(Place, "amenity_ids", ["b"]))
+        plc.rules["pets"] = True
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(["a", "b"],
+                         models.storage.get(Place, plc.id).amenity_ids)
+        self.assertEqual({"pets": True},
+                         models.storage.get(Place, plc.id).rules)
+
+    def test_change_in_place_journal(self):
+        FileStorage._FileStorage__journal = True
+        try:
+            plc = Place()
+            plc.amenity_ids = ["a"]
+            models.storage.save()
+            plc.amenity_ids.remove("a")
+            models.storage.save()
+            FileStorage._FileStorage__objects = {}
+            models.storage.reload()
+            self.assertEqual([],
+                             models.storage.get(Place, plc.id).amenity_ids)
+        finally:
+            FileStorage._FileStorage__journal = False
+            FileStorage._FileStorage__journal_size = 0
+            try:
+                os.remove("file.json.log")
+            except IOError:
+                pass
+
+    def test_delete_drops_cached_entry(self):
+        usr = User()
+        models.storage.save()
+        models.storage.delete(usr)
+        models.storage.save()
+        with open("file.json", "r") as f:
+            self.assertNotIn(usr.id, f.read())
+
+
+class TestFileStorage_shards(unittest.TestCase):
+    """ Unittests for the sharded layout of the FileStorage class """
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__shards = "test_shards"
+        FileStorage._FileStorage__loaded = set()
+        self.usr = User()
+        self.ste = State()
+        self.ste.name = "Utah"
+        models.storage.save()
+
+    def tearDown(self):
+        shutil.rmtree("test_shards", ignore_errors=True)
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__shards = None
+        FileStorage._FileStorage__loaded = set()
+
+    def reset(self):
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__loaded = set()
+
+    def test_one_file_per_class(self):
+        self.assertEqual(["State.json", "User.json"],
+                         sorted(os.listdir("test_shards")))
+        self.assertFalse(os.path.exists("file.json"))
+        with open("test_shards/State.json") as f:
+            self.assertEqual({"State." + self.ste.id: self.ste.to_dict()},
+                             json.load(f))
+
+    def test_save_rewrites_changed_shards_only(self):
+        os.utime("test_shards/User.json", (0, 0))
+        self.ste.name = "Ohio"
+        models.storage.save()
+        self.assertEqual(0, os.stat("test_shards/User.json").st_mtime)
+        with open("test_shards/State.json") as f:
+            self.assertIn("Ohio", f.read())
+
+    def test_reload(self):
+        self.reset()
+        models.storage.reload()
+        self.assertEqual({"User." + self.usr.id, "State." + self.ste.id},
+                         set(models.storage.all()))
+        self.assertEqual("Utah",
+                         models.storage.get(State, self.ste.id).name)
+
+    def test_reload_classes(self):
+        self.reset()
+        models.storage.reload(classes=[State])
+        self.assertEqual(["State." + self.ste.id], list(models.storage.all()))
+        self.assertEqual({"State"}, FileStorage._FileStorage__loaded)
+
+    def test_reload_classes_positional(self):
+        with self.assertRaises(TypeError):
+            models.storage.reload([State])
+
+    def test_save_keeps_unloaded_objects(self):
+        self.reset()
+        models.storage.reload(classes=["State"])
+        usr = User()
+        models.storage.save()
+        self.reset()
+        models.storage.reload()
+        self.assertEqual({"User." + self.usr.id, "User." + usr.id},
+                         set(models.storage.all(User)))
+
+    def test_delete(self):
+        models.storage.delete(self.usr)
+        models.storage.save()
+        self.reset()
+        models.storage.reload()
+        self.assertEqual(["State." + self.ste.id], list(models.storage.all()))
+
+    def test_migrate_single_file(self):
+        shutil.rmtree("test_shards")
+        FileStorage._FileStorage__shards = None
+        models.storage.save()
+        FileStorage._FileStorage__shards = "test_shards"
+        self.reset()
+        models.storage.reload()
+        self.assertEqual(["State.json", "User.json"],
+                         sorted(os.listdir("test_shards")))
+        self.assertTrue(os.path.exists("file.json"))
+        self.assertEqual({"User." + self.usr.id, "State." + self.ste.id},
+                         set(models.storage.all()))
+
+    def test_reload_classes_single_file(self):
+        FileStorage._FileStorage__shards = None
+        models.storage.save()
+        self.reset()
+        models.storage.reload(classes=[State])
+        self.assertEqual(["State." + self.ste.id],
+                         list(FileStorage._FileStorage__objects))
+        self.assertEqual(2, models.storage.count())
+
+
+class TestFileStorage_snapshot(unittest.TestCase):
+    """ Unittests for the memory-mapped snapshot of the FileStorage class """
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__snapshot = "test_file.snap"
+        self.usr = User()
+        self.ste = State()
+        self.ste.name = "Utah"
+        self.cty = City()
+        self.cty.state_id = self.ste.id
+        models.storage.save()
+        self.reset()
+
+    def tearDown(self):
+        for path in ("test_file.snap", "file.json", "file.json.log"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__snapshot = None
+        FileStorage._FileStorage__journal = False
+        FileStorage._FileStorage__journal_size = 0
+        FileStorage._FileStorage__mapped.close()
+        FileStorage._FileStorage__mapped = None
+        FileStorage._FileStorage__raw = {}
+
+    def reset(self):
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+
+    def test_save_writes_snapshot(self):
+        self.assertFalse(os.path.exists("file.json"))
+        with open("test_file.snap", "rb") as f:
+            self.assertEqual(b"HBNBSNAP", f.read(8))
+
+    def test_reload_builds_nothing(self):
+        self.assertEqual({}, FileStorage._FileStorage__objects)
+        self.assertEqual(3, models.storage.count())
+        self.assertEqual(1, models.storage.count(State))
+
+    def test_get_builds_one_object(self):
+        ste = models.storage.get(State, self.ste.id)
+        self.assertEqual("Utah", ste.name)
+        self.assertEqual(self.ste.created_at, ste.created_at)
+        self.assertEqual(["State." + self.ste.id],
+                         list(FileStorage._FileStorage__objects))
+        self.assertIs(ste, models.storage.get(State, self.ste.id))
+        self.assertIsNone(models.storage.get(State, self.usr.id))
+        self.assertEqual(3, models.storage.count())
+
+    def test_find_and_iterate(self):
+        self.assertEqual(["City." + self.cty.id],
+                         list(models.storage.find(City, state_id=self.ste.id)))
+        self.assertEqual({self.usr.id, self.ste.id, self.cty.id},
+                         {obj.id for obj in models.storage.iterate()})
+        self.assertEqual(3, len(models.storage.all()))
+
+    def test_reload_classes(self):
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload(classes=[State])
+        self.assertEqual(["State." + self.ste.id],
+                         list(FileStorage._FileStorage__objects))
+        self.assertEqual(3, models.storage.count())
+
+    def test_old_mapping_closed(self):
+        mapped = FileStorage._FileStorage__mapped
+        models.storage.reload()
+        self.assertTrue(mapped._Snapshot__map.closed)
+        mapped = FileStorage._FileStorage__mapped
+        ste = models.storage.get(State, self.ste.id)
+        ste.name = "Iowa"
+        models.storage.save()
+        self.assertTrue(mapped._Snapshot__map.closed)
+        self.assertFalse(
+            FileStorage._FileStorage__mapped._Snapshot__map.closed)
+        self.assertEqual(3, models.storage.count())
+        self.assertEqual(1, models.storage.count(State))
+        self.assertIs(ste, models.storage.get(State, self.ste.id))
+        self.assertEqual(self.cty.id,
+                         models.storage.get(City, self.cty.id).id)
+
+    def test_reload_replaces_built_objects(self):
+        ste = models.storage.get(State, self.ste.id)
+        ste.name = "Ohio"
+        models.storage.reload()
+        self.assertEqual(3, models.storage.count())
+        self.assertEqual("Utah", models.storage.get(State, self.ste.id).name)
+
+    def test_save_keeps_unbuilt_objects(self):
+        ste = models.storage.get(State, self.ste.id)
+        ste.name = "Iowa"
+        plc = Place()
+        models.storage.delete(models.storage.get(User, self.usr.id))
+        models.storage.save()
+        self.reset()
+        self.assertEqual({"State." + self.ste.id, "City." + self.cty.id,
+                          "Place." + plc.id}, set(models.storage.all()))
+        self.assertEqual("Iowa", models.storage.get(State, self.ste.id).name)
+
+    def test_migrate_and_convert_back(self):
+        os.remove("test_file.snap")
+        FileStorage._FileStorage__snapshot = None
+        models.storage.save()
+        with open("file.json") as f:
+            text = f.read()
+        FileStorage._FileStorage__snapshot = "test_file.snap"
+        self.reset()
+        self.assertTrue(os.path.exists("test_file.snap"))
+        self.assertEqual(3, models.storage.count())
+        os.remove("file.json")
+        snapshot.to_json("test_file.snap", "file.json")
+        with open("file.json") as f:
+            self.assertEqual(json.loads(text), json.load(f))
+
+    def test_journal(self):
+        FileStorage._FileStorage__journal = True
+        ste = models.storage.get(State, self.ste.id)
+        ste.name = "Iowa"
+        models.storage.delete(models.storage.get(User, self.usr.id))
+        models.storage.save()
+        self.assertTrue(os.path.exists("file.json.log"))
+        self.reset()
+        self.assertEqual(2, models.storage.count())
+        self.assertIsNone(models.storage.get(User, self.usr.id))
+        self.assertEqual("Iowa", models.storage.get(State, self.ste.id).name)
+
+    def test_rollback(self):
+        models.storage.begin()
+        models.storage.get(State, self.ste.id).name = "Iowa"
+        models.storage.touch(models.storage.get(State, self.ste.id))
+        models.storage.rollback()
+        self.assertEqual("Utah", models.storage.get(State, self.ste.id).name)
+
+    def test_rollback_reads_pending_keys_only(self):
+        models.storage.begin()
+        models.storage.get(State, self.ste.id).name = "Iowa"
+        models.storage.delete(models.storage.get(User, self.usr.id))
+        with patch.object(snapshot.Snapshot, "items") as items, \
+                patch.object(snapshot.Snapshot, "get",
+                             autospec=True,
+                             side_effect=snapshot.Snapshot.get) as get:
+            models.storage.rollback()
+        items.assert_not_called()
+        self.assertEqual({"State." + self.ste.id, "User." + self.usr.id},
+                         {c.args[1] for c in get.call_args_list})
+        self.assertEqual("Utah", models.storage.get(State, self.ste.id).name)
+        self.assertIsNotNone(models.storage.get(User, self.usr.id))
+
+
+class TestFileStorage_durability(unittest.TestCase):
+    """ Unittests for the atomic writes and fsync policy of FileStorage """
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.bm = BaseModel()
+        models.storage.save()
+
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__fsync = "never"
+        if FileStorage._FileStorage__timer is not None:
+            FileStorage._FileStorage__timer.cancel()
+            FileStorage._FileStorage__timer = None
+        FileStorage._FileStorage__unsynced = set()
+
+    def test_no_temporary_file_left(self):
+        self.assertFalse(os.path.exists("file.json.tmp"))
+        with open("file.json") as f:
+            self.assertIn("BaseModel." + self.bm.id, json.load(f))
+
+    def test_interrupted_save_keeps_old_file(self):
+        with open("file.json") as f:
+            before = f.read()
+        BaseModel()
+        with patch("os.replace", side_effect=OSError):
+            with self.assertRaises(OSError):
+                models.storage.save()
+        with open("file.json") as f:
+            self.assertEqual(before, f.read())
+
+    def test_never(self):
+        with patch("os.fsync") as fsync:
+            models.storage.save()
+        fsync.assert_not_called()
+
+    def test_always(self):
+        FileStorage._FileStorage__fsync = "always"
+        with patch("os.fsync") as fsync:
+            models.storage.save()
+        self.assertEqual(3, fsync.call_count)
+        self.assertEqual(set(), FileStorage._FileStorage__unsynced)
+
+    def test_group_commit(self):
+        FileStorage._FileStorage__fsync = "60000"
+        FileStorage._FileStorage__synced_at = time.monotonic()
+        with patch("os.fsync") as fsync:
+            models.storage.save()
+            models.storage.save()
+            self.assertEqual(2, fsync.call_count)
+            self.assertEqual({"file.json"},
+                             FileStorage._FileStorage__unsynced)
+            models.storage.flush()
+        self.assertEqual(4, fsync.call_count)
+        self.assertEqual(set(), FileStorage._FileStorage__unsynced)
+        self.assertIsNone(FileStorage._FileStorage__timer)
+
+    def test_group_commit_delay_elapsed(self):
+        FileStorage._FileStorage__fsync = "0"
+        with patch("os.fsync") as fsync:
+            models.storage.save()
+        self.assertEqual(3, fsync.call_count)
+
+    def test_group_commit_timer(self):
+        FileStorage._FileStorage__fsync = "50"
+        FileStorage._FileStorage__synced_at = time.monotonic()
+        with patch("os.fsync") as fsync:
+            models.storage.save()
+            self.assertEqual({"file.json"},
+                             FileStorage._FileStorage__unsynced)
+            timer = FileStorage._FileStorage__timer
+            timer.join(5)
+        self.assertFalse(timer.is_alive())
+        self.assertEqual(3, fsync.call_count)
+        self.assertEqual(set(), FileStorage._FileStorage__unsynced)
+
+    def test_rewrite_synced_before_rename(self):
+        FileStorage._FileStorage__fsync = "60000"
+        FileStorage._FileStorage__synced_at = time.monotonic()
+        calls = []
+        with patch("os.fsync", side_effect=lambda fd: calls.append("fsync")):
+            with patch("os.replace", side_effect=lambda *a: calls.append(
+                    "replace")):
+                models.storage.save()
+        os.remove("file.json.tmp")
+        self.assertEqual(["fsync", "replace"], calls)
+
+    def test_journal_append(self):
+        FileStorage._FileStorage__journal = True
+        FileStorage._FileStorage__fsync = "always"
+        try:
+            self.bm.name = "x"
+            with patch("os.fsync") as fsync:
+                models.storage.save()
+            self.assertEqual(3, fsync.call_count)
+        finally:
+            FileStorage._FileStorage__journal = False
+            models.storage.save()
+            try:
+                os.remove("file.json.log")
+            except IOError:
+                pass
+
+
+class TestFileStorage_transaction(unittest.TestCase):
+    """ Unittests for the transactions of the FileStorage class """
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.ste = State()
+        self.ste.name = "Utah"
+        self.cty = City()
+        self.cty.state_id = self.ste.id
+        models.storage.save()
+
+    def tearDown(self):
+        FileStorage._FileStorage__depth = 0
+        FileStorage._FileStorage__savepoints = []
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_batch_saves_once(self):
+        with patch.object(FileStorage, "_FileStorage__compact") as compact:
+            with models.storage.batch():
+                for i in range(10):
+                    BaseModel().save()
+                self.assertTrue(models.storage.in_transaction())
+            self.assertEqual(1, compact.call_count)
+        self.assertFalse(models.storage.in_transaction())
+        self.assertEqual(12, models.storage.count())
+
+    def test_batch_writes_on_commit(self):
+        with models.storage.batch():
+            bm = BaseModel()
+            bm.save()
+            with open("file.json") as f:
+                self.assertNotIn(bm.id, f.read())
+        with open("file.json") as f:
+            self.assertIn("BaseModel." + bm.id, json.load(f))
+
+    def test_nested_batch(self):
+        with models.storage.batch():
+            with models.storage.batch():
+                bm = BaseModel()
+            self.assertTrue(models.storage.in_transaction())
+            with open("file.json") as f:
+                self.assertNotIn(bm.id, f.read())
+        with open("file.json") as f:
+            self.assertIn(bm.id, f.read())
+
+    def test_failed_inner_batch_keeps_outer(self):
+        with models.storage.batch():
+            ste = State()
+            ste.name = "Nevada"
+            self.ste.name = "Ohio"
+            models.storage.delete(self.cty)
+            with self.assertRaises(ValueError):
+                with models.storage.batch():
+                    bm = BaseModel()
+                    ste.name = "Iowa"
+                    self.ste.name = "Texas"
+                    models.storage.new(self.cty)
+                    raise ValueError
+            self.assertTrue(models.storage.in_transaction())
+            self.assertIsNone(models.storage.get(BaseModel, bm.id))
+            self.assertEqual("Nevada",
+                             models.storage.get(State, ste.id).name)
+            self.assertEqual("Ohio",
+                             models.storage.get(State, self.ste.id).name)
+            self.assertIsNone(models.storage.get(City, self.cty.id))
+            with open("file.json") as f:
+                self.assertNotIn("Ohio", f.read())
+        self.assertFalse(models.storage.in_transaction())
+        with open("file.json") as f:
+            saved = json.load(f)
+        self.assertEqual({"State." + self.ste.id, "State." + ste.id},
+                         set(saved))
+        self.assertEqual("Ohio", saved["State." + self.ste.id]["name"])
+        self.assertEqual("Nevada", saved["State." + ste.id]["name"])
+
+    def test_rollback_ends_innermost_only(self):
+        models.storage.begin()
+        self.ste.name = "Ohio"
+        models.storage.begin()
+        self.ste.name = "Iowa"
+        models.storage.rollback()
+        self.assertTrue(models.storage.in_transaction())
+        self.assertEqual("Ohio", models.storage.get(State, self.ste.id).name)
+        models.storage.rollback()
+        self.assertFalse(models.storage.in_transaction())
+        self.assertEqual("Utah", models.storage.get(State, self.ste.id).name)
+
+    def test_batch_indexes_once(self):
+        deferred = FileStorage._FileStorage__deferred
+        with models.storage.batch():
+            cty = City()
+            cty.state_id = self.ste.id
+            gone = City()
+            gone.state_id = self.ste.id
+            models.storage.delete(gone)
+            self.assertEqual({"City." + cty.id}, set(deferred["City"]))
+            self.assertEqual({"City." + self.cty.id, "City." + cty.id},
+                             set(models.storage.find(
+                                 City, state_id=self.ste.id)))
+            self.assertNotIn("City", deferred)
+            other = City()
+            with patch.object(AttributeIndex, "add") as add:
+                other.state_id = self.ste.id
+            add.assert_not_called()
+        self.assertEqual({}, deferred)
+        self.assertEqual(3, len(models.storage.find(
+            City, state_id=self.ste.id)))
+
+    def test_batch_rollback_on_exception(self):
+        with self.assertRaises(ValueError):
+            with models.storage.batch():
+                bm = BaseModel()
+                self.ste.name = "Ohio"
+                self.cty.state_id = "other"
+                models.storage.delete(self.cty)
+                models.storage.save()
+                raise ValueError
+        self.assertFalse(models.storage.in_transaction())
+        self.assertIsNone(models.storage.get(BaseModel, bm.id))
+        self.assertEqual("Utah", models.storage.get(State, self.ste.id).name)
+        self.assertEqual(["City." + self.cty.id],
+                         list(models.storage.find(City,
+                                                  state_id=self.ste.id)))
+        self.assertEqual({}, models.storage.find(City, state_id="other"))
+        self.assertEqual(2, models.storage.count())
+
+    def test_rollback_with_journal(self):
+        FileStorage._FileStorage__journal = True
+        try:
+            self.ste.name = "Nevada"
+            models.storage.save()
+            models.storage.begin()
+            self.ste.name = "Ohio"
+            models.storage.rollback()
+            self.assertEqual("Nevada",
+                             models.storage.get(State, self.ste.id).name)
+        finally:
+            FileStorage._FileStorage__journal = False
+            models.storage.save()
+
+    def test_rollback_resets_held_objects(self):
+        models.storage.begin()
+        self.ste.name = "Ohio"
+        self.ste.motto = "Birthplace of Aviation"
+        models.storage.delete(self.cty)
+        models.storage.rollback()
+        self.assertEqual("Utah", self.ste.name)
+        self.assertFalse(hasattr(self.ste, "motto"))
+        self.assertIs(self.ste, models.storage.get(State, self.ste.id))
+        self.assertIs(self.cty, models.storage.get(City, self.cty.id))
+        self.assertEqual({"City." + self.cty.id: self.cty},
+                         models.storage.find(City, state_id=self.ste.id))
+        self.cty.save()
+        with open("file.json") as f:
+            saved = json.load(f)
+        self.assertEqual("Utah", saved["State." + self.ste.id]["name"])
+        self.assertIn("City." + self.cty.id, saved)
+
+    def test_rollback_detaches_created(self):
+        models.storage.begin()
+        bm = BaseModel()
+        models.storage.begin()
+        models.storage.delete(self.ste)
+        ste = State()
+        ste.id = self.ste.id
+        models.storage.new(ste)
+        models.storage.rollback()
+        self.assertIs(self.ste, models.storage.get(State, self.ste.id))
+        with self.assertRaises(ValueError):
+            ste.save()
+        models.storage.rollback()
+        with self.assertRaises(ValueError):
+            bm.save()
+        self.assertIsNone(models.storage.get(BaseModel, bm.id))
+        self.assertEqual(2, models.storage.count())
+
+    def test_commit_outside_transaction_saves(self):
+        bm = BaseModel()
+        models.storage.commit()
+        with open("file.json") as f:
+            self.assertIn("BaseModel." + bm.id, json.load(f))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,431 @@
+#!/usr/bin/python3
+""" Defines unittests for models/engine/index.py
+unittests class:
+    TestAttributeIndex
+    TestRangeIndex
+    TestGeoIndex
+    TestSetIndex
+    TestTextIndex
+    TestAggregate
+"""
+
+import unittest
+from models.city import City
+from models.engine.index import AttributeIndex, RangeIndex, GeoIndex
+from models.engine.index import SetIndex, TextIndex, Aggregate
+from models.engine.index import haversine, circle_bbox, words, terms
+from models.place import Place
+from models.review import Review
+
+
+class TestAttributeIndex(unittest.TestCase):
+    """ Unittests for the AttributeIndex class """
+
+    def test_add_and_find(self):
+        idx = AttributeIndex("state_id")
+        cty = City(id="1", state_id="CA")
+        idx.add("City.1", cty)
+        self.assertEqual({"City.1": cty}, idx.find("CA"))
+        self.assertEqual({}, idx.find("NV"))
+
+    def test_add_reindexes_key(self):
+        idx = AttributeIndex("state_id")
+        cty = City(id="1", state_id="CA")
+        idx.add("City.1", cty)
+        cty.state_id = "NV"
+        idx.add("City.1", cty)
+        self.assertEqual({}, idx.find("CA"))
+        self.assertEqual({"City.1": cty}, idx.find("NV"))
+        self.assertNotIn("CA", idx.buckets)
+
+    def test_remove(self):
+        idx = AttributeIndex("state_id")
+        idx.add("City.1", City(id="1", state_id="CA"))
+        idx.remove("City.1")
+        idx.remove("City.2")
+        self.assertEqual({}, idx.find("CA"))
+        self.assertEqual({}, idx.values)
+
+    def test_class_default_indexed(self):
+        idx = AttributeIndex("state_id")
+        cty = City(id="1")
+        idx.add("City.1", cty)
+        self.assertEqual({"City.1": cty}, idx.find(""))
+
+    def test_unhashable_value(self):
+        idx = AttributeIndex("state_id")
+        idx.add("City.1", City(id="1", state_id=["CA"]))
+        self.assertEqual({}, idx.values)
+        self.assertIsNone(idx.find(["CA"]))
+
+
+class TestRangeIndex(unittest.TestCase):
+    """ Unittests for the RangeIndex class """
+
+    def setUp(self):
+        self.idx = RangeIndex("price_by_night")
+        self.places = []
+        for i, price in enumerate([30, 10, 20, 20, 40.5]):
+            plc = Place(id=str(i), price_by_night=price)
+            self.idx.add("Place." + plc.id, plc)
+            self.places.append(plc)
+
+    def ids(self, **bounds):
+        return [plc.id for plc in self.idx.range(**bounds)]
+
+    def test_sorted(self):
+        self.assertEqual(["1", "2", "3", "0", "4"], self.ids())
+        self.assertEqual(["4", "0", "3", "2", "1"], self.ids(reverse=True))
+
+    def test_bounds(self):
+        self.assertEqual(["2", "3", "0"], self.ids(low=20, high=30))
+        self.assertEqual(["0"], self.ids(low=20, high=30,
+                                         include_low=False))
+        self.assertEqual(["2", "3"], self.ids(low=20, high=30,
+                                              include_high=False))
+        self.assertEqual(["0", "4"], self.ids(low=25))
+        self.assertEqual(["1"], self.ids(high=15.5))
+        self.assertEqual([], self.ids(low=50))
+        self.assertEqual(["3", "2"], self.ids(low=20, high=20,
+                                              reverse=True))
+
+    def test_add_reindexes_key(self):
+        self.places[1].price_by_night = 35
+        self.idx.add("Place.1", self.places[1])
+        self.assertEqual(["2", "3", "0", "1", "4"], self.ids())
+        self.assertEqual(5, len(self.idx.entries))
+
+    def test_remove(self):
+        self.idx.remove("Place.2")
+        self.idx.remove("Place.nope")
+        self.assertEqual(["1", "3", "0", "4"], self.ids())
+        self.assertNotIn("Place.2", self.idx.objects)
+
+    def test_extend(self):
+        places = [Place(id=str(i), price_by_night=price)
+                  for i, price in [(5, 25), (6, 5), (1, 35), (3, "x")]]
+        self.idx.extend(("Place." + plc.id, plc) for plc in places)
+        self.assertEqual(["6", "2", "5", "0", "1", "4"], self.ids())
+        self.assertEqual(sorted(self.idx.entries), self.idx.entries)
+        self.assertNotIn("Place.3", self.idx.values)
+
+    def test_not_numbers(self):
+        for i, value in enumerate(["12", None, True, float("nan")]):
+            plc = Place(id="x{}".format(i), price_by_night=value)
+            self.idx.add("Place." + plc.id, plc)
+        self.assertEqual(5, len(self.idx.entries))
+
+
+class TestGeoIndex(unittest.TestCase):
+    """ Unittests for the GeoIndex class """
+
+    def setUp(self):
+        self.idx = GeoIndex(("latitude", "longitude"))
+        self.points = {"paris": (48.8566, 2.3522),
+                       "london": (51.5072, -0.1276),
+                       "nyc": (40.7128, -74.006),
+                       "fiji": (-17.7134, 178.065),
+                       "samoa": (-13.759, -172.1046)}
+        for name, (lat, lon) in self.points.items():
+            self.idx.add("Place." + name, Place(id=name, latitude=lat,
+                                                longitude=lon))
+
+    def test_haversine(self):
+        self.assertAlmostEqual(343.5, haversine(*self.points["paris"],
+                                                *self.points["london"]),
+                               delta=1)
+        self.assertEqual(0, haversine(10, 20, 10, 20))
+
+    def test_circle_bbox(self):
+        south, west, north, east = circle_bbox(0, 0, 111.195)
+        self.assertAlmostEqual(-1, south, places=3)
+        self.assertAlmostEqual(1, east, places=3)
+        self.assertGreater(circle_bbox(0, 179.5, 200)[1], 0)
+        self.assertEqual((-180, 180), circle_bbox(89.9, 0, 50)[1::2])
+
+    def test_near(self):
+        found = self.idx.near(48.85, 2.35, 400)
+        self.assertEqual(["paris", "london"], [o.id for d, k, o in found])
+        self.assertLess(found[0][0], 1)
+        self.assertEqual(["paris"], [o.id for d, k, o
+                                     in self.idx.near(48.85, 2.35, 400, 1)])
+        self.assertEqual([], self.idx.near(0, 0, 100))
+
+    def test_near_antimeridian(self):
+        found = self.idx.near(-16, 179.9, 1200)
+        self.assertEqual(["fiji", "samoa"], [o.id for d, k, o in found])
+
+    def test_bbox(self):
+        self.assertEqual({"Place.paris", "Place.london"},
+                         dict(self.idx.bbox(45, -5, 55, 5)).keys())
+        self.assertEqual({"Place.fiji", "Place.samoa"},
+                         dict(self.idx.bbox(-20, 170, -10, -170)).keys())
+        self.assertEqual({}, dict(self.idx.bbox(10, 0, 0, 10)))
+
+    def test_update_and_remove(self):
+        plc = Place(id="x", latitude=0.5, longitude=0.5)
+        self.idx.add("Place.x", plc)
+        plc.latitude = 48.9
+        plc.longitude = 2.4
+        self.idx.add("Place.x", plc)
+        self.assertEqual({"Place.paris", "Place.x"},
+                         {k for d, k, o in self.idx.near(48.85, 2.35, 20)})
+        self.idx.remove("Place.x")
+        self.idx.remove("Place.nope")
+        self.assertEqual(5, len(self.idx.points))
+        self.assertEqual(5, sum(len(c) for c in self.idx.cells.values()))
+
+    def test_invalid_points(self):
+        for i, (lat, lon) in enumerate([(91, 0), (0, 181), ("1", 2),
+                                        (None, 0), (True, 1)]):
+            self.idx.add("Place.{}".format(i),
+                         Place(id=str(i), latitude=lat, longitude=lon))
+        self.assertEqual(5, len(self.idx.points))
+
+    def test_edges(self):
+        for key, lat, lon in [("north", 90, 180), ("south", -90, -180)]:
+            self.idx.add(key, Place(id=key, latitude=lat, longitude=lon))
+        self.assertEqual({"north"}, dict(self.idx.bbox(89, 179, 90,
+                                                       180)).keys())
+        self.assertEqual({"south"}, dict(self.idx.bbox(-90, -180, -89,
+                                                       -179)).keys())
+
+
+class TestSetIndex(unittest.TestCase):
+    """ Unittests for the SetIndex class """
+
+    def setUp(self):
+        self.idx = SetIndex("amenity_ids")
+        self.places = {}
+        for i, ids in enumerate([["a", "b"], ["b"], ["a", "b", "c"], []]):
+            plc = Place(id=str(i), amenity_ids=ids)
+            self.places["Place." + str(i)] = plc
+            self.idx.add("Place." + str(i), plc)
+
+    def keys(self, *ids):
+        return {"Place." + i: self.places["Place." + i] for i in ids}
+
+    def test_all(self):
+        self.assertEqual(self.keys("0", "2"), self.idx.find(["a", "b"]))
+        self.assertEqual(self.keys("2"), self.idx.find(["c", "a"], "all"))
+        self.assertEqual({}, self.idx.find(["a", "d"]))
+        self.assertEqual({}, self.idx.find([]))
+
+    def test_any(self):
+        self.assertEqual(self.keys("0", "1", "2"),
+                         self.idx.find(["a", "b"], "any"))
+        self.assertEqual(self.keys("2"), self.idx.find(["c", "d"], "any"))
+        self.assertEqual({}, self.idx.find(["d"], "any"))
+
+    def test_empty_list_not_indexed(self):
+        self.assertNotIn("Place.3", self.idx.slots)
+
+    def test_update(self):
+        plc = self.places["Place.1"]
+        plc.amenity_ids = ["c"]
+        self.idx.add("Place.1", plc)
+        self.assertEqual(self.keys("0", "2"), self.idx.find(["b"]))
+        self.assertEqual(self.keys("1", "2"), self.idx.find(["c"]))
+        self.assertEqual(1, self.idx.slots["Place.1"])
+
+    def test_remove_reuses_slot(self):
+        self.idx.remove("Place.0")
+        self.idx.remove("Place.0")
+        self.assertEqual(self.keys("2"), self.idx.find(["a"]))
+        plc = Place(id="4", amenity_ids=["a"])
+        self.places["Place.4"] = plc
+        self.idx.add("Place.4", plc)
+        self.assertEqual(0, self.idx.slots["Place.4"])
+        self.assertEqual(self.keys("2", "4"), self.idx.find(["a"]))
+
+    def test_not_lists(self):
+        for i, value in enumerate(["ab", None, 3, [["a"], "a"]]):
+            self.idx.add("x" + str(i),
+                         Place(id="x" + str(i), amenity_ids=value))
+        self.assertEqual(["Place.0", "Place.2", "x3"],
+                         sorted(self.idx.find(["a"])))
+        self.assertEqual({}, self.idx.find([["a"]]))
+
+    def test_many(self):
+        idx = SetIndex("amenity_ids")
+        for i in range(1000):
+            idx.add(i, Place(amenity_ids=[(2, i % 2), (3, i % 3),
+                                          (5, i % 5)]))
+        self.assertEqual([i for i in range(1000) if i % 30 == 0],
+                         sorted(idx.find([(2, 0), (3, 0), (5, 0)])))
+        self.assertEqual([i for i in range(1000)
+                          if i % 2 == 1 or i % 5 == 4],
+                         sorted(idx.find([(2, 1), (5, 4)], "any")))
+
+
+class TestTextIndex(unittest.TestCase):
+    """ Unittests for the TextIndex class """
+
+    def setUp(self):
+        self.idx = TextIndex(("text",))
+        for i, text in enumerate(["Great pool, great view",
+                                  "Pool was dirty",
+                                  "Nice view of the pool and the sea",
+                                  "Greatest stay"]):
+            self.idx.add(str(i), Review(id=str(i), text=text))
+
+    def keys(self, query, limit=None):
+        return [key for score, key, obj in self.idx.search(query, limit)]
+
+    def test_words(self):
+        self.assertEqual(["caf\u00e9", "n2", "snake", "case", "x"],
+                         words("Caf\u00c9, N2 snake_case -x-"))
+        self.assertEqual([("pool", False), ("gre", True)],
+                         terms("Pool gre* pool, -"))
+
+    def test_ranked(self):
+        self.assertEqual(["1", "0", "2"], self.keys("pool"))
+        self.assertEqual(["0", "2"], self.keys("view POOL"))
+        self.assertEqual(["1"], self.keys("pool", limit=1))
+        scores = [score for score, key, obj in self.idx.search("pool")]
+        self.assertEqual(sorted(scores, reverse=True), scores)
+
+    def test_no_match(self):
+        self.assertEqual([], self.keys("pool spa"))
+        self.assertEqual([], self.keys(""))
+        self.assertEqual([], self.keys("*"))
+        self.assertEqual([], TextIndex(("text",)).search("pool"))
+
+    def test_prefix(self):
+        self.assertEqual(["0", "3"], sorted(self.keys("great*")))
+        self.assertEqual(["0"], self.keys("gre* vi*"))
+        self.assertEqual([], self.keys("pools*"))
+        self.idx.add("4", Review(id="4", text="greenery"))
+        self.assertEqual(["0", "3", "4"], sorted(self.keys("gre*")))
+
+    def test_update_and_remove(self):
+        self.idx.add("1", Review(id="1", text="A view on the sea"))
+        self.assertEqual(["0", "2"], sorted(self.keys("pool")))
+        self.assertEqual(["1", "2"], sorted(self.keys("sea")))
+        self.assertNotIn("dirty", self.idx.postings)
+        self.assertEqual([], self.keys("dirt*"))
+        self.idx.remove("2")
+        self.idx.remove("2")
+        self.assertEqual(["1"], self.keys("sea"))
+        self.assertEqual(sum(self.idx.lengths.values()), self.idx.total)
+        self.idx.add("5", Review(id="5", text="dirty"))
+        self.assertEqual(["5"], self.keys("dirt*"))
+        self.assertEqual(1, self.idx.vocabulary.count("dirty"))
+
+    def test_not_strings(self):
+        self.idx.add("4", Review(id="4", text=None))
+        self.idx.add("5", Review(id="5", text=["pool"]))
+        self.assertNotIn("4", self.idx.lengths)
+        self.assertEqual(["1", "0", "2"], self.keys("pool"))
+
+    def test_limit_matches_full_ranking(self):
+        idx = TextIndex(("text",))
+        for i in range(500):
+            text = " ".join("w{}".format(j) for j in range(i % 13)
+                            if (i + j) % 3) + " w{}".format(i % 4) * (i % 5)
+            idx.add(str(i), Review(id=str(i), text=text))
+        for query in ["w1 w2", "w0 w3 w5", "w2 w1*", "w3"]:
+            ranked = idx.search(query)
+            for limit in (1, 7, 50, 1000):
+                self.assertEqual(
+                    [(round(s, 9), k) for s, k, o in ranked[:limit]],
+                    [(round(s, 9), k) for s, k, o in
+                     idx.search(query, limit)])
+
+    def test_extend(self):
+        idx = TextIndex(("text",))
+        for i, text in enumerate(["Great pool, great view",
+                                  "Pool was dirty",
+                                  "Nice view of the pool and the sea"]):
+            idx.add(str(i), Review(id=str(i), text=text))
+        more = [("1", Review(id="1", text="A view on the sea")),
+                ("3", Review(id="3", text="Greatest stay")),
+                ("4", Review(id="4", text=None))]
+        idx.extend(more)
+        self.assertEqual(["1", "3", "4"], list(idx.waiting))
+        self.assertNotIn("1", idx.counts)
+        for key, rvw in more:
+            self.idx.add(key, rvw)
+        self.assertEqual(["0", "2"], sorted(k for s, k, o in
+                                            idx.search("pool")))
+        self.assertEqual(["0", "3"], sorted(k for s, k, o in
+                                            idx.search("great*")))
+        self.assertEqual({}, idx.waiting)
+        for attr in ("postings", "frequencies", "lengths", "counts",
+                     "total"):
+            self.assertEqual(getattr(self.idx, attr), getattr(idx, attr))
+
+    def test_extend_keeps_order(self):
+        idx = TextIndex(("text",))
+        idx.extend((str(i), Review(id=str(i), text="pool"))
+                   for i in range(3))
+        idx.add("1", Review(id="1", text="pool"))
+        idx.remove("2")
+        idx.add("3", Review(id="3", text="pool"))
+        self.assertEqual(["0", "1", "3"],
+                         [key for score, key, obj in idx.search("pool")])
+
+    def test_several_attributes(self):
+        idx = TextIndex(("name", "description"))
+        idx.add("a", Place(id="a", name="Sea house",
+                           description="Near the beach"))
+        idx.add("b", Place(id="b", name="Flat", description="Sea view"))
+        self.assertEqual(["a"], [k for s, k, o in idx.search("sea beach")])
+
+
+class TestAggregate(unittest.TestCase):
+    """ Unittests for the Aggregate class """
+
+    def setUp(self):
+        self.agg = Aggregate("city_id", ("price_by_night", "max_guest"))
+        for i, (city, price) in enumerate([("c1", 100), ("c1", 50),
+                                           ("c2", 80), ("c1", "free")]):
+            self.agg.add(str(i), Place(id=str(i), city_id=city,
+                                       price_by_night=price, max_guest=i))
+
+    def test_stats(self):
+        self.assertEqual({"count": 3,
+                          "sum": {"price_by_night": 150, "max_guest": 4},
+                          "avg": {"price_by_night": 75.0,
+                                  "max_guest": 4 / 3}},
+                         self.agg.stats("c1"))
+        self.assertEqual({"count": 0,
+                          "sum": {"price_by_night": 0, "max_guest": 0},
+                          "avg": {"price_by_night": None,
+                                  "max_guest": None}},
+                         self.agg.stats("c3"))
+        self.assertEqual(0, self.agg.stats(["c1"])["count"])
+
+    def test_update(self):
+        self.agg.add("0", Place(id="0", city_id="c2", price_by_night=20,
+                                max_guest=0))
+        self.assertEqual(2, self.agg.stats("c1")["count"])
+        self.assertEqual(50, self.agg.stats("c1")["sum"]["price_by_night"])
+        self.assertEqual(50.0, self.agg.stats("c2")["avg"]["price_by_night"])
+
+    def test_remove(self):
+        for key in ["0", "1", "1"]:
+            self.agg.remove(key)
+        self.assertEqual({"count": 1,
+                          "sum": {"price_by_night": 0, "max_guest": 3},
+                          "avg": {"price_by_night": None, "max_guest": 3.0}},
+                         self.agg.stats("c1"))
+        self.agg.remove("3")
+        self.assertEqual({"c2"}, set(self.agg.groups))
+
+    def test_float_sums_reset(self):
+        agg = Aggregate("city_id", ("latitude",))
+        agg.add("a", Place(city_id="c", latitude=0.1))
+        agg.add("b", Place(city_id="c", latitude=0.2))
+        agg.remove("a")
+        agg.remove("b")
+        agg.add("c", Place(city_id="c", latitude="x"))
+        self.assertEqual(0, agg.stats("c")["sum"]["latitude"])
+
+    def test_unhashable(self):
+        self.agg.add("4", Place(id="4", city_id=["c1"]))
+        self.assertNotIn("4", self.agg.values)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+#!/usr/bin/python3
+""" Defines unittests for models/engine/json_stream.py
+unittests class:
+    TestIterItems
+"""
+
+import json
+import unittest
+from io import StringIO
+from models.engine.json_stream import iter_items
+
+
+class TestIterItems(unittest.TestCase):
+    """ Unittests for the iter_items function """
+
+    def test_matches_json_load(self):
+        data = {"User.{}".format(i): {"id": str(i), "tags": [i, {"a": "}"}],
+                                      "note": "x, \"y\": {z}"}
+                for i in range(200)}
+        text = json.dumps(data)
+        for size in (1, 7, 64, 65536):
+            items = list(iter_items(StringIO(text), size))
+            self.assertEqual(list(data.items()), items)
+
+    def test_empty_object(self):
+        self.assertEqual([], list(iter_items(StringIO(" { } "), 1)))
+
+    def test_whitespace(self):
+        text = '\n{ "a" :\t1 ,\n "b": [ 2 ] }\n'
+        self.assertEqual([("a", 1), ("b", [2])],
+                         list(iter_items(StringIO(text), 3)))
+
+    def test_value_at_chunk_end(self):
+        self.assertEqual([("a", 123)],
+                         list(iter_items(StringIO('{"a":123}'), 8)))
+
+    def test_not_an_object(self):
+        with self.assertRaises(ValueError):
+            list(iter_items(StringIO("[1, 2]")))
+
+    def test_truncated(self):
+        with self.assertRaises(ValueError):
+            list(iter_items(StringIO('{"a": {"b": 1}'), 4))
+        with self.assertRaises(ValueError):
+            list(iter_items(StringIO('{"a": {"b": 1'), 4))
+
+    def test_missing_comma(self):
+        with self.assertRaises(ValueError):
+            list(iter_items(StringIO('{"a": 1 "b": 2}')))
+
+
+if __name__ == "__main__":
+    unittest.main()
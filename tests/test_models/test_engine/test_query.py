@@ -0,0 +1,211 @@
+#!/usr/bin/python3
+""" Defines unittests for models/engine/query.py
+unittests class:
+    TestQuery_parse
+    TestQuery_run
+"""
+
+import unittest
+from unittest.mock import MagicMock
+from models.engine.index import RangeIndex, SetIndex
+from models.engine.query import Query, tokenize
+from models.place import Place
+from models.state import State
+
+
+class TestQuery_parse(unittest.TestCase):
+    """ Unittests for the parsing of where queries """
+
+    def test_tokenize(self):
+        self.assertEqual([("word", "a"), ("op", "<="), ("word", "1.5"),
+                          ("str", 'b "c"'), ("op", ",")],
+                         tokenize('a<=1.5 "b \\"c\\"",'))
+
+    def test_tokenize_invalid(self):
+        with self.assertRaises(ValueError):
+            tokenize("a ! b")
+
+    def test_full_query(self):
+        q = Query('Place price_by_night < 100 and number_rooms >= 2 '
+                  'name = "Big loft" order by max_guest desc '
+                  'limit 5 offset 10 select name, price_by_night')
+        self.assertEqual("Place", q.cls_name)
+        self.assertEqual([("price_by_night", "<", 100),
+                          ("number_rooms", ">=", 2),
+                          ("name", "=", "Big loft")], q.filters)
+        self.assertEqual(("max_guest", True), (q.order, q.descending))
+        self.assertEqual((5, 10), (q.limit, q.offset))
+        self.assertEqual(["name", "price_by_night"], q.fields)
+
+    def test_defaults(self):
+        q = Query("User")
+        self.assertEqual(([], None, False, None, 0, None),
+                         (q.filters, q.order, q.descending, q.limit,
+                          q.offset, q.fields))
+
+    def test_values(self):
+        q = Query("Place a = 3 b = 2.5 c = '3' d = abc")
+        self.assertEqual([3, 2.5, "3", "abc"],
+                         [value for field, op, value in q.filters])
+
+    def test_invalid(self):
+        for text in ("", "< 3", "Place a", "Place a ~ 3", "Place a <",
+                     "Place a < >", "Place order name", "Place limit x",
+                     "Place select"):
+            with self.assertRaises(ValueError, msg=text):
+                Query(text)
+
+
+class TestQuery_run(unittest.TestCase):
+    """ Unittests for the planning and execution of where queries """
+
+    def setUp(self):
+        self.places = [Place.from_dict({"name": "P{}".format(i),
+                                        "city_id": "c{}".format(i % 2),
+                                        "price_by_night": 50 * i,
+                                        "amenity_ids": ["a{}".format(i % 3),
+                                                        "b{}".format(i % 2)]})
+                       for i in range(6)]
+        self.places.append(Place.from_dict({"name": "free"}))
+        self.storage = MagicMock()
+        self.storage.iterate.side_effect = lambda cls: iter(self.places)
+        self.storage.find.side_effect = lambda cls, **eq: {
+            p.id: p for p in self.places
+            if all(getattr(p, k) == v for k, v in eq.items())}
+        self.storage.range.side_effect = self.range
+        self.storage.having.side_effect = self.having
+
+    def range(self, cls, attr, **bounds):
+        index = RangeIndex(attr)
+        for p in self.places:
+            index.add(p.id, p)
+        return index.range(**bounds)
+
+    def having(self, cls, attr, values, mode="all"):
+        index = SetIndex(attr)
+        for p in self.places:
+            index.add(p.id, p)
+        return index.find(values, mode)
+
+    def names(self, text):
+        return [p.name for p in Query(text).run(self.storage, Place)]
+
+    def test_plan_index(self):
+        q = Query("Place city_id = c1 and price_by_night < 100")
+        self.assertEqual(("index", {"city_id": "c1"}), q.plan(Place))
+        self.assertEqual(["P1"], self.names(
+            "Place city_id = c1 and price_by_night < 100"))
+        self.storage.iterate.assert_not_called()
+
+    def test_field_names_of_arguments(self):
+        for plc in self.places:
+            plc.cls = 1
+            plc.self = 1
+            plc.reverse = 1
+        self.assertEqual(("index", {"city_id": "c1"}), Query(
+            "Place cls = 1 and self = 1 and city_id = c1").plan(Place))
+        self.assertEqual(["P1", "P3", "P5"], self.names(
+            "Place cls = 1 and self = 1 and city_id = c1"))
+        self.assertEqual(["P4", "P2", "P0"], self.names(
+            "Place city_id = c0 and reverse = 1 "
+            "order by price_by_night desc"))
+
+    def test_plan_scan(self):
+        self.assertEqual(("scan", None), Query("Place name = P1").plan(Place))
+        self.assertEqual(("scan", None), Query("State name = x").plan(State))
+        self.assertEqual(["P1"], self.names("Place name = P1"))
+        self.storage.find.assert_not_called()
+
+    def test_plan_range(self):
+        self.assertEqual(("range", {"attr": "price_by_night", "low": 100,
+                                    "include_low": False, "high": 200,
+                                    "include_high": True}),
+                         Query("Place price_by_night > 50 and "
+                               "price_by_night <= 200 and "
+                               "price_by_night > 100").plan(Place))
+        self.assertEqual(("range", {"attr": "max_guest", "low": 3,
+                                    "include_low": True, "high": 3,
+                                    "include_high": True,
+                                    "reverse": True}),
+                         Query("Place price_by_night < 100 and "
+                               "max_guest = 3 order by max_guest "
+                               "desc").plan(Place))
+        self.assertEqual(("range", {"attr": "number_rooms",
+                                    "reverse": False}),
+                         Query("Place order by number_rooms limit 3")
+                         .plan(Place))
+        self.assertEqual(("scan", None),
+                         Query("Place order by number_rooms").plan(Place))
+        self.assertEqual(("scan", None),
+                         Query("Place price_by_night < x").plan(Place))
+
+    def test_plan_set(self):
+        q = Query('Place amenity_ids has a1 and amenity_ids has "b1" '
+                  'and price_by_night > 0')
+        self.assertEqual(("set", {"attr": "amenity_ids",
+                                  "values": ["a1", "b1"]}), q.plan(Place))
+        self.assertEqual(["P1"], self.names(
+            "Place amenity_ids has a1 and amenity_ids has b1"))
+        self.assertEqual(["P4", "P2", "P0"], self.names(
+            "Place amenity_ids has b0 and price_by_night < 250 "
+            "order by price_by_night desc"))
+        self.storage.iterate.assert_not_called()
+        self.assertEqual(("index", {"city_id": "c1"}), Query(
+            "Place amenity_ids has a1 and city_id = c1").plan(Place))
+
+    def test_has_scan(self):
+        self.assertEqual(("scan", None), Query("Place name has re")
+                         .plan(Place))
+        self.assertEqual(["free"], self.names("Place name has re"))
+        self.assertEqual([], self.names("Place price_by_night has 1"))
+        self.storage.having.assert_not_called()
+
+    def test_range_plans(self):
+        self.assertEqual(["P3", "P4"], self.names(
+            "Place price_by_night >= 150 and price_by_night < 250"))
+        self.assertEqual(["P5", "P4"], self.names(
+            "Place order by price_by_night desc limit 2"))
+        self.assertEqual(["P3", "P2"], self.names(
+            "Place price_by_night > 50 and price_by_night < 200 "
+            "order by price_by_night desc"))
+        self.storage.iterate.assert_not_called()
+
+    def test_comparisons(self):
+        self.assertEqual(["P0", "P1", "P2"],
+                         self.names("Place price_by_night <= 100 "
+                                    "and name != free"))
+        self.assertEqual(["P5"], self.names("Place price_by_night > 200"))
+        self.assertEqual([], self.names("Place name > 3"))
+
+    def test_order_limit_offset(self):
+        self.assertEqual(["P5", "P4"], self.names(
+            "Place order by price_by_night desc limit 2"))
+        self.assertEqual(["P2", "P3"], self.names(
+            "Place name != free order by name limit 2 offset 2"))
+        self.assertEqual(["P2", "P4"], self.names(
+            "Place city_id = c0 order by price_by_night offset 1 "
+            "limit 2"))
+
+    def test_order_missing_values_last(self):
+        self.places[0].number_rooms = None
+        self.assertEqual("P0", self.names(
+            "Place order by number_rooms")[-1])
+        self.assertEqual("P0", self.names(
+            "Place order by number_rooms desc")[-1])
+
+    def test_order_mixed_types(self):
+        self.places[0].max_guest = "many"
+        with self.assertRaises(ValueError):
+            self.names("Place order by max_guest")
+
+    def test_select(self):
+        results = list(Query("Place price_by_night = 50 select name, "
+                             "created_at, nope").run(self.storage, Place))
+        self.assertEqual([{"name": "P1",
+                           "created_at": self.places[1].to_dict()[
+                               "created_at"],
+                           "nope": None}], results)
+
+
+if __name__ == "__main__":
+    unittest.main()
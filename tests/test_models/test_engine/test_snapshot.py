@@ -0,0 +1,199 @@
+#!/usr/bin/python3
+""" Defines unittests for models/engine/snapshot.py
+unittests class:
+    TestSnapshot_format
+    TestSnapshot_convert
+    TestRecords
+"""
+
+import io
+import json
+import os
+import tempfile
+import unittest
+from models.engine import snapshot
+from models.engine.snapshot import Records, Snapshot
+
+
+def store(count):
+    """Return a file.json dictionary of count Users and count States."""
+    data = {}
+    for i in range(count):
+        data["User.{:03}".format(i)] = {"id": "{:03}".format(i),
+                                        "email": "é{}".format(i),
+                                        "__class__": "User"}
+        data["State.{:03}".format(i)] = {"id": "{:03}".format(i),
+                                         "name": "S{}".format(i),
+                                         "__class__": "State"}
+    return data
+
+
+class TestSnapshot_format(unittest.TestCase):
+    """ Unittests for writing and mapping snapshots """
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "file.snap")
+        self.data = store(50)
+        with open(self.path, "wb") as f:
+            snapshot.write(f, ((key, json.dumps(a).encode())
+                               for key, a in self.data.items()))
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_header(self):
+        with open(self.path, "rb") as f:
+            head = f.read(snapshot.HEADER.size)
+        magic, version, _, count, index, size = snapshot.HEADER.unpack(head)
+        self.assertEqual(b"HBNBSNAP", magic)
+        self.assertEqual(1, version)
+        self.assertEqual(100, count)
+        self.assertEqual(os.path.getsize(self.path), size)
+        self.assertEqual(size - 100 * snapshot.ENTRY.size, index)
+
+    def test_sorted_keys(self):
+        with Snapshot(self.path) as snap:
+            self.assertEqual(100, len(snap))
+            keys = [snap.key(i) for i in range(len(snap))]
+        self.assertEqual(sorted(self.data), keys)
+
+    def test_get(self):
+        with Snapshot(self.path) as snap:
+            for key, a in self.data.items():
+                self.assertEqual(a, snap.get(key))
+            self.assertIsNone(snap.get("User.999"))
+            self.assertIsNone(snap.get("Place.000"))
+            self.assertIsNone(snap.get(""))
+
+    def test_bounds(self):
+        with Snapshot(self.path) as snap:
+            self.assertEqual((0, 50), snap.bounds("State."))
+            self.assertEqual((50, 100), snap.bounds("User."))
+            start, stop = snap.bounds("Place.")
+            self.assertEqual(start, stop)
+
+    def test_items_in_written_order(self):
+        with Snapshot(self.path) as snap:
+            self.assertEqual(list(self.data.items()), list(snap.items()))
+
+    def test_empty(self):
+        with open(self.path, "wb") as f:
+            snapshot.write(f, [])
+        with Snapshot(self.path) as snap:
+            self.assertEqual(0, len(snap))
+            self.assertIsNone(snap.get("User.1"))
+            self.assertEqual([], list(snap.items()))
+
+    def test_duplicate_key(self):
+        with self.assertRaises(ValueError):
+            snapshot.write(io.BytesIO(), [("User.1", b"{}"),
+                                          ("User.1", b"{}")])
+
+    def test_truncated(self):
+        size = os.path.getsize(self.path)
+        with open(self.path, "r+b") as f:
+            f.truncate(size - 1)
+        with self.assertRaises(ValueError):
+            Snapshot(self.path)
+
+    def test_not_a_snapshot(self):
+        for content in (b"", b"{}", b"{" + b" " * 64 + b"}"):
+            with open(self.path, "wb") as f:
+                f.write(content)
+            with self.assertRaises(ValueError):
+                Snapshot(self.path)
+
+
+class TestSnapshot_convert(unittest.TestCase):
+    """ Unittests for the conversions between file.json and snapshots """
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.json = os.path.join(self.dir.name, "file.json")
+        self.snap = os.path.join(self.dir.name, "file.snap")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_round_trip(self):
+        data = store(20)
+        text = "{" + ", ".join(json.dumps(key) + ": " + json.dumps(a)
+                               for key, a in data.items()) + "}"
+        with open(self.json, "w") as f:
+            f.write(text)
+        snapshot.from_json(self.json, self.snap)
+        with Snapshot(self.snap) as snap:
+            self.assertEqual(data, dict(snap.items()))
+        os.remove(self.json)
+        snapshot.to_json(self.snap, self.json)
+        with open(self.json) as f:
+            self.assertEqual(text, f.read())
+
+    def test_empty_store(self):
+        with open(self.json, "w") as f:
+            f.write("{}")
+        snapshot.from_json(self.json, self.snap)
+        snapshot.to_json(self.snap, self.json)
+        with open(self.json) as f:
+            self.assertEqual("{}", f.read())
+
+
+class TestRecords(unittest.TestCase):
+    """ Unittests for the Records mapping of one class of a snapshot """
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        path = os.path.join(self.dir.name, "file.snap")
+        self.data = store(5)
+        with open(path, "wb") as f:
+            snapshot.write(f, ((key, json.dumps(a).encode())
+                               for key, a in self.data.items()))
+        self.snap = Snapshot(path)
+        self.users = Records(self.snap, "User")
+
+    def tearDown(self):
+        self.snap.close()
+        self.dir.cleanup()
+
+    def test_read(self):
+        self.assertEqual(5, len(self.users))
+        self.assertIn("User.003", self.users)
+        self.assertNotIn("State.003", self.users)
+        self.assertNotIn(3, self.users)
+        self.assertEqual(self.data["User.003"], self.users["User.003"])
+        with self.assertRaises(KeyError):
+            self.users["State.003"]
+        self.assertEqual({key: a for key, a in self.data.items()
+                          if key.startswith("User.")}, dict(self.users))
+
+    def test_set_and_delete(self):
+        self.users["User.001"] = {"id": "001", "__class__": "User"}
+        self.users["User.100"] = {"id": "100", "__class__": "User"}
+        del self.users["User.002"]
+        self.assertEqual(5, len(self.users))
+        self.assertEqual({"id": "001", "__class__": "User"},
+                         self.users["User.001"])
+        self.assertNotIn("User.002", self.users)
+        self.assertEqual(["User.000", "User.003", "User.004", "User.001",
+                          "User.100"], list(self.users))
+        self.assertEqual(list(self.users),
+                         [key for key, a in self.users.items()])
+        with self.assertRaises(KeyError):
+            del self.users["User.002"]
+        self.assertIsNone(self.users.pop("User.002", None))
+        self.assertEqual(self.data["User.003"], self.users.pop("User.003"))
+        self.assertEqual(4, len(self.users))
+        self.assertEqual(self.data["User.003"], self.snap.get("User.003"))
+
+    def test_payload(self):
+        self.assertEqual(json.dumps(self.data["User.000"]).encode(),
+                         self.users.payload("User.000"))
+        self.users["User.000"] = {"id": "000"}
+        self.assertEqual(b'{"id": "000"}', self.users.payload("User.000"))
+        with self.assertRaises(KeyError):
+            self.users.payload("User.999")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,519 @@
+#!/usr/bin/python3
+""" Defines unittests for models/engine/sqlite_storage.py
+unittests class:
+    TestSQLiteStorage_methods
+    TestSQLiteStorage_console
+"""
+
+import gc
+import os
+import models
+import sqlite3
+import unittest
+from io import StringIO
+from unittest.mock import patch
+from models.engine.sqlite_storage import SQLiteStorage
+from models.base_model import BaseModel
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.relations import prefetch
+from models.state import State
+
+
+class TestSQLiteStorage_methods(unittest.TestCase):
+    """ Unittests for the methods of the SQLiteStorage class """
+
+    def setUp(self):
+        SQLiteStorage._SQLiteStorage__db_path = "test_hbnb.db"
+        self.storage = SQLiteStorage()
+        self.storage.reload()
+        self.patcher = patch("models.storage", self.storage)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.storage.close()
+        try:
+            os.remove("test_hbnb.db")
+        except IOError:
+            pass
+
+    def tables(self):
+        conn = sqlite3.connect("test_hbnb.db")
+        names = {row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'")}
+        conn.close()
+        return names
+
+    def test_one_table_per_class(self):
+        self.assertEqual({"BaseModel", "User", "State", "City", "Place",
+                          "Amenity", "Review", "Place.amenity_ids",
+                          "Place.fts", "Review.fts"},
+                         {name for name in self.tables()
+                          if ".fts_" not in name})
+
+    def test_save_reload(self):
+        st = State()
+        st.name = "California"
+        st.save()
+        self.storage.reload()
+        self.assertEqual({}, SQLiteStorage._SQLiteStorage__objects)
+        loaded = self.storage.get(State, st.id)
+        self.assertIsNot(st, loaded)
+        self.assertEqual(st.to_dict(), loaded.to_dict())
+
+    def test_nothing_written_before_save(self):
+        bm = BaseModel()
+        self.assertIs(bm, self.storage.get(BaseModel, bm.id))
+        self.storage.reload()
+        self.assertIsNone(self.storage.get(BaseModel, bm.id))
+
+    def test_get_returns_same_instance(self):
+        bm = BaseModel()
+        bm.save()
+        self.storage.reload()
+        self.assertIs(self.storage.get("BaseModel", bm.id),
+                      self.storage.get(BaseModel, bm.id))
+
+    def test_only_changed_objects_held(self):
+        ids = [State().id for i in range(50)]
+        self.storage.save()
+        self.storage.reload()
+        self.assertEqual(50, len(self.storage.all(State)))
+        self.assertEqual(50, sum(1 for st in self.storage.iterate(State)))
+        gc.collect()
+        self.assertEqual(0, len(SQLiteStorage._SQLiteStorage__objects))
+        st = self.storage.get(State, ids[0])
+        self.assertIs(st, self.storage.get(State, ids[0]))
+        st.name = "Utah"
+        del st
+        State().name = "Ohio"
+        gc.collect()
+        self.assertEqual(2, len(SQLiteStorage._SQLiteStorage__objects))
+        self.assertEqual("Utah", self.storage.get(State, ids[0]).name)
+        self.assertEqual(51, self.storage.count(State))
+        self.storage.save()
+        gc.collect()
+        self.assertEqual(0, len(SQLiteStorage._SQLiteStorage__objects))
+        self.assertEqual(1, len(self.storage.find(State, name="Ohio")))
+
+    def test_get_missing(self):
+        self.assertIsNone(self.storage.get(BaseModel, "missing"))
+
+    def test_all(self):
+        bm = BaseModel()
+        bm.save()
+        self.storage.reload()
+        st = State()
+        self.assertEqual({"BaseModel." + bm.id, "State." + st.id},
+                         set(self.storage.all()))
+        self.assertEqual(["State." + st.id], list(self.storage.all(State)))
+
+    def test_iterate(self):
+        bm = BaseModel()
+        bm.save()
+        self.storage.reload()
+        st = State()
+        self.assertEqual([bm.id, st.id],
+                         [obj.id for obj in self.storage.iterate()])
+        self.assertEqual([st], list(self.storage.iterate("State")))
+
+    def test_count(self):
+        bm = BaseModel()
+        bm.save()
+        BaseModel()
+        self.assertEqual(2, self.storage.count(BaseModel))
+        self.storage.delete(bm)
+        self.assertEqual(1, self.storage.count("BaseModel"))
+        self.assertEqual(1, self.storage.count())
+
+    def test_delete(self):
+        bm = BaseModel()
+        bm.save()
+        self.storage.delete(bm)
+        self.assertIsNone(self.storage.get(BaseModel, bm.id))
+        self.assertEqual({}, self.storage.all(BaseModel))
+        self.storage.save()
+        self.storage.reload()
+        self.assertIsNone(self.storage.get(BaseModel, bm.id))
+
+    def test_delete_none(self):
+        self.storage.delete(None)
+        self.assertEqual({}, self.storage.all())
+
+    def test_update_written_on_save(self):
+        st = State()
+        st.save()
+        self.storage.reload()
+        self.storage.get(State, st.id).name = "Nevada"
+        self.storage.save()
+        self.storage.reload()
+        self.assertEqual("Nevada", self.storage.get(State, st.id).name)
+
+    def test_find_indexed(self):
+        ct1 = City()
+        ct1.state_id = "s1"
+        ct2 = City()
+        ct2.state_id = "s2"
+        self.storage.save()
+        self.storage.reload()
+        self.assertEqual(["City." + ct1.id],
+                         list(self.storage.find(City, state_id="s1")))
+        self.storage.get(City, ct2.id).state_id = "s1"
+        self.assertEqual({"City." + ct1.id, "City." + ct2.id},
+                         set(self.storage.find(City, state_id="s1")))
+
+    def test_find_unindexed(self):
+        pl = Place()
+        pl.city_id = "c1"
+        pl.name = "Loft"
+        pl.save()
+        self.storage.reload()
+        self.assertEqual(["Place." + pl.id],
+                         list(self.storage.find(Place, city_id="c1",
+                                                name="Loft")))
+        self.assertEqual({}, self.storage.find(Place, name="Other"))
+
+    def test_batch_rollback(self):
+        st = State()
+        st.name = "Utah"
+        st.save()
+        with self.assertRaises(ValueError):
+            with self.storage.batch():
+                bm = BaseModel()
+                st.name = "Ohio"
+                self.storage.save()
+                raise ValueError
+        self.assertIsNone(self.storage.get(BaseModel, bm.id))
+        self.assertEqual("Utah", self.storage.get(State, st.id).name)
+
+    def test_rollback_resets_held_objects(self):
+        st = State()
+        st.name = "Utah"
+        gone = State()
+        gone.name = "Nevada"
+        st.save()
+        with self.assertRaises(ValueError):
+            with self.storage.batch():
+                bm = BaseModel()
+                st.name = "Ohio"
+                self.storage.delete(gone)
+                raise ValueError
+        self.assertEqual("Utah", st.name)
+        self.assertIs(st, self.storage.get(State, st.id))
+        self.assertIs(gone, self.storage.get(State, gone.id))
+        with self.assertRaises(ValueError):
+            bm.save()
+        st.save()
+        self.storage.reload()
+        self.assertEqual("Utah", self.storage.get(State, st.id).name)
+        self.assertIsNone(self.storage.get(BaseModel, bm.id))
+
+    def test_failed_inner_batch_keeps_outer(self):
+        st = State()
+        st.name = "Utah"
+        st.save()
+        with self.storage.batch():
+            new = State()
+            new.name = "Nevada"
+            st.name = "Ohio"
+            with self.assertRaises(ValueError):
+                with self.storage.batch():
+                    bm = BaseModel()
+                    new.name = "Iowa"
+                    self.storage.delete(st)
+                    raise ValueError
+            self.assertTrue(self.storage.in_transaction())
+            self.assertIsNone(self.storage.get(BaseModel, bm.id))
+            self.assertEqual("Nevada", self.storage.get(State, new.id).name)
+            self.assertEqual("Ohio", self.storage.get(State, st.id).name)
+        self.assertFalse(self.storage.in_transaction())
+        self.storage.reload()
+        self.assertEqual({"State." + st.id, "State." + new.id},
+                         set(self.storage.all()))
+        self.assertEqual("Ohio", self.storage.get(State, st.id).name)
+        self.assertEqual("Nevada", self.storage.get(State, new.id).name)
+
+    def test_range(self):
+        places = []
+        for price in [30, 10, 20, 40]:
+            plc = Place()
+            plc.price_by_night = price
+            places.append(plc)
+        self.storage.save()
+        self.storage.reload()
+        self.assertEqual([places[2].id, places[0].id], [
+            plc.id for plc in self.storage.range(Place, "price_by_night",
+                                                 low=15, high=30)])
+        self.storage.get(Place, places[1].id).price_by_night = 25
+        self.storage.delete(self.storage.get(Place, places[0].id))
+        new = Place()
+        new.price_by_night = 22
+        self.assertEqual([places[3].id, places[1].id, new.id, places[2].id],
+                         [plc.id for plc in self.storage.range(
+                             Place, "price_by_night", reverse=True)])
+        self.assertEqual([], list(self.storage.range(
+            Place, "latitude", low=1)))
+
+    def test_near_and_bbox(self):
+        paris = Place()
+        paris.latitude, paris.longitude = 48.8566, 2.3522
+        london = Place()
+        london.latitude, london.longitude = 51.5072, -0.1276
+        self.storage.save()
+        self.storage.reload()
+        self.assertEqual([paris.id, london.id], [
+            obj.id for d, obj in self.storage.near(48.85, 2.35, 400)])
+        self.assertEqual(["Place." + london.id],
+                         list(self.storage.bbox(50, -1, 52, 1)))
+        moved = self.storage.get(Place, london.id)
+        moved.latitude, moved.longitude = 48.9, 2.4
+        self.storage.delete(self.storage.get(Place, paris.id))
+        fiji = Place()
+        fiji.latitude, fiji.longitude = -17.7, 178.0
+        self.assertEqual([london.id], [
+            obj.id for d, obj in self.storage.near(48.85, 2.35, 20)])
+        self.assertEqual(["Place." + fiji.id],
+                         list(self.storage.bbox(-20, 170, -10, -170)))
+
+    def test_having(self):
+        wifi_pool = Place()
+        wifi_pool.amenity_ids = ["wifi", "pool"]
+        wifi = Place()
+        wifi.amenity_ids = ["wifi"]
+        Place()
+        self.storage.save()
+        self.storage.reload()
+        self.assertEqual({"Place." + wifi_pool.id}, set(self.storage.having(
+            Place, "amenity_ids", ["wifi", "pool"])))
+        self.assertEqual({"Place." + wifi_pool.id, "Place." + wifi.id},
+                         set(self.storage.having(Place, "amenity_ids",
+                                                 ["pool", "wifi"], "any")))
+        self.storage.get(Place, wifi.id).amenity_ids = ["wifi", "pool"]
+        self.storage.delete(self.storage.get(Place, wifi_pool.id))
+        new = Place()
+        new.amenity_ids = ["pool"]
+        self.assertEqual({"Place." + wifi.id}, set(self.storage.having(
+            Place, "amenity_ids", ["wifi", "pool"])))
+        self.storage.save()
+        self.storage.reload()
+        self.assertEqual({"Place." + wifi.id, "Place." + new.id},
+                         set(self.storage.having(Place, "amenity_ids",
+                                                 ["pool"])))
+        self.assertEqual({}, self.storage.having(Place, "amenity_ids",
+                                                 ["pool", "spa"]))
+        with self.assertRaises(ValueError):
+            self.storage.having(Place, "amenity_ids", ["pool"], "some")
+
+    def test_reload_fills_member_tables(self):
+        conn = SQLiteStorage._SQLiteStorage__conn
+        conn.execute('DROP TABLE "Place.amenity_ids"')
+        conn.execute('INSERT INTO "Place" (id, data) VALUES (?, ?)',
+                     ("1", '{"id": "1", "__class__": "Place", '
+                      '"created_at": "2024-01-01T00:00:00.000001", '
+                      '"updated_at": "2024-01-01T00:00:00.000001", '
+                      '"amenity_ids": ["wifi", "pool"]}'))
+        conn.commit()
+        self.storage.reload()
+        self.assertEqual(["Place.1"], list(self.storage.having(
+            Place, "amenity_ids", ["pool", "wifi"])))
+
+    def test_search(self):
+        reviews = []
+        for text in ["Great pool, great view", "Pool was dirty",
+                     "Nice view of the pool", "Greatest stay"]:
+            rvw = Review()
+            rvw.text = text
+            reviews.append(rvw)
+        self.storage.save()
+        self.storage.reload()
+        self.assertEqual([reviews[0].id, reviews[2].id], [
+            obj.id for s, obj in self.storage.search(Review, "view pool")])
+        self.assertEqual({reviews[0].id, reviews[3].id}, {
+            obj.id for s, obj in self.storage.search(Review, "GREAT*")})
+        self.assertEqual(1, len(self.storage.search(Review, "great*",
+                                                    limit=1)))
+        self.storage.get(Review, reviews[1].id).text = "Pool with a view"
+        self.storage.delete(self.storage.get(Review, reviews[2].id))
+        self.assertEqual({reviews[0].id, reviews[1].id}, {
+            obj.id for s, obj in self.storage.search(Review, "view")})
+        self.storage.save()
+        self.storage.reload()
+        self.assertEqual({reviews[0].id, reviews[1].id}, {
+            obj.id for s, obj in self.storage.search(Review, "view")})
+        self.assertEqual([], self.storage.search(Review, "dirty"))
+        self.assertEqual([], self.storage.search(Review, "  "))
+        self.assertEqual([], self.storage.search(State, "view"))
+
+    def test_search_ranks_unsaved_alike(self):
+        saved = Review()
+        saved.text = "Pool with a view"
+        dirty = Review()
+        dirty.text = "Dirty room"
+        self.storage.save()
+        new = Review()
+        new.text = "Pool with a view"
+        long = Review()
+        long.text = "Pool " + "and a room with a view " * 5
+        dirty.text = "A dirty pool and room"
+        before = [(score, obj.id) for score, obj
+                  in self.storage.search(Review, "pool")]
+        self.assertEqual({saved.id, new.id},
+                         {id for score, id in before[:2]})
+        self.assertAlmostEqual(before[0][0], before[1][0])
+        self.assertEqual(long.id, before[-1][1])
+        self.assertEqual(before[:1], [
+            (score, obj.id) for score, obj
+            in self.storage.search(Review, "pool", limit=1)])
+        self.storage.save()
+        after = [(score, obj.id) for score, obj
+                 in self.storage.search(Review, "pool")]
+        self.assertEqual([id for score, id in before],
+                         [id for score, id in after])
+        for (b, _), (a, _) in zip(before, after):
+            self.assertAlmostEqual(b, a)
+
+    def test_reload_fills_fts_tables(self):
+        conn = SQLiteStorage._SQLiteStorage__conn
+        conn.execute('DROP TABLE "Review.fts"')
+        conn.execute('INSERT INTO "Review" (id, data) VALUES (?, ?)',
+                     ("1", '{"id": "1", "__class__": "Review", '
+                      '"created_at": "2024-01-01T00:00:00.000001", '
+                      '"updated_at": "2024-01-01T00:00:00.000001", '
+                      '"text": "Lovely garden"}'))
+        conn.commit()
+        self.storage.reload()
+        self.assertEqual(["1"], [obj.id for s, obj in self.storage.search(
+            Review, "gard*")])
+
+    def test_aggregate(self):
+        places = []
+        for city, price in [("c1", 100), ("c1", 50), ("c2", 80),
+                            ("c1", "free")]:
+            plc = Place()
+            plc.city_id, plc.price_by_night = city, price
+            places.append(plc)
+        self.storage.save()
+        self.storage.reload()
+        self.assertEqual({"count": 3, "sum": {"price_by_night": 150},
+                          "avg": {"price_by_night": 75.0}},
+                         self.storage.aggregate(Place, "city_id", "c1"))
+        self.storage.get(Place, places[1].id).price_by_night = 70
+        self.storage.get(Place, places[2].id).city_id = "c1"
+        self.storage.delete(self.storage.get(Place, places[0].id))
+        self.assertEqual({"c1": {"count": 3, "sum": {"price_by_night": 150},
+                                 "avg": {"price_by_night": 75.0}}},
+                         self.storage.aggregate(Place, "city_id"))
+        self.storage.save()
+        self.assertEqual({"count": 3, "sum": {"price_by_night": 150},
+                          "avg": {"price_by_night": 75.0}},
+                         self.storage.aggregate(Place, "city_id", "c1"))
+        self.assertEqual({"count": 0, "sum": {"price_by_night": 0},
+                          "avg": {"price_by_night": None}},
+                         self.storage.aggregate(Place, "city_id", "c2"))
+        self.assertEqual(3, self.storage.aggregate(
+            Place, "name", "")["count"])
+        self.assertEqual([], self.storage.check_aggregates())
+
+    def test_find_in(self):
+        st = State()
+        cities = [City(), City(), City()]
+        for cty, state_id in zip(cities, [st.id, st.id, "other"]):
+            cty.state_id = state_id
+        self.storage.save()
+        self.storage.reload()
+        found = self.storage.find_in(City, "state_id", [st.id, "none"])
+        self.assertEqual([st.id], list(found))
+        self.assertEqual({"City." + cities[0].id, "City." + cities[1].id},
+                         set(found[st.id]))
+        self.storage.get(City, cities[2].id).state_id = st.id
+        self.assertEqual(3, len(self.storage.find_in(
+            City, "state_id", [st.id])[st.id]))
+        self.assertEqual({cities[0].id, st.id}, set(
+            self.storage.find_in(City, "id", [cities[0].id]))
+            | set(self.storage.find_in(State, "id", [st.id, 3])))
+        self.assertEqual({"": {"City." + c.id for c in cities}},
+                         {value: set(objs) for value, objs in
+                          self.storage.find_in(City, "name",
+                                               [""]).items()})
+
+    def test_relations(self):
+        st = State()
+        cty = City()
+        cty.state_id = st.id
+        plc = Place()
+        plc.city_id = cty.id
+        self.storage.save()
+        self.storage.reload()
+        loaded = self.storage.get(State, st.id)
+        self.assertEqual([cty.id], [c.id for c in loaded.cities])
+        self.assertIs(loaded, loaded.cities[0].state)
+        with prefetch([loaded], "cities.places"):
+            self.assertEqual([plc.id], [p.id for p in
+                                        loaded.cities[0].places])
+
+    def test_reload_adds_missing_columns(self):
+        conn = SQLiteStorage._SQLiteStorage__conn
+        conn.execute('DROP TABLE "Place"')
+        conn.execute('CREATE TABLE "Place" (id TEXT PRIMARY KEY, '
+                     'data TEXT NOT NULL, city_id, user_id)')
+        conn.execute('INSERT INTO "Place" VALUES (?, ?, ?, ?)',
+                     ("1", '{"id": "1", "__class__": "Place", '
+                      '"created_at": "2024-01-01T00:00:00.000001", '
+                      '"updated_at": "2024-01-01T00:00:00.000001", '
+                      '"max_guest": 4}', "", ""))
+        conn.commit()
+        self.storage.reload()
+        self.assertEqual(["1"], [plc.id for plc in self.storage.range(
+            Place, "max_guest", low=4)])
+
+    def test_find_uses_index(self):
+        conn = SQLiteStorage._SQLiteStorage__conn
+        plan = conn.execute('EXPLAIN QUERY PLAN SELECT id FROM "City" '
+                            'WHERE "state_id" = ?', ("s1",)).fetchall()
+        self.assertIn("City_state_id", str(plan))
+
+
+class TestSQLiteStorage_console(unittest.TestCase):
+    """ Unittests for the console running on SQLiteStorage """
+
+    def setUp(self):
+        SQLiteStorage._SQLiteStorage__db_path = "test_hbnb.db"
+        self.storage = SQLiteStorage()
+        self.storage.reload()
+        self.patchers = [patch("models.storage", self.storage),
+                         patch("console.storage", self.storage)]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        self.storage.close()
+        try:
+            os.remove("test_hbnb.db")
+        except IOError:
+            pass
+
+    def run_cmd(self, line):
+        from console import HBNBCommand
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd(line)
+        return output.getvalue().strip()
+
+    def test_create_show_update_destroy(self):
+        id = self.run_cmd('create State name="Texas"')
+        self.storage.reload()
+        self.assertIn("'name': 'Texas'", self.run_cmd("show State " + id))
+        self.run_cmd('update State {} name "Ohio"'.format(id))
+        self.storage.reload()
+        self.assertEqual("Ohio", self.storage.get(State, id).name)
+        self.run_cmd("destroy State " + id)
+        self.storage.reload()
+        self.assertEqual("** no instance found **",
+                         self.run_cmd("show State " + id))
+
+
+if __name__ == "__main__":
+    unittest.main()
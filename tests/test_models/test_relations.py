@@ -0,0 +1,161 @@
+#!/usr/bin/python3
+"""Defines unittests for models/relations.py.
+Unittest classes:
+    TestRelations_accessors
+    TestRelations_prefetch
+"""
+import unittest
+from unittest.mock import patch
+import models
+from models.engine.file_storage import FileStorage
+from models.relations import HasMany, prefetch
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+
+
+def build():
+    """Return a State with two cities, three places and four reviews."""
+    st = State()
+    usr = User()
+    wifi = Amenity()
+    pool = Amenity()
+    cities = [City(), City()]
+    for cty in cities:
+        cty.state_id = st.id
+    places = [Place(), Place(), Place()]
+    for plc, cty in zip(places, [cities[0], cities[0], cities[1]]):
+        plc.city_id = cty.id
+        plc.user_id = usr.id
+    places[0].amenity_ids = [wifi.id, "missing", pool.id]
+    places[2].amenity_ids = [pool.id]
+    reviews = [Review() for i in range(4)]
+    for rvw, plc in zip(reviews, [places[0], places[0], places[2],
+                                  places[2]]):
+        rvw.place_id = plc.id
+        rvw.user_id = usr.id
+    return st, usr, [wifi, pool], cities, places, reviews
+
+
+class TestRelations_accessors(unittest.TestCase):
+    """Unittests for the relationship accessors of the models."""
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        (self.st, self.usr, self.amenities, self.cities, self.places,
+         self.reviews) = build()
+
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+
+    def test_has_many(self):
+        self.assertEqual(self.cities, self.st.cities)
+        self.assertEqual(self.places[:2], self.cities[0].places)
+        self.assertEqual(self.reviews[2:], self.places[2].reviews)
+        self.assertEqual([], self.places[1].reviews)
+        self.assertEqual(self.places, self.usr.places)
+        self.assertEqual(self.reviews, self.usr.reviews)
+
+    def test_belongs_to(self):
+        self.assertIs(self.st, self.cities[1].state)
+        self.assertIs(self.cities[1], self.places[2].city)
+        self.assertIs(self.usr, self.places[0].user)
+        self.assertIs(self.places[0], self.reviews[1].place)
+        self.assertIsNone(City().state)
+
+    def test_lists(self):
+        self.assertEqual(self.amenities, self.places[0].amenities)
+        self.assertEqual([], self.places[1].amenities)
+        self.assertEqual([self.places[0], self.places[2]],
+                         self.amenities[1].places)
+
+    def test_live(self):
+        cty = City()
+        cty.state_id = self.st.id
+        self.assertEqual(self.cities + [cty], self.st.cities)
+        self.cities[0].state_id = "other"
+        self.assertEqual([self.cities[1], cty], self.st.cities)
+        self.assertIsNone(self.cities[0].state)
+
+    def test_read_only(self):
+        with self.assertRaises(AttributeError):
+            self.st.cities = []
+        self.assertIsInstance(State.cities, HasMany)
+        self.assertNotIn("cities", self.st.to_dict())
+
+
+class TestRelations_prefetch(unittest.TestCase):
+    """Unittests for prefetch()."""
+
+    def setUp(self):
+        FileStorage._FileStorage__objects = {}
+        (self.st, self.usr, self.amenities, self.cities, self.places,
+         self.reviews) = build()
+
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+
+    def test_tree(self):
+        with prefetch([self.st], "cities.places.reviews",
+                      "cities.places.amenities") as states:
+            with patch.object(models.storage, "find_in") as find_in:
+                self.assertEqual([self.st], states)
+                self.assertEqual(self.cities, self.st.cities)
+                self.assertEqual(self.places[:2], self.cities[0].places)
+                self.assertEqual(self.reviews[2:], self.places[2].reviews)
+                self.assertEqual(self.amenities, self.places[0].amenities)
+                find_in.assert_not_called()
+            self.assertIs(self.usr, self.places[0].user)
+
+    def test_one_lookup_per_level(self):
+        with patch.object(models.storage, "find_in",
+                          wraps=models.storage.find_in) as find_in:
+            with prefetch(self.places, "reviews.user", "city.state"):
+                pass
+        self.assertEqual(["Review", "User", "City", "State"],
+                         [c.args[0] for c in find_in.call_args_list])
+
+    def test_listed_in_one_lookup(self):
+        with patch.object(models.storage, "having",
+                          wraps=models.storage.having) as having:
+            with prefetch(self.amenities, "places"):
+                self.assertEqual([self.places[0]], self.amenities[0].places)
+                self.assertEqual([self.places[0], self.places[2]],
+                                 self.amenities[1].places)
+        having.assert_called_once()
+        self.assertEqual(["Place", "amenity_ids", "any"],
+                         [having.call_args.args[i] for i in (0, 1, 3)])
+        self.assertEqual({amn.id for amn in self.amenities},
+                         set(having.call_args.args[2]))
+
+    def test_belongs_to_not_an_id(self):
+        self.cities[0].state_id = [self.st.id]
+        self.cities[1].state_id = 3
+        self.places[1].city_id = {"id": self.cities[0].id}
+        with prefetch(self.cities, "state"):
+            self.assertIsNone(self.cities[0].state)
+            self.assertIsNone(self.cities[1].state)
+        with prefetch(self.places, "city"):
+            self.assertIs(self.cities[0], self.places[0].city)
+            self.assertIsNone(self.places[1].city)
+
+    def test_snapshot(self):
+        with prefetch([self.st], "cities"):
+            City().state_id = self.st.id
+            self.assertEqual(self.cities, self.st.cities)
+            self.st.cities.append(None)
+            self.assertEqual(2, len(self.st.cities))
+        self.assertEqual(3, len(self.st.cities))
+
+    def test_unknown_relation(self):
+        with self.assertRaises(AttributeError):
+            prefetch([self.st], "cities.reviews")
+        with self.assertRaises(AttributeError):
+            prefetch([self.st], "name")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+#!/usr/bin/python3
+"""Defines unittests for models/slots.py.
+Unittest classes:
+    TestSlotted_class
+    TestSlotted_attributes
+    TestSlotted_storage
+"""
+import os
+import models
+import unittest
+from datetime import datetime
+from io import StringIO
+from unittest.mock import patch
+from console import HBNBCommand
+from models.base_model import BaseModel
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.slots import slotted
+
+
+class TestSlotted_class(unittest.TestCase):
+    """Unittests for the classes built by slotted()."""
+
+    def test_cached(self):
+        self.assertIs(slotted(Place), slotted(Place))
+
+    def test_subclass_with_same_name(self):
+        self.assertTrue(issubclass(slotted(Place), Place))
+        self.assertEqual("Place", slotted(Place).__name__)
+
+    def test_declared_attributes_in_slots(self):
+        slots = slotted(Place).__slots__
+        for name in ("id", "created_at", "updated_at", "city_id",
+                     "price_by_night", "amenity_ids"):
+            self.assertIn(name, slots)
+        self.assertNotIn("__indexes__", slots)
+        self.assertNotIn("save", slots)
+        self.assertNotIn("reviews", slots)
+
+    def test_base_model(self):
+        self.assertEqual(("id", "created_at", "updated_at", "_extra"),
+                         slotted(BaseModel).__slots__)
+
+
+class TestSlotted_attributes(unittest.TestCase):
+    """Unittests for the attributes of slot-based instances."""
+
+    def setUp(self):
+        self.plc = slotted(Place).from_dict({
+            "id": "1", "created_at": "2024-03-12T00:42:45.884699",
+            "updated_at": "2024-03-12T00:42:45.884756", "name": "Loft",
+            "number_rooms": 2, "wifi": True, "__class__": "Place"})
+
+    def test_from_dict(self):
+        self.assertEqual("1", self.plc.id)
+        self.assertEqual(datetime(2024, 3, 12, 0, 42, 45, 884699),
+                         self.plc.created_at)
+        self.assertEqual("Loft", self.plc.name)
+        self.assertEqual(2, self.plc.number_rooms)
+        self.assertTrue(self.plc.wifi)
+
+    def test_class_defaults(self):
+        self.assertEqual("", self.plc.city_id)
+        self.assertEqual(0.0, self.plc.latitude)
+        self.assertEqual([], self.plc.amenity_ids)
+
+    def test_missing_attribute(self):
+        with self.assertRaises(AttributeError):
+            self.plc.missing
+
+    def test_to_dict(self):
+        self.assertEqual({"id": "1",
+                          "created_at": "2024-03-12T00:42:45.884699",
+                          "updated_at": "2024-03-12T00:42:45.884756",
+                          "name": "Loft", "number_rooms": 2, "wifi": True,
+                          "__class__": "Place"}, self.plc.to_dict())
+
+    def test_to_dict_matches_regular_model(self):
+        tdict = self.plc.to_dict()
+        self.assertEqual(Place.from_dict(tdict).to_dict(), tdict)
+
+    def test_str(self):
+        plcstr = self.plc.__str__()
+        self.assertIn("[Place] (1)", plcstr)
+        self.assertIn("'name': 'Loft'", plcstr)
+        self.assertIn("'wifi': True", plcstr)
+        self.assertNotIn("city_id", plcstr)
+
+    def test_set_attributes(self):
+        self.plc.city_id = "SF"
+        self.plc.pets = False
+        self.assertEqual("SF", self.plc.city_id)
+        self.assertFalse(self.plc.pets)
+        self.assertEqual("SF", self.plc.to_dict()["city_id"])
+        self.assertFalse(self.plc.to_dict()["pets"])
+
+    def test_relations_read_only(self):
+        with self.assertRaises(AttributeError):
+            self.plc.city = "oops"
+        with self.assertRaises(AttributeError):
+            self.plc.reviews = []
+        self.assertNotIn("city", self.plc.to_dict())
+
+    def test_no_args(self):
+        plc = slotted(Place)()
+        self.assertEqual(str, type(plc.id))
+        self.assertEqual(datetime, type(plc.created_at))
+        self.assertIn(plc, models.storage.all().values())
+
+
+class TestSlotted_storage(unittest.TestCase):
+    """Unittests for slot-based instances in storage and the console."""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_console_update(self):
+        plc = slotted(Place)()
+        with patch("sys.stdout", new=StringIO()):
+            HBNBCommand().onecmd(
+                'update Place {} number_rooms "3"'.format(plc.id))
+            HBNBCommand().onecmd(
+                'update Place {} view "sea"'.format(plc.id))
+        self.assertEqual(3, plc.number_rooms)
+        self.assertEqual("sea", plc.view)
+
+    def test_console_update_relation(self):
+        plc = slotted(Place)()
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd('update Place {} city "oops"'.format(plc.id))
+        self.assertEqual("** can't set attribute 'city' **",
+                         output.getvalue().strip())
+        self.assertNotIn("city", plc.to_dict())
+
+    def test_find(self):
+        plc = slotted(Place)()
+        plc.city_id = "SF"
+        self.assertIn("Place." + plc.id,
+                      models.storage.find(Place, city_id="SF"))
+
+    def test_save(self):
+        plc = slotted(Place)()
+        plc.name = "Loft"
+        plc.save()
+        with open("file.json", "r") as f:
+            self.assertIn('"name": "Loft"', f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()